@@ -1,5 +1,12 @@
 from fastapi import APIRouter
-from api.v1.endpoints import rag_api, websocket_api, health_api, agent_api, login_api
+from api.v1.endpoints import (
+    rag_api,
+    websocket_api,
+    health_api,
+    agent_api,
+    login_api,
+    metrics_api,
+)
 
 router = APIRouter()
 # router.add_api_websocket_route("/ws", websocket_api.websocket_endpoint)
@@ -12,3 +19,4 @@ router.include_router(
     login_api.router, prefix="/auth", tags=["auth"], include_in_schema=True
 )
 router.include_router(agent_api.router, prefix="/agent", tags=["agent"])
+router.include_router(metrics_api.router, prefix="/metrics", tags=["metrics"])
@@ -1,3 +1,4 @@
+import asyncio
 from fastapi import APIRouter, Depends, Body
 from schemas.api.schema import AgentResponse, AgentRequest
 from core.middleware.trace_id import get_trace_id
@@ -9,5 +10,6 @@ router = APIRouter()
 @router.post("/")
 async def agent(input: AgentRequest, trace_id: str = Depends(get_trace_id)):
     svc = AgentService()
-    r = svc.chat(query=input.query, llm_model=input.llm)
+    # 동기 agent는 LLM slot 대기시 스레드를 블로킹하므로 event loop 밖에서 실행
+    r = await asyncio.to_thread(svc.chat, query=input.query, llm_model=input.llm)
     return AgentResponse(trace_id=trace_id, result={"message": r})
@@ -1,8 +1,17 @@
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
 
 router = APIRouter()
 
 
 @router.get("/healthz", operation_id="health_check")
 def healthz():
+    from infra.messaging.kafka.aio_kafka import KafkaBridge
+
+    # retry/DLQ 기록 실패로 정지된 partition이 있으면 503 (자동 재개 대기 중)
+    if stalled := KafkaBridge().stalled_partitions():
+        return JSONResponse(
+            status_code=503,
+            content={"status": "degraded", "stalled_partitions": stalled},
+        )
     return {"status": "ok"}
@@ -0,0 +1,29 @@
+from fastapi import APIRouter
+from infra.messaging.kafka.aio_kafka import KafkaBridge
+from infra.messaging.kafka.retry import retry_stats
+from infra.messaging.result_channel import reply_registry
+from services.llm.llm_provider import router_stats
+from services.llm.scheduler import scheduler_stats
+from services.llm.usage import usage_stats
+
+router = APIRouter()
+
+
+@router.get("/llm", operation_id="llm_metrics")
+def llm_metrics():
+    # 백엔드별 동시실행/대기열/queue 대기시간, hedge 라우팅 현황, 모델별 사용량
+    return {
+        "schedulers": scheduler_stats(),
+        "routers": router_stats(),
+        "usage": usage_stats.stats(),
+    }
+
+
+@router.get("/kafka", operation_id="kafka_metrics")
+def kafka_metrics():
+    # partition별 in-flight/lag, 처리시간, 재시도/DLQ 건수, HTTP 답변 대기 현황
+    return {
+        "consumer": KafkaBridge().stats(),
+        "retry": retry_stats(),
+        "replies": reply_registry.stats(),
+    }
@@ -1,5 +1,7 @@
 import os
-from fastapi import APIRouter, Depends, UploadFile, File
+import orjson
+from fastapi import APIRouter, Depends, UploadFile, File, Request
+from fastapi.responses import StreamingResponse
 from datetime import datetime
 from pathlib import Path
 import shutil
@@ -13,6 +15,9 @@ from schemas.api.schema import (
     QueryByRagResponse,
     QueryVdbRequest,
     QueryVdbResponse,
+    QueryVdbBatchRequest,
+    QueryVdbBatchResponse,
+    QueryVdbBatchItem,
 )
 from services.dto.rag import (
     QueryByRagResult,
@@ -20,6 +25,9 @@ from services.dto.rag import (
 )
 
 from infra.messaging.kafka.aio_kafka import KafkaBridge
+from infra.messaging.result_channel import reply_registry
+from core.exception.customs import ProcessingException
+from schemas.base import ErrorResponse
 from services.rag_service import RagQueryService
 from utils.logging import logging, log_block_ctx
 
@@ -30,7 +38,9 @@ logger = logging.getLogger(__name__)
 
 @router.post("/rag-pipeline", response_model=RagPipelineResponse)
 async def rag_pipeline(
-    trace_id: str = Depends(find_trace_id), upload_file: UploadFile = File(...)
+    trace_id: str = Depends(find_trace_id),
+    upload_file: UploadFile = File(...),
+    client_id: str | None = None,
 ):
     # trace id 취득
     logger.info(
@@ -62,7 +72,7 @@ async def rag_pipeline(
             key=trace_id,
             value=StompFrameModel(
                 command="pipeline-start",
-                headers={},
+                headers={"client-id": client_id} if client_id else {},
                 body=os.path.splitext(upload_file.filename)[0],
             ).model_dump(),
         )
@@ -83,7 +93,12 @@ async def search_db(
 ):
     with log_block_ctx(logger, f"search_db: {req}"):
         result: QueryByRagResult = svc.retrieve(
-            name=req.retriever, query=req.query, filter=req.filter, top_k=req.top_k
+            name=req.retriever,
+            query=req.query,
+            filter=req.filter,
+            top_k=req.top_k,
+            fields=req.fields,
+            with_text=req.with_text,
         )
 
         def log_resp(x: QueryByRagResult):
@@ -99,11 +114,38 @@ async def search_db(
         )
 
 
+@router.post("/search_db/batch", response_model=QueryVdbBatchResponse)
+async def search_db_batch(
+    req: QueryVdbBatchRequest,
+    trace_id: str = Depends(find_trace_id),
+    svc: RagQueryService = Depends(get_rag_service),
+):
+    """
+    여러 질의를 한번에 조회 (평가 작업, FAQ pre-warming 등)
+    - 질의 임베딩 1회 + qdrant query_batch_points 1회
+    """
+    with log_block_ctx(logger, f"search_db_batch: {len(req.queries)} queries"):
+        results = await svc.aretrieve_many(
+            [(query, req.filter, req.top_k) for query in req.queries],
+            fields=req.fields,
+            with_text=req.with_text,
+        )
+
+    return QueryVdbBatchResponse(
+        trace_id=trace_id,
+        results=[
+            QueryVdbBatchItem(query=q, hits=r.hits)
+            for q, r in zip(req.queries, results)
+        ],
+    )
+
+
 @router.post("/query_by_rag", response_model=QueryByRagResponse)
 async def query_by_rag(
     req: QueryByRagRequest,
     background_tasks: BackgroundTasks,
     trace_id: str = Depends(find_trace_id),
+    wait: float = 0,
 ):
     """
     # 절차
@@ -111,6 +153,9 @@ async def query_by_rag(
     2. 프롬프트에 context로 포함
     3. 답변생성요청
     4. 사용된 토큰량을 포함해 반환
+
+    wait(초)를 지정하면 kafka로 처리된 답변을 최대 wait초까지 기다려 함께 반환.
+    시간 내 답변이 없으면 PENDING을 반환하고 GET /query_by_rag/{trace_id}로 재조회.
     """
 
     # kafka topic 발행
@@ -122,8 +167,8 @@ async def query_by_rag(
             key=trace_id,
             value=StompFrameModel(
                 command="query-by-rag",
-                headers={},
-                body=req.model_dump_json(),
+                headers={"client-id": req.client_id} if req.client_id else {},
+                body=req.model_dump(),
             ).model_dump(),
         )
 
@@ -132,4 +177,97 @@ async def query_by_rag(
         logger.info("query_by_rag: trace_id=%s", _id)
 
     background_tasks.add_task(bg_task, trace_id)
-    return QueryByRagResponse(result="OK", trace_id=trace_id)
+    if wait <= 0 or req.stream:
+        return QueryByRagResponse(result="OK", trace_id=trace_id)
+    return await _wait_reply(trace_id, wait)
+
+
+@router.get("/query_by_rag/{trace_id}", response_model=QueryByRagResponse)
+async def query_by_rag_result(trace_id: str, wait: float = 0):
+    """
+    long-poll: 답변이 도착할 때까지 최대 wait초 대기 (이미 도착했으면 즉시 반환)
+    """
+    return await _wait_reply(trace_id, wait)
+
+
+async def _wait_reply(trace_id: str, wait: float) -> QueryByRagResponse:
+    value = await reply_registry.wait(
+        trace_id, min(wait, settings.reply_max_wait_sec)
+    )
+    if value is None:
+        return QueryByRagResponse(result="PENDING", trace_id=trace_id)
+    if error := value.get("error"):
+        # worker에서 최종 실패(DLQ)한 요청
+        raise ProcessingException(f"{error['type']}: {error['message']}")
+    return QueryByRagResponse(
+        result="DONE",
+        trace_id=trace_id,
+        answer=QueryByRagResult.model_validate(value),
+    )
+
+
+def _sse(event: str, data: dict) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+@router.post("/query_by_rag/stream")
+async def query_by_rag_stream(
+    req: QueryByRagRequest,
+    request: Request,
+    trace_id: str = Depends(find_trace_id),
+    svc: RagQueryService = Depends(get_rag_service),
+):
+    """
+    Kafka/WebSocket을 거치지 않고 같은 요청에서 답변을 SSE로 스트리밍
+    - event: hits  -> 검색결과
+    - event: token -> 답변 토큰
+    - event: done  -> 완료 (answer, hits, usage), 성공한 경우에만 전송
+    - event: error -> 응답 시작 후 실패 (error_type, message). 답변이 잘린 것으로 처리
+    검색(요청 검증 포함)은 응답 시작 전에 수행하므로 그 실패는 일반 HTTP 오류로 반환된다.
+    클라이언트 연결이 끊기면 LLM 생성을 중단한다.
+    """
+    stream = svc.astream_chat(
+        query=req.query,
+        filter=req.filter,
+        top_k=req.top_k,
+        llm_model=req.llm,
+        retriever_name=req.retriever,
+        trace_id=trace_id,
+    )
+    # 첫 항목(검색결과)까지는 응답 시작 전에 받음 (실패시 exception handler가 처리)
+    _, retrieved = await anext(stream)
+    hits = [h.model_dump() for h in retrieved]
+
+    async def event_stream():
+        answer: list[str] = []
+        usage: dict | None = None
+        try:
+            yield _sse("hits", dict(trace_id=trace_id, hits=hits))
+            async for kind, data in stream:
+                if await request.is_disconnected():
+                    logger.info("sse client disconnected: trace_id=%s", trace_id)
+                    return
+                if kind == "usage":
+                    usage = data.model_dump()
+                else:
+                    answer.append(data)
+                    yield _sse("token", dict(delta=data))
+        except Exception as e:
+            # 이미 200 응답이 시작되었으므로 error event로 실패를 알림 (done은 보내지 않음)
+            logger.error("sse stream failed: trace_id=%s, %s", trace_id, e)
+            error = ErrorResponse(
+                trace_id=trace_id, error_type=type(e).__name__, message=str(e)
+            )
+            yield _sse("error", error.model_dump(mode="json"))
+            return
+        finally:
+            # 생성 중단시 LLM 스트림(http 요청)까지 정리
+            await stream.aclose()
+        done = dict(trace_id=trace_id, answer="".join(answer), hits=hits, usage=usage)
+        yield _sse("done", done)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
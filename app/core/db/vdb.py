@@ -1,16 +1,50 @@
-from qdrant_client import QdrantClient
+from qdrant_client import QdrantClient, AsyncQdrantClient
 from qdrant_client.http.models import (
     VectorParams,
     Distance,
     SparseVectorParams,
     Bm25Config,
+    PayloadSchemaType,
+    HnswConfigDiff,
+    OptimizersConfigDiff,
+    VectorParamsDiff,
+    CollectionParamsDiff,
+    SearchParams,
 )
 from core.config import settings
+from dataclasses import dataclass
+from functools import lru_cache
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True)
+class CollectionProfile:
+    """컬렉션 HNSW/저장/optimizer 설정 (환경별 메모리-지연시간 trade-off)"""
+
+    hnsw_m: int = 16
+    hnsw_ef_construct: int = 100
+    hnsw_ef: int = 0  # 검색시 ef, 0이면 서버 기본값
+    on_disk_vectors: bool = False
+    on_disk_payload: bool = True
+    indexing_threshold: int = 20000
+
+    @classmethod
+    def from_settings(cls) -> "CollectionProfile":
+        return cls(
+            hnsw_m=settings.qdrant_hnsw_m,
+            hnsw_ef_construct=settings.qdrant_hnsw_ef_construct,
+            hnsw_ef=settings.qdrant_hnsw_ef,
+            on_disk_vectors=settings.qdrant_on_disk_vectors,
+            on_disk_payload=settings.qdrant_on_disk_payload,
+            indexing_threshold=settings.qdrant_indexing_threshold,
+        )
+
+    def search_params(self) -> SearchParams | None:
+        return SearchParams(hnsw_ef=self.hnsw_ef) if self.hnsw_ef > 0 else None
+
+
 class QdrantClientProvider:
 
     def __init__(
@@ -20,9 +54,12 @@ class QdrantClientProvider:
         api_key: str,
         embedding_model_name: str,
         lazy_load: bool,
+        profile: CollectionProfile | None = None,
     ):
         logger.info(f"Connecting to Qdrant at {url}:{port}, key: {api_key}")
         self._client = QdrantClient(url=url, port=port, api_key=api_key)
+        self._async_client = AsyncQdrantClient(url=url, port=port, api_key=api_key)
+        self.profile = profile or CollectionProfile()
 
         self._client.set_model(
             embedding_model_name=embedding_model_name,
@@ -34,23 +71,131 @@ class QdrantClientProvider:
     def client(self) -> QdrantClient:
         return self._client
 
+    @property
+    def async_client(self) -> AsyncQdrantClient:
+        return self._async_client
+
     def ensure_collection(self, name: str, vector_size: int) -> None:
-        # 이미 존재하면 통과, 없으면 생성
-        collections = self._client.get_collections().collections
-        if any(c.name == name for c in collections):
+        # 이미 존재하면 profile과 비교(reconcile), 없으면 profile로 생성
+        if self._client.collection_exists(name):
+            apply = settings.qdrant_reconcile_apply
+            self.reconcile_collection(name, vector_size, apply=apply)
             return
-        # 초기화
-        self._client.delete_collection(name)
+
+        p = self.profile
         self._client.create_collection(
             collection_name=name,
-            vectors_config=VectorParams(size=vector_size, distance=Distance.COSINE),
+            vectors_config=VectorParams(
+                size=vector_size, distance=Distance.COSINE, on_disk=p.on_disk_vectors
+            ),
             # vectors_config={
             #     "dense": VectorParams(size=vector_size, distance=Distance.COSINE),
             # },
             # sparse_vectors_config={"sparse_vector": SparseVectorParams()},
+            hnsw_config=HnswConfigDiff(m=p.hnsw_m, ef_construct=p.hnsw_ef_construct),
+            optimizers_config=OptimizersConfigDiff(
+                indexing_threshold=p.indexing_threshold
+            ),
+            on_disk_payload=p.on_disk_payload,
         )
 
+    def reconcile_collection(
+        self, name: str, vector_size: int, apply: bool = False
+    ) -> dict[str, tuple]:
+        """
+        live 컬렉션 설정과 profile의 차이를 계산해 반환한다.
+        apply=True면 update_collection으로 변경 가능한 항목만 반영한다.
+        (데이터 삭제/재생성은 하지 않지만, HNSW/optimizer 변경은 재색인을 유발함)
+        """
+        p = self.profile
+        config = self._client.get_collection(name).config
+        vectors = config.params.vectors
+        if isinstance(vectors, dict):
+            # named vector는 이 profile의 관리 대상이 아님
+            logger.warning("collection %s uses named vectors, skip reconcile", name)
+            return {}
 
+        if vectors is not None and vectors.size != vector_size:
+            logger.error(
+                "collection %s vector size mismatch: live=%d, settings=%d "
+                "(recreate manually)",
+                name,
+                vectors.size,
+                vector_size,
+            )
+
+        live = {
+            "hnsw_m": config.hnsw_config.m,
+            "hnsw_ef_construct": config.hnsw_config.ef_construct,
+            "on_disk_vectors": bool(vectors.on_disk) if vectors else False,
+            "on_disk_payload": bool(config.params.on_disk_payload),
+            "indexing_threshold": config.optimizer_config.indexing_threshold,
+        }
+        diff = {
+            key: (value, getattr(p, key))
+            for key, value in live.items()
+            if value != getattr(p, key)
+        }
+        if not diff:
+            return diff
+
+        logger.warning("collection %s profile diff (live, profile): %s", name, diff)
+        if not apply:
+            logger.warning(
+                "collection %s not updated (set QDRANT_RECONCILE_APPLY=true to apply)",
+                name,
+            )
+            return diff
+
+        self._client.update_collection(
+            collection_name=name,
+            hnsw_config=(
+                HnswConfigDiff(m=p.hnsw_m, ef_construct=p.hnsw_ef_construct)
+                if diff.keys() & {"hnsw_m", "hnsw_ef_construct"}
+                else None
+            ),
+            optimizers_config=(
+                OptimizersConfigDiff(indexing_threshold=p.indexing_threshold)
+                if "indexing_threshold" in diff
+                else None
+            ),
+            vectors_config=(
+                {"": VectorParamsDiff(on_disk=p.on_disk_vectors)}
+                if "on_disk_vectors" in diff
+                else None
+            ),
+            collection_params=(
+                CollectionParamsDiff(on_disk_payload=p.on_disk_payload)
+                if "on_disk_payload" in diff
+                else None
+            ),
+        )
+        return diff
+
+    def ensure_payload_indexes(self, name: str, indexes: dict[str, str]) -> None:
+        # 설정된 payload index 중 없는 것만 생성
+        existing = self._client.get_collection(name).payload_schema
+        for field, schema in indexes.items():
+            field_schema = PayloadSchemaType(schema)
+            if field not in existing:
+                logger.info("create payload index %s.%s (%s)", name, field, schema)
+                self._client.create_payload_index(
+                    collection_name=name,
+                    field_name=field,
+                    field_schema=field_schema,
+                )
+            elif existing[field].data_type != field_schema:
+                logger.warning(
+                    "payload index type mismatch %s.%s: live=%s, settings=%s",
+                    name,
+                    field,
+                    existing[field].data_type,
+                    schema,
+                )
+
+
+# 프로세스당 1회 연결 및 컬렉션/인덱스 점검
+@lru_cache(maxsize=1)
 def get_qdrant_client() -> QdrantClientProvider:
     qdrant = QdrantClientProvider(
         url=settings.qdrant_url,
@@ -58,7 +203,11 @@ def get_qdrant_client() -> QdrantClientProvider:
         api_key=settings.qdrant_api_key,
         embedding_model_name=settings.embedding_model_name,
         lazy_load=False,
+        profile=CollectionProfile.from_settings(),
     )
 
     qdrant.ensure_collection(settings.qdrant_collection, settings.embedding_dim)
+    qdrant.ensure_payload_indexes(
+        settings.qdrant_collection, settings.qdrant_payload_indexes
+    )
     return qdrant
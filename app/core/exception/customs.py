@@ -18,3 +18,17 @@ class ValidationException(BaseException):
 
 class DomainException(BaseException):
     pass
+
+
+class OverloadedException(BaseException):
+    pass
+
+
+class ProcessingException(BaseException):
+    # 비동기 처리(kafka worker)에서 요청이 최종 실패
+    pass
+
+
+class PartialResultException(DomainException):
+    # 결과 일부가 이미 전달되어 재시도하면 중복이 생기는 실패
+    pass
@@ -9,6 +9,8 @@ from core.exception.customs import (
     CommunicationException,
     ValidationException,
     DomainException,
+    OverloadedException,
+    ProcessingException,
 )
 import logging
 
@@ -21,6 +23,8 @@ def get_exception_handlers() -> dict[Type[Exception], Callable]:
         CommunicationException: communication_exception_handler,
         ValidationException: validation_exception_handler,
         DomainException: domain_exception_handler,
+        OverloadedException: overloaded_exception_handler,
+        ProcessingException: processing_exception_handler,
         Exception: unexpected_exception_handler,
     }
 
@@ -76,6 +80,16 @@ def domain_exception_handler(request: Request, exc: DomainException):
     return _error_response(request, exc, 422)
 
 
+# 처리용량 초과 (LLM 대기열 포화 등)
+def overloaded_exception_handler(request: Request, exc: OverloadedException):
+    return _error_response(request, exc, 503)
+
+
+# kafka worker에서 처리 실패한 요청의 결과 조회
+def processing_exception_handler(request: Request, exc: ProcessingException):
+    return _error_response(request, exc, 502)
+
+
 # 알수없는 예외
 def unexpected_exception_handler(request: Request, exc: Exception):
     return _error_response(request, exc, 500)
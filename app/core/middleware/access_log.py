@@ -26,7 +26,10 @@ async def access_logging_middleware(request: Request, call_next):
 
     response = await call_next(request)
 
-    if hasattr(response, "body_iterator"):
+    if response.headers.get("content-type", "").startswith("text/event-stream"):
+        # SSE는 body를 모으면 스트리밍이 깨지므로 로깅 제외
+        res_body = "<event-stream>"
+    elif hasattr(response, "body_iterator"):
         # streaming 방지용 요약
         res_body = await _get_resp_body(response)
     else:
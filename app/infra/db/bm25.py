@@ -0,0 +1,288 @@
+import fcntl
+import heapq
+import math
+import mmap
+import os
+import shutil
+import time
+import uuid
+import orjson
+from array import array
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from functools import cached_property, lru_cache
+from operator import itemgetter
+from pathlib import Path
+from threading import RLock
+from typing import Callable, Iterable, Iterator
+from langchain_core.documents import Document
+from core.config import settings
+from utils.logging import logging
+from utils.tokenizer import tokenize
+
+logger = logging.getLogger(__name__)
+
+# BM25 파라미터
+K1 = 1.2
+B = 0.75
+
+
+def _map_array(path: Path, typecode: str):
+    # 파일을 mmap으로 열어 복사 없이 배열로 사용 (빈 파일은 mmap 불가)
+    if path.stat().st_size == 0:
+        return array(typecode)
+    with path.open("rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return memoryview(mm).cast(typecode)
+
+
+class _Segment:
+    """
+    불변 segment (ingest 1회 = segment 1개)
+    - terms.json  : term -> [postings 시작위치, df], 문서 길이 합, 문서 source 목록
+    - postings.bin: doc id 배열 (uint32), term 순으로 연속 저장
+    - tfs.bin     : postings.bin과 같은 위치의 term frequency
+    - doclen.bin  : 문서별 토큰 수
+    - docs.jsonl / docs.off: 문서 본문+metadata와 byte offset
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        meta = orjson.loads((path / "terms.json").read_bytes())
+        self.terms: dict[str, list[int]] = meta["terms"]
+        self.total_len: int = meta["total_len"]
+        self._sources: list[str] | None = meta.get("sources")
+        self.doc_ids = _map_array(path / "postings.bin", "I")
+        self.tfs = _map_array(path / "tfs.bin", "I")
+        self.doc_lens = _map_array(path / "doclen.bin", "I")
+        self.doc_offsets = _map_array(path / "docs.off", "Q")
+        self.docs = _map_array(path / "docs.jsonl", "B")
+
+    def __len__(self) -> int:
+        return len(self.doc_lens)
+
+    def document(self, i: int) -> Document:
+        raw = self.docs[self.doc_offsets[i] : self.doc_offsets[i + 1]]
+        return Document(**orjson.loads(bytes(raw)))
+
+    def documents(self) -> Iterable[Document]:
+        return (self.document(i) for i in range(len(self)))
+
+    @cached_property
+    def sources(self) -> set[str]:
+        # 이전 형식 segment는 source 목록이 없으므로 문서에서 수집
+        if self._sources is not None:
+            return set(self._sources)
+        return {d.metadata.get("source") for d in self.documents()} - {None}
+
+    @staticmethod
+    def write(path: Path, docs: Iterable[Document]) -> None:
+        postings: dict[str, list[tuple[int, int]]] = defaultdict(list)
+        doc_lens = array("I")
+        offsets = array("Q", [0])
+        body = bytearray()
+        sources: set[str] = set()
+        for i, doc in enumerate(docs):
+            if (source := doc.metadata.get("source")) is not None:
+                sources.add(source)
+            counts = Counter(tokenize(doc.page_content))
+            doc_lens.append(sum(counts.values()))
+            for term, tf in counts.items():
+                postings[term].append((i, tf))
+            body += orjson.dumps(
+                {"page_content": doc.page_content, "metadata": doc.metadata}
+            )
+            body += b"\n"
+            offsets.append(len(body))
+
+        doc_ids = array("I")
+        tfs = array("I")
+        terms: dict[str, list[int]] = {}
+        for term in sorted(postings):
+            terms[term] = [len(doc_ids), len(postings[term])]
+            for doc_id, tf in postings[term]:
+                doc_ids.append(doc_id)
+                tfs.append(tf)
+
+        # 임시 디렉토리에 기록 후 rename (중간 실패시 반쪽 segment 방지)
+        tmp = path.with_name(path.name + ".tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        (tmp / "terms.json").write_bytes(
+            orjson.dumps(
+                {
+                    "terms": terms,
+                    "total_len": sum(doc_lens),
+                    "sources": sorted(sources),
+                }
+            )
+        )
+        (tmp / "postings.bin").write_bytes(doc_ids.tobytes())
+        (tmp / "tfs.bin").write_bytes(tfs.tobytes())
+        (tmp / "doclen.bin").write_bytes(doc_lens.tobytes())
+        (tmp / "docs.off").write_bytes(offsets.tobytes())
+        (tmp / "docs.jsonl").write_bytes(bytes(body))
+        os.replace(tmp, path)
+
+
+class BM25Index:
+    """
+    ingest된 chunk에 대한 in-process BM25 역색인.
+    ingest마다 segment를 추가하고, segment가 많아지면 하나로 병합한다.
+    검색은 mmap된 segment를 읽으므로 네트워크 호출이 없다.
+
+    여러 pod가 같은 디렉토리를 공유하는 경우
+    - segment 이름은 writer별로 고유 (생성시각 + uuid), 쓰기/병합은 파일 lock으로 직렬화
+    - 검색시 디렉토리 mtime이 바뀌었으면 segment 목록을 다시 읽음 (다른 pod의 적재 반영)
+    - 같은 source를 다시 적재하면 기존 문서를 대체
+    """
+
+    def __init__(self, root: Path, max_segments: int = 16, refresh_sec: float = 1.0):
+        self.root = root
+        self.max_segments = max_segments
+        self.refresh_sec = refresh_sec
+        self._lock = RLock()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._segments: list[_Segment] = []
+        self._mtime: int | None = None
+        self._checked = 0.0
+        self.refresh(force=True)
+        logger.info(
+            "bm25 index loaded: %s, segments=%d, docs=%d",
+            root,
+            len(self._segments),
+            sum(len(s) for s in self._segments),
+        )
+
+    def __len__(self) -> int:
+        self.refresh()
+        return sum(len(s) for s in self._segments)
+
+    def _new_path(self) -> Path:
+        # 이름순 = 생성순, 다른 writer와 겹치지 않음
+        return self.root / f"seg-{time.time_ns():020d}-{uuid.uuid4().hex[:8]}"
+
+    @contextmanager
+    def _writer_lock(self) -> Iterator[None]:
+        # 프로세스 내(스레드) + 프로세스 간(공유 디렉토리) 쓰기 직렬화
+        with self._lock, (self.root / ".lock").open("a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                self.refresh(force=True)
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def refresh(self, force: bool = False) -> None:
+        """디렉토리가 바뀌었으면 segment 목록 갱신 (기존 segment 객체는 재사용)"""
+        now = time.monotonic()
+        if not force and now - self._checked < self.refresh_sec:
+            return
+        self._checked = now
+        mtime = self.root.stat().st_mtime_ns
+        # mtime 해상도가 낮은 파일시스템(NFS 등)을 고려해 최근 변경이면 다시 확인
+        if not force and mtime == self._mtime and time.time_ns() - mtime > 2e9:
+            return
+        with self._lock:
+            current = {seg.path.name: seg for seg in self._segments}
+            segments: list[_Segment] = []
+            for path in sorted(self.root.glob("seg-*")):
+                if not path.is_dir() or path.name.endswith(".tmp"):
+                    continue
+                if (seg := current.get(path.name)) is None:
+                    try:
+                        seg = _Segment(path)
+                    except FileNotFoundError:
+                        # 다른 pod가 병합/대체로 삭제 중인 segment
+                        continue
+                segments.append(seg)
+            # 검색 중인 스레드를 위해 리스트는 교체(copy-on-write)
+            self._segments = segments
+            self._mtime = mtime
+
+    def add_documents(self, docs: list[Document]) -> None:
+        if not docs:
+            return
+        with self._writer_lock():
+            # 같은 source의 기존 문서는 새 문서로 대체 (재적재시 중복 방지)
+            sources = {d.metadata.get("source") for d in docs} - {None}
+            replaced = [seg for seg in self._segments if seg.sources & sources]
+            kept = (
+                d
+                for seg in replaced
+                for d in seg.documents()
+                if d.metadata.get("source") not in sources
+            )
+            path = self._new_path()
+            _Segment.write(path, [*kept, *docs])
+            self._segments = [
+                *(seg for seg in self._segments if seg not in replaced),
+                _Segment(path),
+            ]
+            for seg in replaced:
+                shutil.rmtree(seg.path, ignore_errors=True)
+            if replaced:
+                logger.info("bm25 sources replaced: %s", sorted(sources))
+            if len(self._segments) > self.max_segments:
+                self._compact()
+
+    def _compact(self) -> None:
+        old = self._segments
+        path = self._new_path()
+        _Segment.write(path, (d for seg in old for d in seg.documents()))
+        self._segments = [_Segment(path)]
+        for seg in old:
+            shutil.rmtree(seg.path, ignore_errors=True)
+        logger.info("bm25 segments compacted: %d -> 1", len(old))
+
+    def search(
+        self,
+        query: str,
+        k: int,
+        predicate: Callable[[Document], bool] | None = None,
+    ) -> list[tuple[Document, float]]:
+        self.refresh()
+        segments = self._segments
+        terms = list(dict.fromkeys(tokenize(query)))
+        n_docs = sum(len(s) for s in segments)
+        if not terms or n_docs == 0:
+            return []
+
+        avgdl = sum(s.total_len for s in segments) / n_docs
+        df = {t: sum(s.terms[t][1] for s in segments if t in s.terms) for t in terms}
+
+        scores: dict[tuple[int, int], float] = defaultdict(float)
+        for seg_no, seg in enumerate(segments):
+            for term in terms:
+                if (entry := seg.terms.get(term)) is None:
+                    continue
+                idf = math.log(1 + (n_docs - df[term] + 0.5) / (df[term] + 0.5))
+                start, count = entry
+                for j in range(start, start + count):
+                    doc_id, tf = seg.doc_ids[j], seg.tfs[j]
+                    norm = K1 * (1 - B + B * seg.doc_lens[doc_id] / avgdl)
+                    scores[(seg_no, doc_id)] += idf * tf * (K1 + 1) / (tf + norm)
+
+        if predicate is None:
+            ranked = heapq.nlargest(k, scores.items(), key=itemgetter(1))
+        else:
+            ranked = sorted(scores.items(), key=itemgetter(1), reverse=True)
+
+        results: list[tuple[Document, float]] = []
+        for (seg_no, doc_id), score in ranked:
+            doc = segments[seg_no].document(doc_id)
+            if predicate is not None and not predicate(doc):
+                continue
+            results.append((doc, score))
+            if len(results) >= k:
+                break
+        return results
+
+
+@lru_cache(maxsize=1)
+def get_bm25_index() -> BM25Index:
+    return BM25Index(
+        root=Path(settings.bm25_index_dir),
+        max_segments=settings.bm25_max_segments,
+        refresh_sec=settings.bm25_refresh_sec,
+    )
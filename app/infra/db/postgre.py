@@ -1,55 +1,108 @@
 from langchain_core.documents import Document
 from langchain_core.stores import BaseStore
-from typing import override, Sequence, Iterator, TypeVar, Generic
+from typing import override, Sequence, Iterator
+from sqlalchemy import Engine, select, delete
+from sqlalchemy.dialects.postgresql import insert
+from core.config import settings
+from models.parent_documents import ParentDocument
+from utils.lru_cache import LRUCache
 
-# import psycopg2, json
-import json
+# parent document 캐시 (id -> Document), 프로세스 전역
+parent_document_cache: LRUCache[str, Document] = LRUCache(
+    maxsize=settings.parent_doc_cache_size
+)
+
+
+def _to_document(id_: int, content: str, mdata: dict) -> Document:
+    # ParentDocumentRepository.add_all과 동일한 형태로 복원
+    return Document(page_content=content, metadata={**mdata, "parent_id": id_})
+
+
+def _to_db_id(key: str | int) -> int | None:
+    try:
+        return int(key)
+    except (TypeError, ValueError):
+        return None
 
 
 class PostgresDocStore(BaseStore[str, Document]):
+    """
+    parent_document 테이블 기반 docstore.
+    요청마다 sync 엔진의 커넥션풀에서 커넥션을 빌려 쓰고,
+    조회 결과는 LRU 캐시에 보관해 반복 조회시 DB 왕복을 생략한다.
+    """
 
-    def __init__(self, conn):
-        self.conn = conn
+    def __init__(
+        self,
+        engine: Engine,
+        cache: LRUCache[str, Document] | None = None,
+    ):
+        self.engine = engine
+        self.cache = cache if cache is not None else parent_document_cache
 
     @override
     def mget(self, keys: Sequence[str]) -> list[Document | None]:
-        with self.conn.cursor() as cur:
-            cur.execute(
-                "SELECT id, content, metadata FROM parent_documents WHERE id = ANY(%s)",
-                (keys,),
-            )
-            rows = {
-                r[0]: Document(page_content=r[1], metadata=r[2]) for r in cur.fetchall()
-            }
-        return [rows.get(k) for k in keys if k in rows]
+        str_keys = [str(k) for k in keys]
+        found = self.cache.get_many(str_keys)
+
+        # 캐시에 없는 id만 한번에 조회
+        missing = {
+            db_id: k
+            for k in dict.fromkeys(str_keys)
+            if k not in found and (db_id := _to_db_id(k)) is not None
+        }
+        if missing:
+            with self.engine.connect() as conn:
+                rows = conn.execute(
+                    select(
+                        ParentDocument.id, ParentDocument.content, ParentDocument.mdata
+                    ).where(ParentDocument.id.in_(list(missing)))
+                )
+                loaded = {
+                    missing[r.id]: _to_document(r.id, r.content, r.mdata) for r in rows
+                }
+            self.cache.put_many(loaded.items())
+            found.update(loaded)
+
+        # 요청 순서 유지, 없는 키는 None
+        return [found.get(k) for k in str_keys]
 
     @override
     def mset(self, key_value_pairs: Sequence[tuple[str, Document]]) -> None:
-        with self.conn.cursor() as cur:
-            for key, doc in key_value_pairs:
-                cur.execute(
-                    """
-                    INSERT INTO parent_documents (id, content, metadata)
-                    VALUES (%s, %s, %s)
-                    ON CONFLICT (id)
-                    DO UPDATE SET content = EXCLUDED.content, metadata = EXCLUDED.metadata
-                    """,
-                    (key, doc.page_content, json.dumps(doc.metadata)),
-                )
-        self.conn.commit()
+        values = [
+            dict(id=db_id, content=doc.page_content, mdata=doc.metadata)
+            for key, doc in key_value_pairs
+            if (db_id := _to_db_id(key)) is not None
+        ]
+        if not values:
+            return
+        stmt = insert(ParentDocument).values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ParentDocument.id],
+            set_=dict(content=stmt.excluded.content, mdata=stmt.excluded.mdata),
+        )
+        with self.engine.begin() as conn:
+            conn.execute(stmt)
+        self.cache.invalidate(str(v["id"]) for v in values)
 
     @override
     def mdelete(self, keys: Sequence[str]) -> None:
-        with self.conn.cursor() as cur:
-            cur.execute(
-                "DELETE FROM parent_documents WHERE id = ANY(%s)",
-                (keys,),
-            )
-        self.conn.commit()
+        ids = [db_id for k in keys if (db_id := _to_db_id(k)) is not None]
+        if ids:
+            with self.engine.begin() as conn:
+                conn.execute(delete(ParentDocument).where(ParentDocument.id.in_(ids)))
+        self.cache.invalidate(str(k) for k in keys)
 
     @override
     def yield_keys(self, *, prefix=None) -> Iterator[str]:
-        with self.conn.cursor() as cur:
-            cur.execute("SELECT id FROM parent_documents")
-            for (id_,) in cur.fetchall():
-                yield id_
+        with self.engine.connect() as conn:
+            for (id_,) in conn.execute(select(ParentDocument.id)):
+                key = str(id_)
+                if prefix is None or key.startswith(prefix):
+                    yield key
+
+
+def get_parent_docstore() -> PostgresDocStore:
+    from core.db.rdb import sync_engine
+
+    return PostgresDocStore(engine=sync_engine)
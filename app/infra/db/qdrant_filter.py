@@ -0,0 +1,133 @@
+import orjson
+from typing import Any, Callable
+from qdrant_client.http.models import (
+    Condition,
+    DatetimeRange,
+    FieldCondition,
+    Filter,
+    MatchAny,
+    MatchValue,
+    Range,
+)
+from core.exception.customs import ValidationException
+from utils.lru_cache import LRUCache
+
+# 직렬화된 filter spec -> 컴파일된 Filter
+_compiled_filters: LRUCache[bytes, Filter] = LRUCache(maxsize=256)
+
+_RANGE_OPS = {"$gt": "gt", "$gte": "gte", "$lt": "lt", "$lte": "lte"}
+
+
+def compile_filter(spec: dict[str, Any] | None) -> Filter | None:
+    """
+    dict 형태의 검색조건을 Qdrant Filter로 변환한다.
+    동일한 조건은 캐시된 Filter 객체를 재사용한다.
+
+    - {"key": "v"}                       -> MatchValue
+    - {"key": ["a", "b"]}                -> MatchAny
+    - {"key": {"$in": [...]}}            -> MatchAny
+    - {"key": {"$ne": v}}                -> must_not MatchValue
+    - {"key": {"$nin": [...]}}           -> must_not MatchAny
+    - {"key": {"$gte": 1, "$lt": 10}}    -> Range (문자열이면 DatetimeRange)
+    """
+    if not spec:
+        return None
+
+    try:
+        cache_key = orjson.dumps(spec, option=orjson.OPT_SORT_KEYS)
+    except TypeError as e:
+        raise ValidationException(f"Invalid filter: {e}")
+
+    # 조회는 get 1회로 (contains 후 get 사이에 다른 스레드가 evict하면 None이 반환됨)
+    if (cached := _compiled_filters.get(cache_key)) is not None:
+        return cached
+
+    must: list[Condition] = []
+    must_not: list[Condition] = []
+    for key, cond in spec.items():
+        if isinstance(cond, dict):
+            _compile_ops(key, cond, must, must_not)
+        elif isinstance(cond, list):
+            must.append(FieldCondition(key=key, match=MatchAny(any=cond)))
+        else:
+            must.append(FieldCondition(key=key, match=MatchValue(value=cond)))
+
+    compiled = Filter(must=must or None, must_not=must_not or None)
+    _compiled_filters.put(cache_key, compiled)
+    return compiled
+
+
+def _compile_ops(
+    key: str,
+    ops: dict[str, Any],
+    must: list[Condition],
+    must_not: list[Condition],
+) -> None:
+    range_args: dict[str, Any] = {}
+    for op, value in ops.items():
+        match op:
+            case "$eq":
+                must.append(FieldCondition(key=key, match=MatchValue(value=value)))
+            case "$in":
+                must.append(FieldCondition(key=key, match=MatchAny(any=value)))
+            case "$ne":
+                must_not.append(FieldCondition(key=key, match=MatchValue(value=value)))
+            case "$nin":
+                must_not.append(FieldCondition(key=key, match=MatchAny(any=value)))
+            case _ if op in _RANGE_OPS:
+                range_args[_RANGE_OPS[op]] = value
+            case _:
+                raise ValidationException(f"Unknown filter operator: {key}.{op}")
+
+    if range_args:
+        # ISO 문자열이면 datetime 범위로 처리
+        is_datetime = any(isinstance(v, str) for v in range_args.values())
+        range_ = DatetimeRange(**range_args) if is_datetime else Range(**range_args)
+        must.append(FieldCondition(key=key, range=range_))
+
+
+def compile_predicate(spec: dict[str, Any] | None) -> Callable[[dict], bool] | None:
+    """
+    compile_filter와 같은 조건식을 Qdrant 밖(로컬 색인 등)에서 쓰기 위한
+    metadata 판별 함수로 변환한다. key의 "metadata." 접두어는 생략 가능.
+    """
+    if not spec:
+        return None
+
+    checks: list[Callable[[dict], bool]] = []
+    for key, cond in spec.items():
+        field = key.removeprefix("metadata.")
+        if isinstance(cond, dict):
+            ops = cond
+        else:
+            ops = {"$in" if isinstance(cond, list) else "$eq": cond}
+        for op, value in ops.items():
+            if op not in _LOCAL_OPS:
+                raise ValidationException(f"Unknown filter operator: {key}.{op}")
+            checks.append(_local_check(field, _LOCAL_OPS[op], value))
+
+    return lambda metadata: all(check(metadata) for check in checks)
+
+
+def _local_check(field: str, op: Callable[[Any, Any], bool], value: Any):
+    def check(metadata: dict) -> bool:
+        if field not in metadata:
+            return op is _LOCAL_OPS["$ne"] or op is _LOCAL_OPS["$nin"]
+        try:
+            return op(metadata[field], value)
+        except TypeError:
+            return False
+
+    return check
+
+
+_LOCAL_OPS: dict[str, Callable[[Any, Any], bool]] = {
+    "$eq": lambda v, x: v == x,
+    "$in": lambda v, x: v in x,
+    "$ne": lambda v, x: v != x,
+    "$nin": lambda v, x: v not in x,
+    "$gt": lambda v, x: v > x,
+    "$gte": lambda v, x: v >= x,
+    "$lt": lambda v, x: v < x,
+    "$lte": lambda v, x: v <= x,
+}
@@ -1,13 +1,20 @@
 from __future__ import annotations
 
 import asyncio
-import orjson
+import time
 from typing import Callable
 from datetime import datetime
-from aiokafka import AIOKafkaProducer, AIOKafkaConsumer
+from aiokafka import (
+    AIOKafkaProducer,
+    AIOKafkaConsumer,
+    ConsumerRebalanceListener,
+    TopicPartition,
+)
+from core.config import settings
 from utils.logging import logging, log_block_ctx
+from infra.messaging.kafka import codec
+from infra.messaging.kafka.worker_pool import PartitionWorkerPool
 from infra.schema import InboundMessage, OutboundMessage, StompFrameModel
-import time
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +36,9 @@ class KafkaBridge:
         tout: str,
         event_loop: asyncio.AbstractEventLoop | None = None,
         consumer_callback: Callable | None = None,
+        batch_callback: Callable | None = None,
+        result_topic: str | None = None,
+        result_callback: Callable | None = None,
     ):
         self._servers = servers
         self._group = group
@@ -36,10 +46,24 @@ class KafkaBridge:
         self._tout = tout
         self._event_loop = event_loop
         self._consumer_callback = consumer_callback
+        # batch 모드에서 여러 메시지를 한번에 받는 callback (없으면 건별 처리)
+        self._batch_callback = batch_callback
+        # 처리결과 topic (replica마다 별도 group으로 전체 수신)
+        self._result_topic = result_topic
+        self._result_callback = result_callback
 
         self._producer: AIOKafkaProducer | None = None
         self._consumer: AIOKafkaConsumer | None = None
         self._task: asyncio.Task | None = None
+        self._commit_task: asyncio.Task | None = None
+        self._pool: PartitionWorkerPool | None = None
+        self._result_consumer: AIOKafkaConsumer | None = None
+        self._result_task: asyncio.Task | None = None
+        self._result_partitions: set[TopicPartition] = set()
+
+    @property
+    def started(self) -> bool:
+        return getattr(self, "_producer", None) is not None
 
     async def start(self) -> None:
         self._producer = AIOKafkaProducer(
@@ -47,15 +71,15 @@ class KafkaBridge:
             acks="all",
             enable_idempotence=True,
             linger_ms=5,
+            compression_type=settings.kafka_compression_type or None,
             key_serializer=lambda key: (
                 key.encode("utf-8") if isinstance(key, str) else None
             ),
-            value_serializer=lambda x: orjson.dumps(x),
+            value_serializer=codec.encode,
         )
         await self._producer.start()
         # key_deserializer 설정을 별도로 하지 않음. 추가했을때 알수없는 오류가 발생하기도함
         self._consumer = AIOKafkaConsumer(
-            self._tout,
             bootstrap_servers=self._servers,
             # group_id=f"{self._group}-{datetime.now().timestamp()}",
             group_id=self._group,
@@ -63,25 +87,61 @@ class KafkaBridge:
             # auto_offset_reset="earliest",
             enable_auto_commit=False,
             auto_commit_interval_ms=1000,
-            max_poll_records=10,
+            max_poll_records=settings.kafka_max_poll_records,
             session_timeout_ms=30000,  # broker가 최대한 heartbeat를 대기하는 기간(30초)
             heartbeat_interval_ms=3000,  # consumer가 broker에게 3초마다 신호를 보냄
             max_poll_interval_ms=300000,  # 처리 오래걸릴 때
-            value_deserializer=lambda x: orjson.loads(x.decode("utf-8")),
+            # value는 worker task에서 decode (잘못된 record가 consume loop를 멈추지 않도록)
         )
+        # retry topic도 같은 group으로 구독 (backoff 대기는 retry partition에서만 발생)
+        topics = [self._tout]
+        if settings.kafka_retry_topic:
+            topics.append(settings.kafka_retry_topic)
+        # rebalance시 회수되는 partition은 처리 완료분까지 commit 후 반납
+        self._consumer.subscribe(topics, listener=_RebalanceListener(self))
         await self._consumer.start()
+        self._pool = PartitionWorkerPool(
+            self._consumer,
+            self._handle_records,
+            max_per_partition=settings.kafka_partition_concurrency,
+            max_total=settings.kafka_max_inflight,
+            stall_backoff_sec=settings.kafka_stall_backoff_sec,
+            stall_max_backoff_sec=settings.kafka_stall_max_backoff_sec,
+        )
 
         self._task = asyncio.create_task(self._consume_loop())
         self._task.add_done_callback(
-            lambda t: logger.error("consumer task ended: %s", t.exception())
+            lambda t: t.cancelled()
+            or logger.error("consumer task ended: %s", t.exception())
         )
+        self._commit_task = asyncio.create_task(self._commit_loop())
+
+        if self._result_topic and self._result_callback:
+            # 결과는 접속 중인 socket 전달용이므로 group 없이 전체 partition을 직접 할당,
+            # 시작 시점의 끝부터 읽음 (broker에 commit/group 상태를 남기지 않음)
+            self._result_consumer = AIOKafkaConsumer(
+                bootstrap_servers=self._servers,
+                group_id=None,
+                enable_auto_commit=False,
+            )
+            await self._result_consumer.start()
+            await self._assign_result_partitions(from_end=True)
+            self._result_task = asyncio.create_task(self._result_loop())
 
         logger.info("KafkaBridge started")
 
     async def stop(self) -> None:
-        if self._task:
-            self._task.cancel()
+        for task in (self._task, self._commit_task, self._result_task):
+            if task:
+                task.cancel()
+        if self._result_consumer:
+            await self._result_consumer.stop()
         if self._consumer:
+            # 처리 중인 메시지를 마무리하고 완료분까지 commit
+            if self._pool:
+                self._pool.close()
+                await self._pool.drain(timeout=settings.kafka_shutdown_timeout_sec)
+                await self._pool.commit()
             await self._consumer.stop()
         if self._producer:
             await self._producer.stop()
@@ -97,6 +157,16 @@ class KafkaBridge:
         assert self._producer is not None
         await self._producer.send_and_wait(topic, **kwargs)
 
+    async def enqueue_message(self, topic: str, **kwargs) -> None:
+        """broker ack를 기다리지 않고 producer buffer에 적재 (실패는 로그만)"""
+        assert self._producer is not None
+        future = await self._producer.send(topic, **kwargs)
+        future.add_done_callback(
+            lambda f: f.cancelled()
+            or f.exception() is None
+            or logger.error("kafka send failed(%s): %s", topic, f.exception())
+        )
+
     def send_message_sync(self, topic: str, **kwargs) -> None:
         assert self._producer is not None
 
@@ -108,62 +178,212 @@ class KafkaBridge:
             self._event_loop,
         )
 
+    def stats(self) -> dict:
+        return self._pool.stats() if getattr(self, "_pool", None) else {}
+
+    def stalled_partitions(self) -> list[str]:
+        """retry/DLQ 기록 실패로 정지된 partition (health check용)"""
+        if not getattr(self, "_pool", None):
+            return []
+        return [
+            f"{tp.topic}-{tp.partition}@{offset}"
+            for tp, offset in self._pool.stalled.items()
+        ]
+
     async def _consume_loop(self) -> None:
-        assert self._consumer is not None
+        assert self._consumer is not None and self._pool is not None
         logger.info("KafkaBridge _consume_loop start")
 
-        count = 0
-        last_commit_time = time.time()
-        COMMIT_INTERVAL = 5.0  # 5초마다 commit
         try:
-            async for rec in self._consumer:
-                if rec.value is None:
-                    continue
-                """
-                consumer value_deserializer에서 orjson설정 처리
-                try:
-                    value = orjson.loads(rec.value)
-                except orjson.JSONDecodeError:
-                    value = rec.value              
-                """
-                with log_block_ctx(
-                    logger, f"KafkaBridge received message: {rec.value}"
-                ):
-
-                    message_data = {
-                        "topic": rec.topic,
-                        "partition": rec.partition,
-                        "offset": rec.offset,
-                        "key": rec.key.decode("utf-8") if rec.key else None,
-                        "value": StompFrameModel.model_validate(rec.value),
-                        "headers": rec.headers,
-                        "timestamp": rec.timestamp,
-                        "consumed_at": datetime.now().isoformat(),
-                    }
-
-                    if self._consumer_callback:
-                        asyncio.create_task(self._consumer_callback(message_data))
-                    else:
-                        logger.info(
-                            "No Callback: KafkaBridge decoded message: %s", message_data
-                        )
-
-                # 커밋
-                count += 1
-                now = time.time()
-
-                # 10개 또는 5초마다 commit
-                if count >= 10 or (now - last_commit_time) >= COMMIT_INTERVAL:
-                    await self._consumer.commit()
-                    logger.info(f"Batch commit: {count} message(s)")
-                    count = 0
-                    last_commit_time = now
-
+            # 실행/commit은 worker pool이 담당 (partition별 in-flight 제한)
+            if settings.kafka_batch_enabled:
+                while True:
+                    batch = []
+                    for rec in await self._next_batch():
+                        # retry 메시지는 각자 예정 시각까지 대기하므로 건별로 실행
+                        if rec.topic == settings.kafka_retry_topic:
+                            await self._pool.submit([rec])
+                        else:
+                            batch.append(rec)
+                    if batch:
+                        await self._pool.submit(batch)
+            else:
+                async for rec in self._consumer:
+                    if rec.value is None:
+                        continue
+                    await self._pool.submit([rec])
         except asyncio.CancelledError:
             return
 
         logger.info("KafkaBridge _consume_loop end")
 
+    async def _next_batch(self) -> list:
+        """
+        getmany로 최대 kafka_batch_max_records건까지 모은다.
+        첫 record 수신 후 kafka_batch_max_wait_ms 안에서만 추가로 기다린다.
+        """
+        assert self._consumer is not None
+        max_records = settings.kafka_batch_max_records
+        records: list = []
+        deadline: float | None = None
+        while len(records) < max_records:
+            if deadline is None:
+                timeout_ms = 1000
+            else:
+                timeout_ms = int((deadline - time.monotonic()) * 1000)
+                if timeout_ms <= 0:
+                    break
+            fetched = await self._consumer.getmany(
+                timeout_ms=timeout_ms, max_records=max_records - len(records)
+            )
+            records.extend(
+                r for rs in fetched.values() for r in rs if r.value is not None
+            )
+            if records and deadline is None:
+                deadline = time.monotonic() + settings.kafka_batch_max_wait_ms / 1000
+        return records
+
+    async def _assign_result_partitions(self, from_end: bool = False) -> None:
+        """
+        결과 topic의 partition 목록을 다시 조회해 변경되었으면 재할당.
+        topic이 기동 후 처음 발행될 때 자동 생성되거나 partition이 늘어난 경우,
+        새 partition은 처음부터 읽는다 (기존 partition은 읽던 위치 유지).
+        """
+        consumer = self._result_consumer
+        assert consumer is not None and self._result_topic
+        await consumer.topics()  # topic metadata 갱신
+        current = {
+            TopicPartition(self._result_topic, p)
+            for p in consumer.partitions_for_topic(self._result_topic) or ()
+        }
+        if current == self._result_partitions:
+            return
+        if not current:
+            logger.warning("result topic has no partitions: %s", self._result_topic)
+        positions = {
+            tp: await consumer.position(tp)
+            for tp in self._result_partitions & current
+        }
+        added = current - self._result_partitions
+        consumer.assign(list(current))
+        for tp, offset in positions.items():
+            consumer.seek(tp, offset)
+        if added and from_end:
+            await consumer.seek_to_end(*added)
+        elif added:
+            await consumer.seek_to_beginning(*added)
+        self._result_partitions = current
+        logger.info("result topic partitions assigned: %d", len(current))
+
+    async def _result_loop(self) -> None:
+        assert self._result_consumer is not None and self._result_callback
+        logger.info("KafkaBridge _result_loop start")
+        refresh_sec = settings.kafka_result_refresh_sec
+        next_refresh = time.monotonic() + refresh_sec
+        try:
+            while True:
+                if time.monotonic() >= next_refresh:
+                    try:
+                        await self._assign_result_partitions()
+                    except Exception as e:
+                        logger.warning("result topic metadata refresh failed: %s", e)
+                    next_refresh = time.monotonic() + refresh_sec
+                if not self._result_partitions:
+                    # 아직 topic이 없음 (첫 발행시 자동 생성)
+                    await asyncio.sleep(refresh_sec)
+                    continue
+                fetched = await self._result_consumer.getmany(timeout_ms=1000)
+                for rec in (r for rs in fetched.values() for r in rs):
+                    if rec.value is None:
+                        continue
+                    try:
+                        await self._result_callback(codec.decode(rec.value))
+                    except Exception as e:
+                        # 전달 실패(socket 종료 등)는 다음 결과 처리에 영향 없음
+                        logger.warning("result delivery failed: %s", e)
+        except asyncio.CancelledError:
+            return
+
+    async def _commit_loop(self) -> None:
+        assert self._pool is not None
+        interval = settings.kafka_commit_interval_ms / 1000
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self._pool.commit()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # rebalance 중 commit 실패는 다음 주기에 재시도
+                logger.warning("kafka commit failed: %s", e)
+
+    async def _handle_records(self, records: list) -> None:
+        """
+        value는 codec으로 1회 decode (msgpack envelope 또는 legacy JSON)
+        처리 완료까지 대기해야 offset이 commit됨
+        """
+        messages = []
+        for rec in records:
+            try:
+                messages.append(_to_message(rec))
+            except (ValueError, KeyError, TypeError, IndexError) as e:
+                # decode 불가 record는 건너뜀 (같은 batch의 다른 메시지는 처리)
+                logger.error(
+                    "kafka record decode failed: %s-%d@%d: %s",
+                    rec.topic,
+                    rec.partition,
+                    rec.offset,
+                    e,
+                )
+        if len(messages) > 1 and self._batch_callback:
+            title = f"KafkaBridge received {len(messages)} messages"
+            with log_block_ctx(logger, title):
+                await self._batch_callback(messages)
+            return
+
+        for message_data in messages:
+            with log_block_ctx(
+                logger, f"KafkaBridge received message: {message_data['value']}"
+            ):
+                if self._consumer_callback:
+                    await self._consumer_callback(message_data)
+                else:
+                    logger.info(
+                        "No Callback: KafkaBridge decoded message: %s", message_data
+                    )
+
+
+def _to_message(rec) -> dict:
+    return {
+        "topic": rec.topic,
+        "partition": rec.partition,
+        "offset": rec.offset,
+        "key": rec.key.decode("utf-8") if rec.key else None,
+        "value": StompFrameModel.from_record(codec.decode(rec.value)),
+        "headers": rec.headers,
+        "timestamp": rec.timestamp,
+        "consumed_at": datetime.now().isoformat(),
+    }
+
+
+class _RebalanceListener(ConsumerRebalanceListener):
+    def __init__(self, bridge: KafkaBridge):
+        self._bridge = bridge
+
+    async def on_partitions_revoked(self, revoked) -> None:
+        pool = self._bridge._pool
+        if pool is None or not revoked:
+            return
+        await pool.drain(set(revoked), timeout=settings.kafka_shutdown_timeout_sec)
+        try:
+            await pool.commit()
+        except Exception as e:
+            logger.warning("kafka commit on revoke failed: %s", e)
+        pool.forget(set(revoked))
+
+    async def on_partitions_assigned(self, assigned) -> None:
+        logger.info("kafka partitions assigned: %s", assigned)
+
 
 # kafkaService = KafkaBridge(
 #     servers=settings.kafka_bootstrap_servers,
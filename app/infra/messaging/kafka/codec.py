@@ -0,0 +1,53 @@
+"""
+Kafka record value 인코딩.
+
+v1 envelope: MAGIC(0x00) + version(1byte) + msgpack payload
+- STOMP frame body를 JSON 문자열이 아닌 구조 그대로 담아 이중 인코딩을 없앤다.
+- 기존 JSON record(첫 바이트 '{')도 그대로 읽으므로 혼합 버전 배포 중에도 소비 가능.
+- 기본 발행 형식은 기존 JSON (kafka_message_format). 모든 consumer 업그레이드 후 msgpack으로 전환
+"""
+
+import msgpack
+import orjson
+from datetime import date, datetime
+from enum import Enum
+from typing import Any
+from uuid import UUID
+from core.config import settings
+
+MAGIC = 0x00
+VERSION = 1
+
+
+def _default(obj: Any) -> Any:
+    # msgpack 미지원 타입 (orjson과 같은 표현으로 변환)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, UUID):
+        return str(obj)
+    if isinstance(obj, Enum):
+        return obj.value
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    raise TypeError(f"Type is not msgpack serializable: {type(obj).__name__}")
+
+
+def encode(value: dict) -> bytes:
+    if settings.kafka_message_format == "json":
+        # 이전 consumer는 frame body를 JSON 문자열로 기대함
+        if isinstance(value.get("body"), dict):
+            value = {**value, "body": orjson.dumps(value["body"]).decode("utf-8")}
+        return orjson.dumps(value)
+    return bytes((MAGIC, VERSION)) + msgpack.packb(
+        value, default=_default, use_bin_type=True
+    )
+
+
+def decode(data: bytes) -> dict:
+    if data[:1] == bytes((MAGIC,)):
+        version = data[1]
+        if version != VERSION:
+            raise ValueError(f"Unsupported kafka envelope version: {version}")
+        return msgpack.unpackb(data[2:], raw=False)
+    # legacy JSON record
+    return orjson.loads(data)
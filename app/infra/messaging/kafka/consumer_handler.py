@@ -1,18 +1,83 @@
-from services.dispatchers.command_dispatcher import CommandDispatcher
+import asyncio
+from services.dispatchers.command_dispatcher import CommandDispatcher, client_id_of
 from utils.logging import log_execution_block
-from infra.messaging.websocket.manager import ws_manager
+from infra.messaging.kafka.retry import handle_failure, wait_until_due
+from infra.messaging.kafka.worker_pool import UndeliveredError
+from infra.messaging.result_channel import publish_result
 import logging
 
 logger = logging.getLogger(__name__)
 
+# retry/DLQ 기록 실패시 재시도 (broker 일시 장애 대비)
+_RECORD_ATTEMPTS = 3
+_RECORD_BACKOFF_SEC = 0.5
+
 
 @log_execution_block(title="Kafka Consumer - Handler")
 async def kafka_consumer_handler(message: dict):
     try:
+        # retry topic 메시지는 backoff 시각까지 대기
+        await wait_until_due(message)
         dispatcher = CommandDispatcher()
         return await dispatcher.dispatch(message)
     except Exception as e:
-        logger.error("websocket broadcast: %s", str(e))
-        await ws_manager.broadcast(
-            dict(value=dict(answer=str(e), hits=[])), lambda x: True
+        if not await _on_failure(message, e):
+            raise UndeliveredError(str(e), {_offset_of(message)}) from e
+
+
+@log_execution_block(title="Kafka Consumer - Batch Handler")
+async def kafka_batch_handler(messages: list[dict]):
+    dispatcher = CommandDispatcher()
+    try:
+        failures = await dispatcher.dispatch_batch(messages)
+    except Exception as e:
+        failures = [(message, e) for message in messages]
+
+    # 실패는 건별로 기록 (한 건의 기록 실패가 나머지 처리를 막지 않음)
+    undelivered: set[tuple[str, int, int]] = set()
+    for message, error in failures:
+        if not await _on_failure(message, error):
+            undelivered.add(_offset_of(message))
+    if undelivered:
+        raise UndeliveredError(
+            f"{len(undelivered)} failed message(s) not recorded", undelivered
         )
+
+
+def _offset_of(message: dict) -> tuple[str, int, int]:
+    return message["topic"], message["partition"], message["offset"]
+
+
+async def _on_failure(message: dict, error: BaseException) -> bool:
+    """
+    실패 메시지를 retry topic/DLQ에 기록. 기록하지 못하면 False
+    (호출측은 UndeliveredError로 offset commit을 막는다)
+    """
+    for attempt in range(1, _RECORD_ATTEMPTS + 1):
+        try:
+            retried = await handle_failure(message, error)
+            break
+        except Exception as e:
+            logger.warning(
+                "retry/DLQ record failed (%d/%d): %s", attempt, _RECORD_ATTEMPTS, e
+            )
+            if attempt == _RECORD_ATTEMPTS:
+                return False
+            await asyncio.sleep(_RECORD_BACKOFF_SEC * attempt)
+
+    # 재시도가 예약되면 통지하지 않고, 최종 실패만 요청한 client에 전달
+    if not retried:
+        try:
+            # error 필드로 실패를 구분 (answer는 기존 websocket client 호환용)
+            await publish_result(
+                dict(
+                    answer=str(error),
+                    hits=[],
+                    error=dict(type=type(error).__name__, message=str(error)),
+                ),
+                trace_id=message.get("key"),
+                client_id=client_id_of(message["value"]),
+            )
+        except Exception as e:
+            logger.error("error result publish failed: %s", e)
+    return True
@@ -0,0 +1,170 @@
+"""
+DLQ 메시지 재처리 도구.
+DLQ topic을 처음부터(또는 --since 이후) 읽어 조건에 맞는 메시지를 원래 topic으로 다시 발행한다.
+재시도 횟수/오류 header는 제거하므로 재발행된 메시지는 새 메시지로 처리된다.
+consumer group을 사용하지 않으므로 같은 조건으로 다시 실행하면 다시 발행된다.
+
+실행: cd app && python -m infra.messaging.kafka.replay --command query-by-rag --dry-run
+"""
+
+import argparse
+import asyncio
+from datetime import datetime
+from aiokafka import AIOKafkaConsumer, AIOKafkaProducer, TopicPartition
+from core.config import settings
+from infra.messaging.kafka import codec
+from infra.messaging.kafka.retry import (
+    ATTEMPT_HEADER,
+    DUE_HEADER,
+    ERROR_HEADER,
+    ERROR_TYPE_HEADER,
+    FAILED_AT_HEADER,
+    ORIGIN_OFFSET_HEADER,
+    ORIGIN_PARTITION_HEADER,
+    ORIGIN_TOPIC_HEADER,
+)
+
+# 재발행시 제거하는 header (실패 이력)
+_FAILURE_HEADERS = {
+    ATTEMPT_HEADER,
+    DUE_HEADER,
+    ERROR_HEADER,
+    ERROR_TYPE_HEADER,
+    FAILED_AT_HEADER,
+    ORIGIN_OFFSET_HEADER,
+    ORIGIN_PARTITION_HEADER,
+    ORIGIN_TOPIC_HEADER,
+}
+
+
+def _command(value: bytes) -> str:
+    try:
+        return str(codec.decode(value).get("command", ""))
+    except (ValueError, AttributeError, IndexError):
+        return ""
+
+
+def _matches(rec, command: str | None, key: str | None) -> bool:
+    if command and _command(rec.value).lower() != command.lower():
+        return False
+    return not key or (rec.key or b"").decode("utf-8") == key
+
+
+async def replay(
+    command: str | None = None,
+    key: str | None = None,
+    since: datetime | None = None,
+    topic: str | None = None,
+    limit: int | None = None,
+    dry_run: bool = False,
+) -> int:
+    """조건에 맞는 DLQ 메시지를 재발행하고 건수를 반환 (dry_run이면 목록만 출력)"""
+    consumer = AIOKafkaConsumer(
+        bootstrap_servers=settings.kafka_bootstrap_servers,
+        group_id=None,
+        enable_auto_commit=False,
+    )
+    producer = AIOKafkaProducer(
+        bootstrap_servers=settings.kafka_bootstrap_servers,
+        acks="all",
+        enable_idempotence=True,
+    )
+    await consumer.start()
+    if not dry_run:
+        await producer.start()
+
+    replayed = 0
+    try:
+        await consumer.topics()  # topic metadata 조회
+        partitions = [
+            TopicPartition(settings.kafka_dlq_topic, p)
+            for p in consumer.partitions_for_topic(settings.kafka_dlq_topic) or ()
+        ]
+        if not partitions:
+            return 0
+        consumer.assign(partitions)
+        # 실행 시점의 끝까지만 읽음
+        end_offsets = await consumer.end_offsets(partitions)
+        if since:
+            starts = await consumer.offsets_for_times(
+                {tp: int(since.timestamp() * 1000) for tp in partitions}
+            )
+            for tp in partitions:
+                if starts.get(tp):
+                    consumer.seek(tp, starts[tp].offset)
+                else:
+                    consumer.seek(tp, end_offsets[tp])
+        else:
+            await consumer.seek_to_beginning(*partitions)
+
+        remaining = set(partitions)
+        while remaining and (limit is None or replayed < limit):
+            fetched = await consumer.getmany(*remaining, timeout_ms=1000)
+            for tp, records in fetched.items():
+                for rec in records:
+                    if rec.offset >= end_offsets[tp]:
+                        break
+                    if limit is not None and replayed >= limit:
+                        break
+                    if not _matches(rec, command, key):
+                        continue
+                    headers = {k: v.decode("utf-8") for k, v in rec.headers}
+                    target = topic or headers.get(
+                        ORIGIN_TOPIC_HEADER, settings.kafka_topic
+                    )
+                    print(
+                        f"{tp.partition}@{rec.offset} -> {target}: "
+                        f"key={rec.key!r}, command={_command(rec.value)}, "
+                        f"attempts={headers.get(ATTEMPT_HEADER)}, "
+                        f"error={headers.get(ERROR_TYPE_HEADER)}: "
+                        f"{headers.get(ERROR_HEADER)}"
+                    )
+                    if not dry_run:
+                        await producer.send_and_wait(
+                            target,
+                            key=rec.key,
+                            value=rec.value,
+                            headers=[
+                                (k, v)
+                                for k, v in rec.headers
+                                if k not in _FAILURE_HEADERS
+                            ],
+                        )
+                    replayed += 1
+            remaining = {
+                tp for tp in remaining if await consumer.position(tp) < end_offsets[tp]
+            }
+    finally:
+        await consumer.stop()
+        if not dry_run:
+            await producer.stop()
+    return replayed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="DLQ 메시지 재처리")
+    parser.add_argument(
+        "--command", help="command가 일치하는 메시지만 (예: query-by-rag)"
+    )
+    parser.add_argument("--key", help="key(trace_id)가 일치하는 메시지만")
+    parser.add_argument(
+        "--since", type=datetime.fromisoformat, help="이 시각 이후 DLQ 적재분만 (ISO)"
+    )
+    parser.add_argument("--topic", help="재발행 topic (기본: 원래 topic)")
+    parser.add_argument("--limit", type=int, help="최대 재발행 건수")
+    parser.add_argument(
+        "--dry-run", action="store_true", help="발행하지 않고 목록만 출력"
+    )
+    args = parser.parse_args()
+
+    count = asyncio.run(
+        replay(
+            command=args.command,
+            key=args.key,
+            since=args.since,
+            topic=args.topic,
+            limit=args.limit,
+            dry_run=args.dry_run,
+        )
+    )
+    print(f"{'matched' if args.dry_run else 'replayed'}: {count}")
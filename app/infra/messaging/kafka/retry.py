@@ -0,0 +1,156 @@
+import asyncio
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+from core.config import settings
+from core.exception.customs import DomainException, ValidationException
+from infra.messaging.kafka.aio_kafka import KafkaBridge
+from utils.logging import logging
+
+logger = logging.getLogger(__name__)
+
+# retry/DLQ record header
+ATTEMPT_HEADER = "x-retry-attempt"  # 지금까지 실패한 실행 횟수
+DUE_HEADER = "x-retry-due-ms"  # 재실행 예정 시각 (epoch ms)
+ERROR_HEADER = "x-error"
+ERROR_TYPE_HEADER = "x-error-type"
+FAILED_AT_HEADER = "x-failed-at"
+ORIGIN_TOPIC_HEADER = "x-origin-topic"
+ORIGIN_PARTITION_HEADER = "x-origin-partition"
+ORIGIN_OFFSET_HEADER = "x-origin-offset"
+
+# 재시도해도 결과가 같은 오류 (잘못된 요청, poison message) -> 바로 DLQ
+NON_RETRYABLE = (ValueError, TypeError, KeyError, ValidationException, DomainException)
+
+_counters: Counter[str] = Counter()
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """command별 재시도 정책 (max_attempts는 최초 실행 포함)"""
+
+    max_attempts: int = 3
+    backoff_ms: int = 1000
+    max_backoff_ms: int = 60000
+    multiplier: float = 2.0
+
+    @classmethod
+    def for_command(cls, command: str) -> "RetryPolicy":
+        return cls(
+            **{
+                "max_attempts": settings.kafka_retry_max_attempts,
+                "backoff_ms": settings.kafka_retry_backoff_ms,
+                "max_backoff_ms": settings.kafka_retry_max_backoff_ms,
+                **settings.kafka_retry_policies.get(command.lower(), {}),
+            }
+        )
+
+    def delay_ms(self, attempt: int) -> int:
+        """attempt번째 실패 후 대기시간 (지수 backoff, 동시 실패분이 몰리지 않게 jitter)"""
+        delay = min(
+            self.max_backoff_ms, self.backoff_ms * self.multiplier ** (attempt - 1)
+        )
+        return int(delay * random.uniform(0.5, 1.0))
+
+
+def header(message: dict, name: str) -> str | None:
+    for key, value in message.get("headers") or ():
+        if key == name:
+            return value.decode("utf-8") if isinstance(value, bytes) else value
+    return None
+
+
+def _headers(values: dict[str, object]) -> list[tuple[str, bytes]]:
+    return [(k, str(v).encode("utf-8")) for k, v in values.items()]
+
+
+def _origin(message: dict) -> dict[str, object]:
+    # 재시도를 거쳐도 최초 수신 위치를 유지
+    return {
+        ORIGIN_TOPIC_HEADER: header(message, ORIGIN_TOPIC_HEADER) or message["topic"],
+        ORIGIN_PARTITION_HEADER: (
+            header(message, ORIGIN_PARTITION_HEADER) or message["partition"]
+        ),
+        ORIGIN_OFFSET_HEADER: (
+            header(message, ORIGIN_OFFSET_HEADER) or message["offset"]
+        ),
+    }
+
+
+async def wait_until_due(message: dict) -> None:
+    """
+    retry topic 메시지는 예정 시각까지 대기.
+    worker pool task 안에서만 대기하므로 원본 topic partition 처리는 막지 않는다.
+    """
+    if due := header(message, DUE_HEADER):
+        delay = int(due) / 1000 - time.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+async def handle_failure(message: dict, error: BaseException) -> bool:
+    """
+    실패한 메시지를 retry topic 또는 DLQ에 기록 (broker ack까지 대기).
+    재시도가 예약되면 True, 최종 실패(DLQ)면 False.
+    기록 실패는 예외로 전달되며, 호출측이 원본 offset을 commit하지 않도록 처리한다.
+    """
+    stomp = message["value"]
+    policy = RetryPolicy.for_command(stomp.command)
+    attempt = int(header(message, ATTEMPT_HEADER) or 0) + 1
+    metadata = {
+        **_origin(message),
+        ATTEMPT_HEADER: attempt,
+        ERROR_TYPE_HEADER: type(error).__name__,
+        ERROR_HEADER: str(error)[:1000],
+    }
+    bridge = KafkaBridge()
+
+    if (
+        settings.kafka_retry_topic
+        and attempt < policy.max_attempts
+        and not isinstance(error, NON_RETRYABLE)
+    ):
+        delay = policy.delay_ms(attempt)
+        metadata[DUE_HEADER] = int(time.time() * 1000) + delay
+        await bridge.send_message(
+            settings.kafka_retry_topic,
+            key=message["key"],
+            value=stomp.model_dump(),
+            headers=_headers(metadata),
+        )
+        _counters["retried"] += 1
+        logger.warning(
+            "kafka retry scheduled: command=%s, key=%s, attempt=%d/%d, "
+            "delay=%dms, error=%s",
+            stomp.command,
+            message["key"],
+            attempt,
+            policy.max_attempts,
+            delay,
+            error,
+        )
+        return True
+
+    metadata[FAILED_AT_HEADER] = datetime.now().isoformat()
+    if settings.kafka_dlq_topic:
+        await bridge.send_message(
+            settings.kafka_dlq_topic,
+            key=message["key"],
+            value=stomp.model_dump(),
+            headers=_headers(metadata),
+        )
+    _counters["dead_lettered"] += 1
+    logger.error(
+        "kafka message dead-lettered: command=%s, key=%s, attempts=%d, error=%s",
+        stomp.command,
+        message["key"],
+        attempt,
+        error,
+    )
+    return False
+
+
+def retry_stats() -> dict[str, int]:
+    return {k: _counters[k] for k in ("retried", "dead_lettered")}
@@ -0,0 +1,314 @@
+import asyncio
+import time
+from collections import defaultdict, deque
+from typing import Any, Awaitable, Callable
+from aiokafka import AIOKafkaConsumer, ConsumerRecord, TopicPartition
+from utils.logging import logging
+
+logger = logging.getLogger(__name__)
+
+
+class UndeliveredError(Exception):
+    """
+    실패 메시지를 retry/DLQ topic에 기록하지 못함.
+    해당 offset은 완료 처리하지 않으므로 commit되지 않고, partition은 정지된다.
+    backoff 후 그 offset으로 되돌아가(seek) 다시 수신한다.
+    """
+
+    def __init__(self, message: str, offsets: set[tuple[str, int, int]]):
+        super().__init__(message)
+        # (topic, partition, offset)
+        self.offsets = offsets
+
+
+class OffsetTracker:
+    """
+    partition 1개의 처리 완료 offset 추적.
+    완료 순서가 뒤섞여도 앞에서부터 연속으로 완료된 구간까지만 commit 대상으로 삼는다.
+    """
+
+    def __init__(self):
+        self._order: deque[int] = deque()
+        self._done: set[int] = set()
+        # kafka commit 값 (= 다음에 읽을 offset), 아직 없으면 None
+        self.committable: int | None = None
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def start(self, offset: int) -> None:
+        self._order.append(offset)
+
+    def complete(self, offset: int) -> None:
+        self._done.add(offset)
+        while self._order and self._order[0] in self._done:
+            head = self._order.popleft()
+            self._done.discard(head)
+            self.committable = head + 1
+
+
+class PartitionWorkerPool:
+    """
+    consumer record 실행기.
+    - partition별 in-flight가 max_per_partition에 도달하면 해당 partition fetch 일시정지
+    - 전체 in-flight는 max_total로 제한 (도달시 submit 대기)
+    - 같은 partition의 같은 key는 도착 순서대로 처리 (max_per_partition=1이면 partition 순서)
+    - 작업 단위는 record 목록 (batch 모드에서는 여러 partition에 걸칠 수 있음)
+    - commit은 OffsetTracker 기준으로 처리가 끝난 offset까지만 수행
+    - 기록 실패(UndeliveredError)로 정지된 partition은 backoff 후 해당 offset부터 재수신
+      (그 뒤 offset 중 이미 처리된 record도 다시 처리됨: at-least-once)
+    """
+
+    def __init__(
+        self,
+        consumer: AIOKafkaConsumer,
+        handler: Callable[[list[ConsumerRecord]], Awaitable[Any]],
+        max_per_partition: int = 4,
+        max_total: int = 64,
+        stall_backoff_sec: float = 5.0,
+        stall_max_backoff_sec: float = 300.0,
+    ):
+        self._consumer = consumer
+        self._handler = handler
+        self.max_per_partition = max_per_partition
+        self.stall_backoff_sec = stall_backoff_sec
+        self.stall_max_backoff_sec = stall_max_backoff_sec
+        self._slots = asyncio.Semaphore(max_total)
+        self._trackers: dict[TopicPartition, OffsetTracker] = {}
+        self._tasks: dict[TopicPartition, set[asyncio.Task]] = defaultdict(set)
+        self._key_tails: dict[tuple[TopicPartition, bytes], asyncio.Task] = {}
+        self._committed: dict[TopicPartition, int] = {}
+        # 기록 실패로 정지된 partition -> 다시 읽을 offset
+        self._stalled: dict[TopicPartition, int] = {}
+        self._stall_counts: dict[TopicPartition, int] = defaultdict(int)
+        self._recoveries: dict[TopicPartition, asyncio.Task] = {}
+        self._durations: deque[float] = deque(maxlen=1024)
+        self.processed = 0
+        self.failed = 0
+
+    @property
+    def inflight(self) -> int:
+        return len({task for tasks in self._tasks.values() for task in tasks})
+
+    @property
+    def stalled(self) -> dict[TopicPartition, int]:
+        return dict(self._stalled)
+
+    async def submit(self, records: list[ConsumerRecord]) -> None:
+        """records를 하나의 작업으로 실행 (단건 또는 batch)"""
+        # 정지된 partition의 record는 재수신(seek)되므로 버림 (pause 전에 받은 분)
+        records = [
+            r
+            for r in records
+            if TopicPartition(r.topic, r.partition) not in self._stalled
+        ]
+        if not records:
+            return
+        await self._slots.acquire()
+        partitions: list[tuple[TopicPartition, OffsetTracker]] = []
+        keys: list[tuple[TopicPartition, bytes]] = []
+        for record in records:
+            tp = TopicPartition(record.topic, record.partition)
+            tracker = self._trackers.setdefault(tp, OffsetTracker())
+            tracker.start(record.offset)
+            partitions.append((tp, tracker))
+            if record.key is not None:
+                keys.append((tp, record.key))
+
+        previous = {self._key_tails[k] for k in keys if k in self._key_tails}
+        task = asyncio.create_task(self._run(records, partitions, previous))
+        for key in keys:
+            self._key_tails[key] = task
+
+        tps = {tp for tp, _ in partitions}
+        task.add_done_callback(lambda t: self._on_done(tps, keys, t))
+        for tp in tps:
+            tasks = self._tasks[tp]
+            tasks.add(task)
+            if len(tasks) >= self.max_per_partition:
+                self._consumer.pause(tp)
+
+    async def _run(
+        self,
+        records: list[ConsumerRecord],
+        partitions: list[tuple[TopicPartition, OffsetTracker]],
+        previous: set[asyncio.Task],
+    ) -> None:
+        undelivered: set[tuple[str, int, int]] = set()
+        try:
+            # 같은 key의 선행 작업 완료 대기 (성공/실패 무관)
+            if previous:
+                await asyncio.wait(previous)
+            started = time.monotonic()
+            try:
+                await self._handler(records)
+                self.processed += len(records)
+            except UndeliveredError as e:
+                undelivered = e.offsets
+                self.failed += len(records)
+                logger.error("kafka record undelivered, partition stalled: %s", e)
+            except Exception:
+                self.failed += len(records)
+                logger.exception(
+                    "kafka record failed: %s",
+                    [f"{r.topic}-{r.partition}@{r.offset}" for r in records],
+                )
+            finally:
+                self._durations.append(time.monotonic() - started)
+        finally:
+            for record, (tp, tracker) in zip(records, partitions):
+                if (record.topic, record.partition, record.offset) in undelivered:
+                    # 유실 방지: commit 위치를 이 offset 앞에 고정하고 이후 fetch 중단
+                    self._stall(tp, record.offset)
+                    continue
+                tracker.complete(record.offset)
+            self._slots.release()
+
+    def _stall(self, tp: TopicPartition, offset: int) -> None:
+        self._consumer.pause(tp)
+        self._stalled[tp] = min(offset, self._stalled.get(tp, offset))
+        if tp in self._recoveries:
+            return
+        self._stall_counts[tp] += 1
+        delay = min(
+            self.stall_max_backoff_sec,
+            self.stall_backoff_sec * 2 ** (self._stall_counts[tp] - 1),
+        )
+        logger.error(
+            "kafka partition stalled: %s-%d@%d, retry in %.1fs (stall #%d)",
+            tp.topic,
+            tp.partition,
+            self._stalled[tp],
+            delay,
+            self._stall_counts[tp],
+        )
+        task = asyncio.create_task(self._recover(tp, delay))
+        self._recoveries[tp] = task
+        task.add_done_callback(lambda _: self._recoveries.pop(tp, None))
+
+    async def _recover(self, tp: TopicPartition, delay: float) -> None:
+        """backoff 후 정지된 offset으로 되돌아가 partition 재개"""
+        await asyncio.sleep(delay)
+        # 진행 중인 작업이 끝나야 offset 추적을 초기화할 수 있음
+        await self.drain({tp}, timeout=None)
+        if (offset := self._stalled.pop(tp, None)) is None:
+            return  # rebalance로 회수됨
+        # 정지 offset 이후 record는 다시 수신되므로 추적 상태 초기화
+        self._trackers[tp] = OffsetTracker()
+        try:
+            self._consumer.seek(tp, offset)
+        except Exception as e:
+            logger.error("kafka seek failed: %s-%d: %s", tp.topic, tp.partition, e)
+            return
+        self._consumer.resume(tp)
+        logger.warning(
+            "kafka partition resumed: %s-%d from offset %d",
+            tp.topic,
+            tp.partition,
+            offset,
+        )
+
+    def _on_done(
+        self,
+        tps: set[TopicPartition],
+        keys: list[tuple[TopicPartition, bytes]],
+        task: asyncio.Task,
+    ) -> None:
+        for key in keys:
+            if self._key_tails.get(key) is task:
+                del self._key_tails[key]
+        for tp in tps:
+            tasks = self._tasks[tp]
+            tasks.discard(task)
+            if tp not in self._stalled and not task.cancelled():
+                # 재개 후 정상 처리되면 backoff 초기화
+                self._stall_counts.pop(tp, None)
+            if (
+                len(tasks) < self.max_per_partition
+                and tp not in self._stalled
+                and tp in self._consumer.paused()
+            ):
+                self._consumer.resume(tp)
+
+    def pending_commits(self) -> dict[TopicPartition, int]:
+        return {
+            tp: tracker.committable
+            for tp, tracker in self._trackers.items()
+            if tracker.committable is not None
+            and tracker.committable != self._committed.get(tp)
+        }
+
+    async def commit(self) -> None:
+        if not (offsets := self.pending_commits()):
+            return
+        await self._consumer.commit(offsets)
+        self._committed.update(offsets)
+        logger.debug("kafka commit: %s", offsets)
+
+    async def drain(
+        self,
+        partitions: set[TopicPartition] | None = None,
+        timeout: float | None = 30.0,
+    ) -> None:
+        """대상 partition의 in-flight 작업 완료 대기 (timeout 초과분은 미commit으로 남음)"""
+        tasks = {
+            task
+            for tp, tp_tasks in self._tasks.items()
+            if partitions is None or tp in partitions
+            for task in tp_tasks
+        }
+        if not tasks:
+            return
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+        if pending:
+            logger.warning("kafka drain timeout: %d task(s) not finished", len(pending))
+
+    def close(self) -> None:
+        # 종료시 대기 중인 partition 재개 작업 취소
+        for task in list(self._recoveries.values()):
+            task.cancel()
+
+    def forget(self, partitions: set[TopicPartition]) -> None:
+        # rebalance로 회수된 partition 상태 제거
+        for tp in partitions:
+            self._trackers.pop(tp, None)
+            self._committed.pop(tp, None)
+            self._stalled.pop(tp, None)
+            self._stall_counts.pop(tp, None)
+            if (task := self._recoveries.pop(tp, None)) is not None:
+                task.cancel()
+
+    def stats(self) -> dict:
+        durations = sorted(self._durations)
+
+        def pct(p: float) -> float:
+            if not durations:
+                return 0.0
+            idx = min(len(durations) - 1, int(len(durations) * p))
+            return round(durations[idx] * 1000, 1)
+
+        partitions = {}
+        for tp, tracker in self._trackers.items():
+            highwater = self._consumer.highwater(tp)
+            committed = self._committed.get(tp)
+            partitions[f"{tp.topic}-{tp.partition}"] = {
+                "inflight": len(self._tasks[tp]),
+                "uncommitted": len(tracker),
+                "committed": committed,
+                "highwater": highwater,
+                "lag": (
+                    highwater - committed
+                    if highwater is not None and committed is not None
+                    else None
+                ),
+                "paused": tp in self._consumer.paused(),
+                "stalled": tp in self._stalled,
+                "stalled_offset": self._stalled.get(tp),
+            }
+        return {
+            "inflight": self.inflight,
+            "processed": self.processed,
+            "failed": self.failed,
+            "processing_ms": {"p50": pct(0.5), "p95": pct(0.95), "max": pct(1.0)},
+            "partitions": partitions,
+        }
@@ -0,0 +1,106 @@
+import asyncio
+import time
+from collections import OrderedDict, defaultdict
+from core.config import settings
+from infra.messaging.kafka.aio_kafka import KafkaBridge
+from infra.messaging.websocket.manager import ws_manager
+from utils.logging import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ReplyRegistry:
+    """
+    trace_id별 최종 결과 대기 (Kafka request/reply).
+    모든 replica가 결과 topic을 구독하므로, HTTP 요청을 받은 replica가 직접 결과를 받는다.
+    대기자가 없을 때 도착한 결과도 long-poll 조회를 위해 ttl 동안 보관한다.
+    """
+
+    def __init__(self, max_results: int = 1024, ttl_sec: float = 300.0):
+        self.max_results = max_results
+        self.ttl_sec = ttl_sec
+        self._waiters: dict[str, list[asyncio.Future]] = defaultdict(list)
+        self._results: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+
+    def resolve(self, trace_id: str, value: dict) -> None:
+        self._results[trace_id] = (time.monotonic() + self.ttl_sec, value)
+        self._results.move_to_end(trace_id)
+        while len(self._results) > self.max_results:
+            self._results.popitem(last=False)
+        for future in self._waiters.pop(trace_id, []):
+            if not future.done():
+                future.set_result(value)
+
+    def get(self, trace_id: str) -> dict | None:
+        if (entry := self._results.get(trace_id)) is None:
+            return None
+        expires, value = entry
+        if expires < time.monotonic():
+            del self._results[trace_id]
+            return None
+        return value
+
+    async def wait(self, trace_id: str, timeout: float) -> dict | None:
+        """결과가 오면 반환, timeout이면 None"""
+        if (value := self.get(trace_id)) is not None or timeout <= 0:
+            return value
+        future = asyncio.get_running_loop().create_future()
+        waiters = self._waiters[trace_id]
+        waiters.append(future)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            if future in waiters:
+                waiters.remove(future)
+            if not waiters and self._waiters.get(trace_id) is waiters:
+                del self._waiters[trace_id]
+
+    def stats(self) -> dict:
+        return {
+            "waiting": sum(len(w) for w in self._waiters.values()),
+            "cached": len(self._results),
+        }
+
+
+reply_registry = ReplyRegistry(
+    max_results=settings.reply_cache_size, ttl_sec=settings.reply_cache_ttl_sec
+)
+
+
+async def publish_result(
+    value: dict,
+    trace_id: str | None = None,
+    client_id: str | None = None,
+) -> None:
+    """
+    처리 결과 전달.
+    결과 topic이 설정되어 있으면 topic으로 발행하고(모든 replica가 수신),
+    각 replica는 자신에게 연결된 socket에만 전달한다.
+    topic이 없으면 현재 pod의 socket으로 바로 전달한다.
+    """
+    message = dict(target=client_id, trace_id=trace_id, value=value)
+    bridge = KafkaBridge()
+    if settings.kafka_result_topic and bridge.started:
+        # ack 대기 없이 전송 (같은 key는 같은 partition이므로 순서 유지)
+        await bridge.enqueue_message(
+            settings.kafka_result_topic, key=client_id or trace_id, value=message
+        )
+        return
+    await deliver_local(message)
+
+
+async def deliver_local(message: dict) -> None:
+    """
+    결과 topic에서 받은 메시지를 이 replica에 연결된 대상 socket으로 전달.
+    최종 결과(스트리밍 중간 frame 제외)는 HTTP 대기 요청에도 전달한다.
+    """
+    value = message["value"]
+    if (trace_id := message.get("trace_id")) and value.get("type") in (None, "done"):
+        reply_registry.resolve(trace_id, value)
+    target = message.get("target")
+    await ws_manager.broadcast(
+        dict(value=value),
+        (lambda s: s.client_id == target) if target else (lambda s: True),
+    )
@@ -1,46 +1,227 @@
 from langchain_core.retrievers import BaseRetriever
 from langchain_core.documents import Document
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForRetrieverRun,
+    CallbackManagerForRetrieverRun,
+)
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
+from langchain_core.output_parsers import StrOutputParser
 from infra.db import qdrant, postgre
+from infra.db.bm25 import BM25Index, get_bm25_index
+from infra.db.qdrant_filter import compile_predicate
+from core.db import vdb
+from core.config import settings
 from utils.logging import logging, log_block_ctx
+from utils.lru_cache import LRUCache
 from langchain_classic.retrievers import (
-    MultiQueryRetriever,
     multi_query,
     ParentDocumentRetriever,
 )
 from langchain_classic.prompts import ChatPromptTemplate
 from langchain_classic.retrievers import SelfQueryRetriever
 from langchain_classic.chains.query_constructor.schema import AttributeInfo
-from typing import cast
+from typing import Any, Callable, cast
 from langchain_classic.retrievers.multi_vector import SearchType
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from core.db.rdb import get_rdb
+from qdrant_client import QdrantClient, AsyncQdrantClient
+from qdrant_client.http.models import Filter, QueryRequest, SearchParams
 
 logger = logging.getLogger(__name__)
 
+# (llm, 정규화된 질의) -> 생성된 질의 변형 목록
+_query_variant_cache: LRUCache[tuple[str, str], list[str]] = LRUCache(
+    maxsize=settings.multi_query_cache_size
+)
+
+# Reciprocal Rank Fusion 상수
+RRF_K = 60
+
+
+def _normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def _document_from_point(point, collection_name: str) -> Document:
+    payload = point.payload or {}
+    metadata = dict(payload.get("metadata") or {})
+    metadata["_id"] = point.id
+    metadata["_collection_name"] = collection_name
+    return Document(page_content=payload.get("page_content", ""), metadata=metadata)
+
+
+class ParallelMultiQueryRetriever(BaseRetriever):
+    """
+    LLM으로 질의 변형을 생성한 뒤, 원 질의와 변형 전체를
+    한번의 임베딩 호출과 한번의 Qdrant batch query로 조회한다.
+    결과는 point id로 중복 제거하고 RRF로 점수를 합산한다.
+    """
+
+    client: QdrantClient
+    async_client: AsyncQdrantClient | None = None
+    embedder: Embeddings
+    llm: BaseChatModel
+    collection_name: str
+    query_filter: Filter | None = None
+    search_params: SearchParams | None = None
+    top_k: int = 3
+    include_original: bool = True
+
+    def _variant_key(self, query: str) -> tuple[str, str]:
+        model = getattr(self.llm, "model_name", type(self.llm).__name__)
+        return (model, _normalize_query(query))
+
+    def _variant_chain(self):
+        prompt = ChatPromptTemplate.from_template(
+            multi_query.DEFAULT_QUERY_PROMPT.template
+        )
+        return prompt | self.llm | StrOutputParser()
+
+    def _cache_variants(self, key: tuple[str, str], text: str) -> list[str]:
+        variants = list(
+            dict.fromkeys(line.strip() for line in text.splitlines() if line.strip())
+        )
+        _query_variant_cache.put(key, variants)
+        return variants
+
+    def generate_queries(self, query: str) -> list[str]:
+        key = self._variant_key(query)
+        if (cached := _query_variant_cache.get(key)) is not None:
+            return cached
+        text = self._variant_chain().invoke({"question": query})
+        return self._cache_variants(key, text)
+
+    async def agenerate_queries(self, query: str) -> list[str]:
+        key = self._variant_key(query)
+        if (cached := _query_variant_cache.get(key)) is not None:
+            return cached
+        text = await self._variant_chain().ainvoke({"question": query})
+        return self._cache_variants(key, text)
+
+    def _requests(self, vectors: list[list[float]]) -> list[QueryRequest]:
+        return [
+            QueryRequest(
+                query=vector,
+                filter=self.query_filter,
+                params=self.search_params,
+                limit=self.top_k,
+                with_payload=True,
+            )
+            for vector in vectors
+        ]
+
+    def _fuse(self, responses) -> list[Document]:
+        # point id 기준 dedupe + RRF 점수 합산
+        fused: dict[Any, tuple[float, Any]] = {}
+        for response in responses:
+            for rank, point in enumerate(response.points):
+                score, _ = fused.get(point.id, (0.0, point))
+                fused[point.id] = (score + 1.0 / (RRF_K + rank + 1), point)
+
+        ranked = sorted(fused.values(), key=lambda x: x[0], reverse=True)
+        docs = []
+        for score, point in ranked[: self.top_k]:
+            doc = _document_from_point(point, self.collection_name)
+            doc.metadata["_score"] = score
+            docs.append(doc)
+        return docs
+
+    def search(self, queries: list[str]) -> list[Document]:
+        vectors = self.embedder.embed_documents(queries)
+        responses = self.client.query_batch_points(
+            collection_name=self.collection_name, requests=self._requests(vectors)
+        )
+        return self._fuse(responses)
+
+    async def asearch(self, queries: list[str]) -> list[Document]:
+        if self.async_client is None:
+            raise ValueError("async_client is required for async search")
+        vectors = await self.embedder.aembed_documents(queries)
+        responses = await self.async_client.query_batch_points(
+            collection_name=self.collection_name, requests=self._requests(vectors)
+        )
+        return self._fuse(responses)
+
+    def _queries(self, query: str, variants: list[str]) -> list[str]:
+        queries = [query, *variants] if self.include_original else variants
+        logger.info("multiQuery variants: %s", queries)
+        return list(dict.fromkeys(queries))
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> list[Document]:
+        return self.search(self._queries(query, self.generate_queries(query)))
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> list[Document]:
+        variants = await self.agenerate_queries(query)
+        return await self.asearch(self._queries(query, variants))
+
+
+class BM25Retriever(BaseRetriever):
+    """로컬 BM25 색인 기반 키워드 검색 (Qdrant 미사용)"""
+
+    index: BM25Index
+    top_k: int = 3
+    predicate: Callable[[dict], bool] | None = None
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> list[Document]:
+        predicate = self.predicate
+        results = self.index.search(
+            query,
+            self.top_k,
+            predicate=(lambda d: predicate(d.metadata)) if predicate else None,
+        )
+        for doc, score in results:
+            doc.metadata["_score"] = score
+        return [doc for doc, _ in results]
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> list[Document]:
+        # mmap 색인 조회는 네트워크 I/O가 없으므로 이벤트 루프에서 바로 수행
+        return self._get_relevant_documents(
+            query, run_manager=run_manager.get_sync()
+        )
+
 
 class RetrieverFactory:
+    # 이름 -> 생성 method
+    _CREATORS = {
+        "qdrant": "qdrant_retriever",
+        "multiQuery": "multi_query_retriever",
+        "selfQuery": "self_query_retriever",
+        "parentDocument": "parent_document_retriever",
+        "bm25": "bm25_retriever",
+    }
+
+    @classmethod
+    def names(cls) -> frozenset[str]:
+        return frozenset(cls._CREATORS)
+
     def __init__(self, retriever_name: str, filter, top_k: int):
         self.retriever_name = retriever_name
         self.filter = filter
         self.top_k = top_k
 
     def create(self, **kwargs) -> BaseRetriever:
-        retrievers = {
-            "qdrant": self.qdrant_retriever,
-            "multiQuery": self.multi_query_retriever,
-            "selfQuery": self.self_query_retriever,
-            "parentDocument": self.parent_document_retriever,
-        }
-        retriever = retrievers.get(self.retriever_name, None)
-        if retriever is None:
+        creator = self._CREATORS.get(self.retriever_name)
+        if creator is None:
             raise ValueError(f"Unknown retriever: {self.retriever_name}")
-        return cast(BaseRetriever, retriever(**kwargs))
+        return cast(BaseRetriever, getattr(self, creator)(**kwargs))
 
     @log_block_ctx(logger, "qdrant_retriever")
     def qdrant_retriever(self, **kwargs) -> BaseRetriever:
         return qdrant.get_vectorstore().as_retriever(
             search_type="similarity",
-            search_kwargs={"k": self.top_k, "filter": self.filter},
+            search_kwargs={
+                "k": self.top_k,
+                "filter": self.filter,
+                "search_params": vdb.get_qdrant_client().profile.search_params(),
+            },
         )
 
     @log_block_ctx(logger, "multiQuery retriever")
@@ -49,23 +230,34 @@ class RetrieverFactory:
         if not (llm := kwargs.get("llm")):
             raise ValueError("llm is required for multiQuery retriever")
 
-        # base retriever
-        retriever = RetrieverFactory("qdrant", self.filter, self.top_k).create(**kwargs)
+        from services.llm.embedding import embedding
 
-        prompt = ChatPromptTemplate.from_template(
-            multi_query.DEFAULT_QUERY_PROMPT.template
+        provider = kwargs.get("qdrant") or vdb.get_qdrant_client()
+        return ParallelMultiQueryRetriever(
+            client=provider.client,
+            async_client=provider.async_client,
+            embedder=kwargs.get("embedder") or embedding,
+            llm=llm,
+            collection_name=kwargs.get("collection") or settings.qdrant_collection,
+            query_filter=self.filter,
+            search_params=provider.profile.search_params(),
+            top_k=self.top_k,
         )
 
-        return MultiQueryRetriever.from_llm(llm=llm, retriever=retriever, prompt=prompt)
+    @log_block_ctx(logger, "bm25 retriever")
+    def bm25_retriever(self, **kwargs) -> BaseRetriever:
+        if not settings.bm25_enabled:
+            raise ValueError("bm25 retriever is disabled")
+
+        return BM25Retriever(
+            index=get_bm25_index(),
+            top_k=self.top_k,
+            predicate=compile_predicate(kwargs.get("filter_spec")),
+        )
 
     @log_block_ctx(logger, "selfQuery retriever")
     def self_query_retriever(self, **kwargs) -> BaseRetriever:
 
-        # from langchain_community.retrievers.bm25 import BM25Retriever
-
-        # return BM25Retriever.from_texts(
-        #     kwargs.get("texts", ""), metadatas=[{"filter": filter}]
-        # )
         # 문서
         metadata_field_info = [
             AttributeInfo(
@@ -93,12 +285,8 @@ class RetrieverFactory:
     def parent_document_retriever(self, **kwargs) -> BaseRetriever:
         if not (kwargs.get("child_splitter") and kwargs.get("parent_splitter")):
             raise ValueError("child_splitter and parent_splitter is required")
-        # parent store용
-        with get_rdb() as session:
-            doc_store = postgre.PostgresDocStore(conn=session)
-
-        if doc_store is None:
-            raise ValueError("doc_store is required for parentDocument retriever")
+        # parent store용 (커넥션풀 + LRU 캐시)
+        doc_store = postgre.get_parent_docstore()
 
         retriever = ParentDocumentRetriever(
             vectorstore=qdrant.get_vectorstore(),
@@ -107,11 +295,12 @@ class RetrieverFactory:
             child_splitter=kwargs.get("child_splitter", ""),
             parent_splitter=kwargs.get("parent_splitter", ""),
             search_type=SearchType.similarity,
-            search_kwargs={"k": self.top_k},
+            search_kwargs={
+                "k": self.top_k,
+                "search_params": vdb.get_qdrant_client().profile.search_params(),
+            },
         )
 
-        logging.info(f"parent document retriever called: {doc_store.mget(["48"])}")
-
         return retriever
 
 
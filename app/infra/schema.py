@@ -1,3 +1,4 @@
+import orjson
 from pydantic import BaseModel, Field
 from typing import Any, Dict, Protocol
 
@@ -13,7 +14,25 @@ class StompFrameModel(BaseModel):
     headers: Dict[str, Any] = Field(
         default_factory=dict, description="Headers of the STOMP frame"
     )
-    body: str = Field("", description="Body content of the STOMP frame")
+    body: str | Dict[str, Any] = Field(
+        "", description="Body content of the STOMP frame (JSON 문자열 또는 구조)"
+    )
+
+    @classmethod
+    def from_record(cls, value: dict) -> "StompFrameModel":
+        # kafka record는 producer가 model_dump로 만든 값이므로 검증 생략 (lazy)
+        # body 검증은 command 처리시 요청 model에서 수행
+        return cls.model_construct(
+            command=value["command"],
+            headers=value.get("headers") or {},
+            body=value.get("body", ""),
+        )
+
+    def json_body(self) -> dict:
+        # 이전 producer는 body를 JSON 문자열로 발행
+        if isinstance(self.body, dict):
+            return self.body
+        return orjson.loads(self.body)
 
 
 # kafka ws.in payload
@@ -14,14 +14,35 @@ logger = get_logger(__name__)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    from infra.messaging.kafka.consumer_handler import kafka_consumer_handler
+    from infra.messaging.kafka.consumer_handler import (
+        kafka_consumer_handler,
+        kafka_batch_handler,
+    )
     from infra.messaging.kafka.aio_kafka import KafkaBridge
+    from infra.messaging.result_channel import deliver_local
     from core.db.rdb import create_tables
     from models.parent_documents import ParentDocument
+    from models.llm_cache import LlmCacheEntry
+    from services.llm.cache import init_llm_cache
 
     # table 생성
     await create_tables()
 
+    # LLM 응답 캐시 등록
+    init_llm_cache()
+
+    # bm25 색인 로드 (mmap)
+    if settings.bm25_enabled:
+        from infra.db.bm25 import get_bm25_index
+
+        get_bm25_index()
+
+    # rerank 모델 로드 (첫 요청이 로드 시간으로 budget을 넘지 않도록)
+    if settings.rerank_enabled:
+        from api.deps import _rag_query_service
+
+        await asyncio.to_thread(_rag_query_service.reranker.warmup)
+
     # main event loop 저장
     config.MAIN_LOOP = asyncio.get_running_loop()
 
@@ -39,6 +60,9 @@ async def lifespan(app: FastAPI):
         tin=settings.kafka_topic,
         tout=settings.kafka_topic,
         consumer_callback=kafka_consumer_handler,
+        batch_callback=kafka_batch_handler,
+        result_topic=settings.kafka_result_topic,
+        result_callback=deliver_local,
         event_loop=config.MAIN_LOOP,
     )
     # kafka_service.set_event_loop(el.MAIN_LOOP)
@@ -3,6 +3,7 @@ from models.parent_documents import ParentDocument
 from schemas.source import ParentDocumentDto
 from sqlalchemy import select, Sequence
 from langchain_core.documents import Document
+from infra.db.postgre import parent_document_cache
 import ast
 import json
 
@@ -31,6 +32,8 @@ class ParentDocumentRepository:
         await self.db.flush()
         for m in models:
             await self.db.refresh(m)
+        # 신규/재사용 id의 stale 캐시 제거
+        parent_document_cache.invalidate(str(m.id) for m in models)
 
         return [
             Document(
@@ -57,7 +60,9 @@ class ParentDocumentRepository:
     async def update(self, user: ParentDocument) -> ParentDocument:
         await self.db.flush()
         await self.db.refresh(user)
+        parent_document_cache.invalidate([str(user.id)])
         return user
 
     async def delete(self, user: ParentDocument) -> None:
         await self.db.delete(user)
+        parent_document_cache.invalidate([str(user.id)])
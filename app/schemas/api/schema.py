@@ -1,7 +1,7 @@
 from typing import List, Dict, Any, Optional
 from schemas.base import AppBaseModel, MetaResponse
 from pydantic import Field
-from services.dto.rag import RagHit
+from services.dto.rag import QueryByRagResult, RagHit
 
 
 class RagPipelineResponse(MetaResponse):
@@ -13,17 +13,24 @@ class QueryByRagRequest(AppBaseModel):
     top_k: int = 3
     llm: str = ""
     retriever: str = "qdrant"
-    filter: dict[str, str] = Field(
+    filter: dict[str, Any] = Field(
         default_factory=dict,
         examples=[{"producer": "ESP Ghostscript 7.07"}],
     )
+    stream: bool = Field(default=False, description="답변 토큰을 websocket으로 스트리밍")
+    client_id: str | None = Field(
+        default=None, description="결과를 전달받을 websocket client_id (없으면 전체)"
+    )
 
 
 from datetime import datetime
 
 
 class QueryByRagResponse(MetaResponse):
+    # OK: 요청 접수, DONE: 답변 포함, PENDING: 대기시간 초과 (trace_id로 재조회)
+    # worker에서 최종 실패한 요청은 응답 대신 502 오류
     result: str = Field(default="OK")
+    answer: QueryByRagResult | None = None
 
 
 class AgentRequest(AppBaseModel):
@@ -38,15 +45,41 @@ class AgentResponse(MetaResponse):
 
 class QueryVdbRequest(AppBaseModel):
     query: str
-    filter: dict[str, str] = Field(
+    filter: dict[str, Any] = Field(
         default_factory=dict,
         examples=[{"metadata.producer": "Skia/PDF m128"}],
     )
     top_k: int = 3
     retriever: str = "qdrant"
+    fields: list[str] | None = Field(
+        default=None,
+        description="반환할 payload 경로 (ex. metadata.page), 미지정시 전체",
+        examples=[["metadata.page"]],
+    )
+    with_text: bool = Field(default=True, description="false면 chunk 본문 제외")
 
 
 class QueryVdbResponse(MetaResponse):
     result: str
     hits: List[RagHit]
     model_config = {"extra": "ignore"}
+
+
+class QueryVdbBatchRequest(AppBaseModel):
+    queries: list[str] = Field(min_length=1, max_length=100)
+    filter: dict[str, Any] = Field(
+        default_factory=dict,
+        examples=[{"metadata.producer": "Skia/PDF m128"}],
+    )
+    top_k: int = 3
+    fields: list[str] | None = None
+    with_text: bool = True
+
+
+class QueryVdbBatchItem(AppBaseModel):
+    query: str
+    hits: List[RagHit]
+
+
+class QueryVdbBatchResponse(MetaResponse):
+    results: List[QueryVdbBatchItem]
@@ -0,0 +1,77 @@
+"""
+micro-benchmark: 추출 압축 전후 context 토큰 수와 압축/packing 소요시간
+실행: cd app && python -m scripts.bench_compressor
+"""
+
+import random
+import timeit
+from services.dto.rag import RagHit
+from services.retrieval.compressor import ExtractiveCompressor
+from services.retrieval.context_packer import ContextPacker
+
+_QUERY_WORDS = ["배출증", "출력", "수수료", "납부"]
+
+
+def _vocab(rng: random.Random, size: int = 2000) -> list[str]:
+    # 한글 2~3음절 임의 단어 (중복 제거 단계에 걸리지 않도록 충분히 다양하게)
+    return [
+        "".join(chr(rng.randrange(0xAC00, 0xD7A4)) for _ in range(rng.randint(2, 3)))
+        for _ in range(size)
+    ]
+
+
+def make_hits(n_hits: int, sentences: int, seed: int = 0) -> list[RagHit]:
+    rng = random.Random(seed)
+    words = _vocab(rng)
+    hits = []
+    offset = 0
+    for i in range(n_hits):
+        # 문장 4개 중 1개 꼴로 질의어 포함
+        text = " ".join(
+            " ".join(
+                rng.choices(words, k=11)
+                + (rng.choices(_QUERY_WORDS, k=1) if rng.random() < 0.25 else [])
+            )
+            + "."
+            for _ in range(sentences)
+        )
+        hits.append(
+            RagHit(
+                page_content=text,
+                score=1.0 - i / n_hits,
+                source="a.pdf",
+                metadata={"page": i // 4, "start_index": offset},
+            )
+        )
+        offset += len(text) + 1
+    return hits
+
+
+def main(n: int = 200) -> None:
+    query = " ".join(_QUERY_WORDS)
+    hits = make_hits(n_hits=20, sentences=8)
+    compressor = ExtractiveCompressor(ratio=0.6, min_chars=200)
+    packer = ContextPacker()
+    budget = 100_000
+
+    raw = packer.pack(hits, budget)
+    compressed = packer.pack(compressor.compress(query, hits), budget)
+    compress_us = (
+        timeit.timeit(lambda: compressor.compress(query, hits), number=n) / n * 1e6
+    )
+    pack_us = timeit.timeit(lambda: packer.pack(hits, budget), number=n) / n * 1e6
+    both_us = (
+        timeit.timeit(
+            lambda: packer.pack(compressor.compress(query, hits), budget), number=n
+        )
+        / n
+        * 1e6
+    )
+    print(f"context tokens   : {raw.tokens} -> {compressed.tokens}")
+    print(f"compress         : {compress_us:.1f}us/call")
+    print(f"pack (raw)       : {pack_us:.1f}us/call")
+    print(f"compress + pack  : {both_us:.1f}us/call")
+
+
+if __name__ == "__main__":
+    main()
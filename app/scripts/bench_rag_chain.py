@@ -0,0 +1,28 @@
+"""
+micro-benchmark: 요청마다 prompt/chain 구성 vs 캐시된 chain 재사용
+실행: cd app && python -m scripts.bench_rag_chain
+"""
+
+import timeit
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.output_parsers import StrOutputParser
+from services.rag_service import RAG_PROMPT, rag_prompt
+
+
+def main(n: int = 500) -> None:
+    fake_llm = FakeListChatModel(responses=["답변"])
+    inputs = {"context": "배출증 출력은 메뉴에서 선택합니다.", "input": "배출증 출력"}
+
+    def per_request():
+        return (rag_prompt() | fake_llm | StrOutputParser()).invoke(inputs)
+
+    cached = RAG_PROMPT | fake_llm | StrOutputParser()
+    build_us = timeit.timeit(per_request, number=n) / n * 1e6
+    cached_us = timeit.timeit(lambda: cached.invoke(inputs), number=n) / n * 1e6
+    print(f"per-request build: {build_us:.1f}us/call")
+    print(f"cached chain     : {cached_us:.1f}us/call")
+    print(f"saved            : {build_us - cached_us:.1f}us/call")
+
+
+if __name__ == "__main__":
+    main()
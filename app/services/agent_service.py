@@ -7,6 +7,7 @@ from utils.logging import logging, log_block_ctx
 from core.config import settings
 from typing import cast
 from services.llm.llm_provider import select_llm
+from services.llm.scheduler import Priority, priority_scope
 import os
 
 logger = logging.getLogger(__name__)
@@ -20,10 +21,6 @@ class AgentService:
     ):
         self.llm = select_llm(settings.llm_model_name)
 
-    # llm_model설정
-    def llm_model(self, model_name: str):
-        self.llm = select_llm(model_name)
-
     def chat(
         self,
         query: str,
@@ -35,15 +32,17 @@ class AgentService:
             StateGraphInterface,
         )
 
+        # agent 작업은 대화형 질의보다 낮은 우선순위로 LLM slot 대기
         agent: StateGraphInterface = DataCollectorAgent(llm_model)
-        r = agent.run(
-            data_sources=[
-                {
-                    "name": "계약서",
-                    "source_type": "file",
-                    "path": f"{query}",
-                }
-            ]
-        )
+        with priority_scope(Priority.AGENT):
+            r = agent.run(
+                data_sources=[
+                    {
+                        "name": "계약서",
+                        "source_type": "file",
+                        "path": f"{query}",
+                    }
+                ]
+            )
 
         return QueryByRagResult(answer=str(r), hits=[])
@@ -1,14 +1,24 @@
 import asyncio
-import orjson
+import time
+from collections import defaultdict
+from typing import Awaitable
+from core.config import settings
+from core.exception.customs import PartialResultException
 from utils.logging import logging, log_block_ctx, log_execution_block
 from infra.schema import StompFrameModel, InboundMessage, OutboundMessage
-from infra.messaging.websocket.manager import ws_manager
+from infra.messaging.result_channel import publish_result
 from services.ingest_service import RagIngestService
-from api.deps import get_ingest_service
+from services.dto.rag import QueryByRagRequest
+from services.llm.scheduler import Priority, priority_scope
 
 logger = logging.getLogger(__name__)
 
 
+def client_id_of(stomp: StompFrameModel) -> str | None:
+    # 결과를 전달받을 websocket client (없으면 전체 전달)
+    return stomp.headers.get("client-id")
+
+
 class CommandDispatcher:
 
     @log_execution_block(title="KafkaConsumerHandler")
@@ -16,17 +26,140 @@ class CommandDispatcher:
         stomp: StompFrameModel = message["value"]
         match (stomp.command.lower()):
             case "pipeline-start":
-                return await self.pipeline_start(stomp)
+                return await self.pipeline_start(stomp, trace_id=message.get("key"))
 
             case "query-by-rag":
-                return await self.query_by_rag(stomp)
+                return await self.query_by_rag(stomp, trace_id=message.get("key"))
 
             case _:
                 raise ValueError(f"Unknown command received: {message}")
 
+    @log_execution_block(title="KafkaBatchHandler")
+    async def dispatch_batch(
+        self, messages: list[dict]
+    ) -> list[tuple[dict, BaseException]]:
+        """
+        command별로 묶어서 처리하고, 실패한 (메시지, 예외) 목록을 반환
+        - query-by-rag: 검색을 임베딩 1회 + qdrant batch query 1회로 처리
+        - pipeline-start: 여러 파일을 한번에 적재
+        묶음 처리 자체가 실패하면 묶인 메시지 전체가 실패로 반환된다.
+        """
+        groups: dict[str, list[dict]] = defaultdict(list)
+        for message in messages:
+            groups[message["value"].command.lower()].append(message)
+
+        jobs: list[tuple[list[dict], Awaitable]] = []
+        for command, group in groups.items():
+            match command:
+                case "pipeline-start":
+                    # 적재는 대화형 요청보다 뒤에 LLM slot을 받음
+                    # (task 생성시 context가 복사되므로 job별로 우선순위 적용)
+                    with priority_scope(Priority.BATCH):
+                        job = asyncio.create_task(self.pipeline_start_batch(group))
+                    jobs.append((group, job))
+                case "query-by-rag":
+                    # 사용자 질의는 batch로 소비해도 대화형 우선순위 유지
+                    jobs.append((group, self.query_by_rag_batch(group)))
+                case _:
+                    jobs.extend(([m], self.dispatch(m)) for m in group)
+
+        results = await asyncio.gather(
+            *(job for _, job in jobs), return_exceptions=True
+        )
+        failures: list[tuple[dict, BaseException]] = []
+        for (group, _), result in zip(jobs, results):
+            if isinstance(result, BaseException):
+                failures.extend((m, result) for m in group)
+            elif isinstance(result, list):
+                failures.extend(result)
+        return failures
+
+    @log_execution_block(title="pipeline_batch")
+    async def pipeline_start_batch(
+        self, messages: list[dict]
+    ) -> list[tuple[dict, BaseException]]:
+        from api.deps import get_ingest_service
+
+        service: RagIngestService = get_ingest_service()
+        stomps: list[StompFrameModel] = [m["value"] for m in messages]
+        results = await service.ingest_many([stomp.body for stomp in stomps])
+        # 파일별 실패는 해당 메시지만 실패 처리
+        failures: list[tuple[dict, BaseException]] = []
+        for message, stomp, result in zip(messages, stomps, results):
+            if isinstance(result, BaseException):
+                failures.append((message, result))
+            elif result:
+                answer = f"{stomp.body}: upload completed."
+                await publish_result(
+                    dict(answer=answer, hits=[]),
+                    trace_id=message.get("key"),
+                    client_id=client_id_of(stomp),
+                )
+        return failures
+
+    @log_execution_block(title="query_by_rag_batch")
+    async def query_by_rag_batch(
+        self, messages: list[dict]
+    ) -> list[tuple[dict, BaseException]]:
+        from api.deps import _rag_query_service as svc
+
+        failures: list[tuple[dict, BaseException]] = []
+        # 스트리밍 요청은 건별로 처리
+        streams: list[tuple[dict, dict]] = []
+        pending: list[tuple[dict, QueryByRagRequest]] = []
+        for message in messages:
+            # 잘못된 요청(poison)은 해당 메시지만 실패 처리
+            try:
+                body = message["value"].json_body()
+                if not isinstance(body, dict):
+                    raise ValueError(f"Invalid query-by-rag body: {body!r}")
+                if body.get("stream"):
+                    streams.append((message, body))
+                else:
+                    pending.append((message, QueryByRagRequest.model_validate(body)))
+            except ValueError as e:
+                failures.append((message, e))
+
+        batch = svc.achat_batch(
+            [req for _, req in pending], [m.get("key") for m, _ in pending]
+        )
+        results, *stream_results = await asyncio.gather(
+            batch,
+            *(
+                self.stream_query_by_rag(
+                    body, message.get("key"), client_id_of(message["value"])
+                )
+                for message, body in streams
+            ),
+            return_exceptions=True,
+        )
+
+        failures.extend(
+            (message, r)
+            for (message, _), r in zip(streams, stream_results)
+            if isinstance(r, BaseException)
+        )
+        # batch 검색 자체가 실패하면 묶인 요청 전체 실패
+        if isinstance(results, BaseException):
+            return [*failures, *((m, results) for m, _ in pending)]
+        for (message, _), result in zip(pending, results):
+            if isinstance(result, BaseException):
+                failures.append((message, result))
+                continue
+            await publish_result(
+                result.model_dump(),
+                trace_id=message.get("key"),
+                client_id=client_id_of(message["value"]),
+            )
+        return failures
+
     @log_execution_block(title="pipeline")
-    async def pipeline_start(self, stomp: StompFrameModel):
+    async def pipeline_start(
+        self, stomp: StompFrameModel, trace_id: str | None = None
+    ):
         async def __handler(message: dict):
+            from api.deps import get_ingest_service
+
             file_name = message.get("body", "")
             service: RagIngestService = get_ingest_service()
             return await service.ingest_stub(file_name=file_name)
@@ -35,47 +168,111 @@ class CommandDispatcher:
             try:
                 result = await __handler(stomp.model_dump())
                 if result:
-                    await ws_manager.broadcast(
-                        dict(
-                            value=dict(
-                                answer=f"{stomp.body}: upload completed.",
-                                hits=[],
-                            ),
-                        ),
-                        lambda x: True,
+                    await publish_result(
+                        dict(answer=f"{stomp.body}: upload completed.", hits=[]),
+                        trace_id=trace_id,
+                        client_id=client_id_of(stomp),
                     )
             except Exception as e:
+                # 재시도/DLQ 처리를 위해 consumer handler로 전달
                 logger.error("Error in pipeline_start: %s", exc_info=e)
+                raise
 
         # ThreadPoolExecutor호출 후, 완료될때까지 대기
         # 에러가 없다면 kafka topic 발행 - topic: pipeline-end
         # 완료 후 websocket broadcast (event loop로 호출)
         # result = await asyncio.to_thread(__handler, message=stomp.model_dump())
 
-        # 기존 루프와 병렬로 실행 (fire-and-forget + 후처리)
-        asyncio.create_task(_run_and_notify())
+        # 완료까지 대기 (worker pool이 완료 후 offset commit)
+        await _run_and_notify()
 
     @log_execution_block(title="query_by_rag")
-    async def query_by_rag(self, stomp: StompFrameModel):
+    async def query_by_rag(self, stomp: StompFrameModel, trace_id: str | None = None):
+        message = stomp.json_body()
+        client_id = client_id_of(stomp)
+        if message.get("stream"):
+            return await self.stream_query_by_rag(message, trace_id, client_id)
+
+        logger.info("background job: %s", message)
+        from api.deps import _rag_query_service as svc
+
+        # 검색/LLM 호출 모두 async 경로로 처리 (worker thread 미사용)
+        result = await svc.achat(
+            query=message["query"],
+            filter=message["filter"],
+            top_k=message["top_k"],
+            llm_model=message["llm"],
+            retriever_name=message["retriever"],
+            trace_id=trace_id,
+        )
+        logger.info("LLM answers: %s", result.model_dump())
+        if result:
+            await publish_result(
+                result.model_dump(), trace_id=trace_id, client_id=client_id
+            )
+            logger.info(f"result published: {result.model_dump()}")
+
+    # 검색결과 -> 토큰 묶음 -> 완료 frame 순으로 websocket 전송
+    @log_execution_block(title="stream_query_by_rag")
+    async def stream_query_by_rag(
+        self, message: dict, trace_id: str | None, client_id: str | None = None
+    ):
+        from api.deps import _rag_query_service as svc
 
-        def _handler(message: dict):
-            logger.info("background job: %s", message)
-            from api.deps import _rag_query_service as svc
+        sent = False
 
-            result = svc.chat(
+        async def send(frame: dict):
+            nonlocal sent
+            await publish_result(
+                dict(trace_id=trace_id, **frame),
+                trace_id=trace_id,
+                client_id=client_id,
+            )
+            sent = True
+
+        hits: list = []
+        answer: list[str] = []
+        buffer: list[str] = []
+        usage: dict | None = None
+        last_flush = time.perf_counter()
+
+        try:
+            async for kind, data in svc.astream_chat(
                 query=message["query"],
                 filter=message["filter"],
                 top_k=message["top_k"],
                 llm_model=message["llm"],
                 retriever_name=message["retriever"],
-            )
-            logger.info("LLM answers: %s", result.model_dump())
-            return result
+                trace_id=trace_id,
+            ):
+                if kind == "hits":
+                    hits = [h.model_dump() for h in data]
+                    await send(dict(type="hits", hits=hits))
+                    continue
+                if kind == "usage":
+                    usage = data.model_dump()
+                    continue
 
-        result = await asyncio.to_thread(_handler, message=orjson.loads(stomp.body))
-        if result:
-            await ws_manager.broadcast(
-                dict(value=result.model_dump()),
-                lambda x: True,
+                answer.append(data)
+                buffer.append(data)
+                # 토큰을 조금씩 모아 전송 (frame 수 절감)
+                now = time.perf_counter()
+                if (
+                    sum(map(len, buffer)) >= settings.stream_flush_chars
+                    or (now - last_flush) * 1000 >= settings.stream_flush_ms
+                ):
+                    await send(dict(type="token", delta="".join(buffer)))
+                    buffer.clear()
+                    last_flush = now
+
+            if buffer:
+                await send(dict(type="token", delta="".join(buffer)))
+            # 완료 frame은 기존 응답형식(answer, hits)과 사용량을 포함
+            await send(
+                dict(type="done", answer="".join(answer), hits=hits, usage=usage)
             )
-            logger.info(f"websocket broadcast completed: {result.model_dump()}")
+        except Exception as e:
+            if sent:
+                # 이미 전송된 frame이 있으면 재시도하지 않음 (client에 토큰 중복 전송 방지)
+                raise PartialResultException(f"stream interrupted: {e}") from e
+            raise
@@ -13,10 +13,14 @@ class QueryByRagRequest(AppBaseModel):
     top_k: int = 3
     llm: str = ""
     retriever: str = "qdrant"
-    filter: dict[str, str] = Field(
+    filter: dict[str, Any] = Field(
         default_factory=dict,
         examples=[{"producer": "ESP Ghostscript 7.07"}],
     )
+    stream: bool = Field(default=False, description="답변 토큰을 websocket으로 스트리밍")
+    client_id: str | None = Field(
+        default=None, description="결과를 전달받을 websocket client_id (없으면 전체)"
+    )
 
 
 class RagHit(AppBaseModel):
@@ -26,7 +30,20 @@ class RagHit(AppBaseModel):
     metadata: Dict[str, Any]
 
 
+class LlmUsage(AppBaseModel):
+    model: str = ""
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+    llm_calls: int = 0
+    ttft_ms: float | None = Field(default=None, description="스트리밍시 첫 토큰까지")
+    generation_ms: float = 0.0
+    retrieval_ms: float = 0.0
+    total_ms: float = 0.0
+
+
 class QueryByRagResult(AppBaseModel):
     answer: str
     hits: List[RagHit]
+    usage: LlmUsage | None = None
     model_config = {"extra": "ignore"}
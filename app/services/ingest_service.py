@@ -1,3 +1,4 @@
+import asyncio
 from pathlib import Path
 from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
@@ -22,29 +23,76 @@ class RagIngestService:
         self.collection = collection
 
     async def ingest_stub(self, file_name: str) -> RagPipelineResult | None:
+        result = (await self.ingest_many([file_name]))[0]
+        if isinstance(result, BaseException):
+            raise result
+        return result
+
+    async def ingest_many(
+        self, file_names: list[str]
+    ) -> list[RagPipelineResult | BaseException | None]:
+        """
+        파일별로 분할/parent 저장 후, vectorstore와 BM25 적재는 한번에 수행
+        (BM25 segment도 1개만 생성). 파일이 없으면 해당 결과는 None,
+        분할에 실패한 파일은 해당 예외를 결과로 반환한다 (나머지 파일은 적재).
+        """
         from infra.db.qdrant import get_vectorstore
+
+        prepared: list[list[Document] | BaseException | None] = []
+        for file_name in file_names:
+            try:
+                prepared.append(await self._split(file_name))
+            except Exception as e:
+                logger.error("split failed: %s: %s", file_name, str(e))
+                prepared.append(e)
+        split_docs = [
+            doc for docs in prepared if isinstance(docs, list) for doc in docs
+        ]
+        if split_docs:
+            store = get_vectorstore()
+            store.add_documents(split_docs)
+
+            # 키워드 검색용 로컬 BM25 색인 (실패해도 적재는 유지)
+            if settings.bm25_enabled:
+                from infra.db.bm25 import get_bm25_index
+
+                try:
+                    # segment 기록/병합(파일 lock 대기 포함)은 이벤트 루프 밖에서 수행
+                    await asyncio.to_thread(get_bm25_index().add_documents, split_docs)
+                except OSError as e:
+                    logger.error("bm25 indexing failed: %s", str(e))
+
+        return [
+            RagPipelineResult(ingested_chunks=len(docs), pdf_count=1)
+            if isinstance(docs, list)
+            else docs
+            for docs in prepared
+        ]
+
+    async def _split(self, file_name: str) -> list[Document] | None:
         from api.deps import db_session_ctx
         from langchain_community.document_loaders import PyPDFLoader
         from models.parent_documents import ParentDocument
         from repositories.pd_repository import ParentDocumentRepository
 
         # load file with the file_name
-        file_path = Path("/mnt") / (file_name + ".pdf")
+        file_path = Path(settings.pdf_dir) / (file_name + ".pdf")
         logger.info("file_path=%s", file_path)
         if file_path.exists() is False:
             logger.error("File not found: %s", file_path)
             # raise FileNotFoundError(f"File not found: {file_path}")
             return
 
-        vectors = []
         # try:
         loader = PyPDFLoader(file_path)
         docs: list[Document] = loader.load()
 
         # parent chunk
+        # start_index: 검색결과 조립시 이어지는 chunk 병합 기준 (ContextPacker)
         parent_splitter = RecursiveCharacterTextSplitter(
             chunk_size=settings.chunk_size * 3,
             chunk_overlap=settings.chunk_overlap * 3,
+            add_start_index=True,
         )
         parent_split_docs = parent_splitter.split_documents(docs)
 
@@ -54,17 +102,18 @@ class RagIngestService:
 
         # child chunk
         # extract text chunks
+        # (parent로 분할하면 start_index는 parent 내 위치)
         splitter = RecursiveCharacterTextSplitter(
-            chunk_size=settings.chunk_size, chunk_overlap=settings.chunk_overlap
+            chunk_size=settings.chunk_size,
+            chunk_overlap=settings.chunk_overlap,
+            add_start_index=True,
         )
 
         split_docs = splitter.split_documents(
             parent_split_docs if parent_split_docs else docs
         )
         logger.info("docs doc_len=%d, spl_doc_len=%d", len(docs), len(split_docs))
-
-        store = get_vectorstore()
-        store.add_documents(split_docs)
+        return split_docs
 
         # src_docs: list[SourceDocument] = [
         #     SourceDocument(page_content=d.page_content, metadata=d.metadata)
@@ -94,8 +143,3 @@ class RagIngestService:
         # except Exception as e:
         #     logger.error("Ingestion failed: %s", str(e))
         #     return
-
-        return RagPipelineResult(
-            ingested_chunks=len(vectors),
-            pdf_count=1,
-        )
@@ -0,0 +1,175 @@
+import hashlib
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from langchain_core.caches import BaseCache, RETURN_VAL_TYPE
+from langchain_core.globals import set_llm_cache
+from langchain_core.load import dumps, loads
+from sqlalchemy import select, delete
+from sqlalchemy.dialects.postgresql import insert
+from core.config import settings
+from models.llm_cache import LlmCacheEntry
+from utils.lru_cache import LRUCache
+from utils.logging import logging
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(prompt: str, llm_string: str) -> str:
+    # prompt: 렌더링된 메시지 직렬화, llm_string: 모델명/temperature 등 파라미터
+    return hashlib.sha256(f"{prompt}\x00{llm_string}".encode()).hexdigest()
+
+
+class PostgresLLMCache:
+    """llm_cache 테이블 기반 2차 캐시 (TTL)"""
+
+    def __init__(self, ttl_sec: int):
+        self.ttl_sec = ttl_sec
+
+    def get(self, key: str) -> RETURN_VAL_TYPE | None:
+        from core.db.rdb import sync_engine
+
+        with sync_engine.connect() as conn:
+            row = conn.execute(self._select(key)).first()
+        return loads(row.response) if row else None
+
+    async def aget(self, key: str) -> RETURN_VAL_TYPE | None:
+        from core.db.rdb import engine
+
+        async with engine.connect() as conn:
+            row = (await conn.execute(self._select(key))).first()
+        return loads(row.response) if row else None
+
+    def put(self, key: str, llm_string: str, value: RETURN_VAL_TYPE) -> None:
+        from core.db.rdb import sync_engine
+
+        with sync_engine.begin() as conn:
+            conn.execute(self._upsert(key, llm_string, value))
+
+    async def aput(self, key: str, llm_string: str, value: RETURN_VAL_TYPE) -> None:
+        from core.db.rdb import engine
+
+        async with engine.begin() as conn:
+            await conn.execute(self._upsert(key, llm_string, value))
+
+    def clear(self) -> None:
+        from core.db.rdb import sync_engine
+
+        with sync_engine.begin() as conn:
+            conn.execute(delete(LlmCacheEntry))
+
+    def _select(self, key: str):
+        return select(LlmCacheEntry.response).where(
+            LlmCacheEntry.key == key,
+            LlmCacheEntry.expires_at > datetime.now(timezone.utc),
+        )
+
+    def _upsert(self, key: str, llm_string: str, value: RETURN_VAL_TYPE):
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=self.ttl_sec)
+        stmt = insert(LlmCacheEntry).values(
+            key=key,
+            llm_string=llm_string,
+            response=dumps(value),
+            expires_at=expires_at,
+        )
+        return stmt.on_conflict_do_update(
+            index_elements=[LlmCacheEntry.key],
+            set_=dict(response=stmt.excluded.response, expires_at=expires_at),
+        )
+
+
+class TieredLLMCache(BaseCache):
+    """
+    LLM 응답 exact-match 캐시.
+    (렌더링된 메시지, 모델 파라미터)의 해시를 key로
+    in-memory LRU -> (선택) Postgres 순으로 조회한다.
+    set_llm_cache로 등록하므로 RAG chain, multiQuery, agent 호출에 모두 적용된다.
+    """
+
+    def __init__(self, maxsize: int, ttl_sec: int, db: PostgresLLMCache | None):
+        self.ttl_sec = ttl_sec
+        self.memory: LRUCache[str, tuple[float, RETURN_VAL_TYPE]] = LRUCache(maxsize)
+        self.db = db
+
+    def _memory_get(self, key: str) -> RETURN_VAL_TYPE | None:
+        entry = self.memory.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self.memory.invalidate([key])
+            return None
+        return value
+
+    def _memory_put(self, key: str, value: RETURN_VAL_TYPE) -> None:
+        self.memory.put(key, (time.monotonic() + self.ttl_sec, value))
+
+    def lookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        key = cache_key(prompt, llm_string)
+        if (value := self._memory_get(key)) is not None or self.db is None:
+            return value
+        try:
+            value = self.db.get(key)
+        except Exception as e:
+            logger.warning("llm cache lookup failed: %s", str(e))
+            return None
+        if value is not None:
+            self._memory_put(key, value)
+        return value
+
+    async def alookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        key = cache_key(prompt, llm_string)
+        if (value := self._memory_get(key)) is not None or self.db is None:
+            return value
+        try:
+            value = await self.db.aget(key)
+        except Exception as e:
+            logger.warning("llm cache lookup failed: %s", str(e))
+            return None
+        if value is not None:
+            self._memory_put(key, value)
+        return value
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        key = cache_key(prompt, llm_string)
+        self._memory_put(key, return_val)
+        if self.db is not None:
+            try:
+                self.db.put(key, llm_string, return_val)
+            except Exception as e:
+                logger.warning("llm cache update failed: %s", str(e))
+
+    async def aupdate(
+        self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE
+    ) -> None:
+        key = cache_key(prompt, llm_string)
+        self._memory_put(key, return_val)
+        if self.db is not None:
+            try:
+                await self.db.aput(key, llm_string, return_val)
+            except Exception as e:
+                logger.warning("llm cache update failed: %s", str(e))
+
+    def clear(self, **kwargs: Any) -> None:
+        self.memory.clear()
+        if self.db is not None:
+            self.db.clear()
+
+
+def init_llm_cache() -> TieredLLMCache | None:
+    if not settings.llm_cache_enabled:
+        set_llm_cache(None)
+        return None
+
+    cache = TieredLLMCache(
+        maxsize=settings.llm_cache_size,
+        ttl_sec=settings.llm_cache_ttl_sec,
+        db=(
+            PostgresLLMCache(settings.llm_cache_ttl_sec)
+            if settings.llm_cache_postgres
+            else None
+        ),
+    )
+    set_llm_cache(cache)
+    logger.info("llm cache enabled: postgres=%s", settings.llm_cache_postgres)
+    return cache
@@ -1,5 +1,5 @@
 from typing import Iterable, Optional, Union, Any, Protocol, List
-from openai import OpenAI, APIConnectionError
+from openai import OpenAI, AsyncOpenAI, APIConnectionError
 import logging
 from langchain_core.embeddings import Embeddings
 from core.config import settings
@@ -11,6 +11,8 @@ class EmbeddingProvider(Protocol):
 
     def embed(self, documents: Iterable[str]) -> list[list[float]]: ...
 
+    async def aembed(self, documents: Iterable[str]) -> list[list[float]]: ...
+
 
 class DummyNomicEmbedding(EmbeddingProvider, Embeddings):
     """
@@ -25,6 +27,9 @@ class DummyNomicEmbedding(EmbeddingProvider, Embeddings):
         zero = [0.0] * self.dim
         return [zero for _ in documents]
 
+    async def aembed(self, documents: Iterable[str]) -> list[list[float]]:
+        return self.embed(documents)
+
     def embed_documents(self, texts: list[str]) -> list[list[float]]:
         return self.embed(texts)
 
@@ -45,21 +50,38 @@ class StudioLmEmbedding(EmbeddingProvider, Embeddings):
         self.client = OpenAI(
             base_url="http://host.docker.internal:11434/v1", api_key="lm-studio"
         )
+        self.async_client = AsyncOpenAI(
+            base_url="http://host.docker.internal:11434/v1", api_key="lm-studio"
+        )
         self.embed_model = model
         self.dim = dim
 
     def embed(self, documents: Iterable[str]) -> list[list[float]]:
         # def embed(self, texts: List[str]) -> List[List[float]]:
         # StudioLM에 API를 호출하여 texts를 임베딩데이터로 변환
+        # 한번의 요청으로 전체 텍스트를 임베딩 (응답은 index 순으로 정렬)
+        texts = [text.replace("\n", " ") for text in documents]
+        if not texts:
+            return []
         try:
-            return [
-                self.client.embeddings.create(
-                    input=[text.replace("\n", " ")], model=self.embed_model
-                )
-                .data[0]
-                .embedding
-                for text in documents
-            ]
+            response = self.client.embeddings.create(
+                input=texts, model=self.embed_model
+            )
+            return [d.embedding for d in sorted(response.data, key=lambda d: d.index)]
+
+        except APIConnectionError as e:
+            logger.error(f"Embeddings failed: {str(e)}")
+            raise RuntimeError("Embedding service is unavailable")
+
+    async def aembed(self, documents: Iterable[str]) -> list[list[float]]:
+        texts = [text.replace("\n", " ") for text in documents]
+        if not texts:
+            return []
+        try:
+            response = await self.async_client.embeddings.create(
+                input=texts, model=self.embed_model
+            )
+            return [d.embedding for d in sorted(response.data, key=lambda d: d.index)]
 
         except APIConnectionError as e:
             logger.error(f"Embeddings failed: {str(e)}")
@@ -72,5 +94,12 @@ class StudioLmEmbedding(EmbeddingProvider, Embeddings):
         _r = self.embed_documents([text])
         return _r[0] if len(_r) > 0 else []
 
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        return await self.aembed(texts)
+
+    async def aembed_query(self, text: str) -> list[float]:
+        _r = await self.aembed_documents([text])
+        return _r[0] if len(_r) > 0 else []
+
 
 embedding = StudioLmEmbedding(dim=settings.embedding_dim)
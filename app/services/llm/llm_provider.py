@@ -1,4 +1,6 @@
 from typing import Any
+from threading import RLock
+import httpx
 from langchain.chat_models import BaseChatModel
 from langchain_core.callbacks import CallbackManagerForLLMRun
 from langchain_core.messages import BaseMessage
@@ -6,6 +8,20 @@ from langchain_core.outputs import ChatResult
 from langchain_openai import ChatOpenAI
 from pydantic.types import SecretStr
 from core.config import settings
+from services.llm.router import HedgedChatModel
+from services.llm.scheduler import ScheduledChatModel, get_scheduler
+
+
+def _http_clients() -> dict[str, Any]:
+    # 백엔드별 keep-alive 커넥션풀 (sync/async)
+    limits = httpx.Limits(
+        max_connections=settings.llm_max_connections,
+        max_keepalive_connections=settings.llm_max_connections,
+    )
+    return dict(
+        http_client=httpx.Client(limits=limits),
+        http_async_client=httpx.AsyncClient(limits=limits),
+    )
 
 
 class OpenAIProvider:
@@ -14,6 +30,9 @@ class OpenAIProvider:
             model="gpt-5-mini-2025-08-07",
             temperature=1,
             api_key=SecretStr(settings.openai_api_key),
+            # 스트리밍 응답에도 토큰 사용량 포함
+            stream_usage=True,
+            **_http_clients(),
         )
 
     @property
@@ -30,6 +49,9 @@ class StudioLMProvider:
             # base_url="http://localhost:11434/v1",
             api_key=SecretStr("lm-studio"),
             temperature=1,
+            # 스트리밍 응답에도 토큰 사용량 포함
+            stream_usage=True,
+            **_http_clients(),
         )
 
     @property
@@ -37,11 +59,49 @@ class StudioLMProvider:
         return self._llm
 
 
-def select_llm(llm_name: str) -> BaseChatModel:
+def _create_llm(llm_name: str) -> BaseChatModel:
     match llm_name:
         case "openai":
             return OpenAIProvider().llm
         case "studio":
             return StudioLMProvider().llm
+        case "hedged":
+            # 각 백엔드는 자체 scheduler를 거친 registry client 사용
+            return HedgedChatModel.from_settings(
+                primary=select_llm(settings.llm_hedge_primary),
+                secondary=select_llm(settings.llm_hedge_secondary),
+            )
         case _:
             raise ValueError(f"Unknown llm name: {llm_name}")
+
+
+# 프로세스 전역 LLM client registry (llm 이름 -> client)
+_llm_registry: dict[str, BaseChatModel] = {}
+_registry_lock = RLock()
+
+
+def select_llm(llm_name: str) -> BaseChatModel:
+    """
+    llm 이름별로 한번만 생성한 client를 재사용한다.
+    client가 커넥션풀을 가지므로 요청마다 연결을 새로 맺지 않는다.
+    백엔드별 scheduler로 감싸 동시실행 수를 제한한다.
+    빈 이름은 기본 모델(settings.llm_model_name)로 처리.
+    """
+    llm_name = llm_name or settings.llm_model_name
+    if (llm := _llm_registry.get(llm_name)) is not None:
+        return llm
+    with _registry_lock:
+        if llm_name not in _llm_registry:
+            llm = _create_llm(llm_name)
+            if settings.llm_scheduler_enabled and llm_name != "hedged":
+                llm = ScheduledChatModel(inner=llm, scheduler=get_scheduler(llm_name))
+            _llm_registry[llm_name] = llm
+        return _llm_registry[llm_name]
+
+
+def router_stats() -> dict[str, dict]:
+    return {
+        name: llm.stats()
+        for name, llm in list(_llm_registry.items())
+        if isinstance(llm, HedgedChatModel)
+    }
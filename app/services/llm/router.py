@@ -0,0 +1,292 @@
+import asyncio
+import time
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextvars import copy_context
+from itertools import chain
+from threading import Lock
+from typing import Any, AsyncIterator, Iterator
+import httpx
+from openai import APIConnectionError, InternalServerError
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+from core.config import settings
+from core.exception.customs import OverloadedException
+from utils.logging import logging
+
+logger = logging.getLogger(__name__)
+
+# 다른 백엔드로 넘겨도 되는 오류 (연결 실패, 5xx, 대기열 포화)
+FAILOVER_ERRORS = (
+    APIConnectionError,
+    InternalServerError,
+    httpx.TransportError,
+    OverloadedException,
+)
+
+# sync 호출의 hedge 요청용 (thread는 중단할 수 없으므로 늦은 쪽 결과는 버림)
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="llm-hedge")
+
+
+class LatencyTracker:
+    """최근 지연시간 표본으로 percentile 계산"""
+
+    def __init__(self, maxlen: int = 256):
+        self._samples: deque[float] = deque(maxlen=maxlen)
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, p: float) -> float:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return 0.0
+        return samples[min(len(samples) - 1, int(len(samples) * p))]
+
+
+class HedgedChatModel(BaseChatModel):
+    """
+    primary로 먼저 요청하고, primary 지연시간의 percentile을 넘기면
+    secondary로 같은 요청을 보내 먼저 성공한 응답을 사용한다 (나머지는 취소).
+    primary가 연결 오류 등으로 실패하면 secondary로 바로 넘긴다.
+    스트리밍은 첫 chunk 기준으로 hedge한다.
+    """
+
+    primary: BaseChatModel
+    secondary: BaseChatModel
+    percentile: float = 0.95
+    min_delay_sec: float = 0.5
+    max_delay_sec: float = 10.0
+    min_samples: int = 20
+
+    _latency: LatencyTracker = PrivateAttr(default_factory=LatencyTracker)
+    _ttft: LatencyTracker = PrivateAttr(default_factory=LatencyTracker)
+    _stats: Counter = PrivateAttr(default_factory=Counter)
+
+    @classmethod
+    def from_settings(
+        cls, primary: BaseChatModel, secondary: BaseChatModel
+    ) -> "HedgedChatModel":
+        return cls(
+            primary=primary,
+            secondary=secondary,
+            percentile=settings.llm_hedge_percentile,
+            min_delay_sec=settings.llm_hedge_min_ms / 1000,
+            max_delay_sec=settings.llm_hedge_max_ms / 1000,
+            min_samples=settings.llm_hedge_min_samples,
+        )
+
+    @property
+    def _llm_type(self) -> str:
+        return "hedged"
+
+    @property
+    def _identifying_params(self) -> dict[str, Any]:
+        return {
+            "primary": self.primary._identifying_params,
+            "secondary": self.secondary._identifying_params,
+        }
+
+    def hedge_delay(self, tracker: LatencyTracker) -> float:
+        # 표본이 적을 때는 max_delay까지 primary만 기다림
+        if len(tracker) < self.min_samples:
+            return self.max_delay_sec
+        delay = tracker.percentile(self.percentile)
+        return min(self.max_delay_sec, max(self.min_delay_sec, delay))
+
+    def stats(self) -> dict:
+        return {
+            **self._stats,
+            "hedge_delay_ms": round(self.hedge_delay(self._latency) * 1000, 1),
+            "ttft_hedge_delay_ms": round(self.hedge_delay(self._ttft) * 1000, 1),
+        }
+
+    def _failover(self, e: Exception) -> None:
+        self._stats["failover"] += 1
+        logger.warning("primary llm failed, failover to secondary: %s", e)
+
+    def _won(self, winner: Any, primary: Any, started: float) -> None:
+        # secondary가 이긴 경우에도 primary는 최소 그만큼 걸린 것으로 기록
+        self._latency.observe(time.monotonic() - started)
+        if winner is not primary:
+            self._stats["secondary_win"] += 1
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        def submit(model: BaseChatModel) -> Future:
+            return _executor.submit(
+                copy_context().run, model._generate, messages, stop, None, **kwargs
+            )
+
+        started = time.monotonic()
+        primary = submit(self.primary)
+        done, _ = wait([primary], timeout=self.hedge_delay(self._latency))
+        if done:
+            try:
+                result = primary.result()
+            except FAILOVER_ERRORS as e:
+                self._failover(e)
+                return self.secondary._generate(messages, stop, None, **kwargs)
+            self._latency.observe(time.monotonic() - started)
+            return result
+
+        self._stats["hedged"] += 1
+        pending = {primary, submit(self.secondary)}
+        error: BaseException | None = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if (error := future.exception()) is None:
+                    for loser in pending:
+                        loser.cancel()
+                    self._won(future, primary, started)
+                    return future.result()
+        raise error
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        def submit(model: BaseChatModel) -> asyncio.Task:
+            return asyncio.create_task(
+                model._agenerate(messages, stop, None, **kwargs)
+            )
+
+        started = time.monotonic()
+        primary = submit(self.primary)
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(
+                tasks, timeout=self.hedge_delay(self._latency)
+            )
+            if done:
+                try:
+                    result = primary.result()
+                except FAILOVER_ERRORS as e:
+                    self._failover(e)
+                    return await self.secondary._agenerate(
+                        messages, stop, None, **kwargs
+                    )
+                self._latency.observe(time.monotonic() - started)
+                return result
+
+            self._stats["hedged"] += 1
+            tasks.add(submit(self.secondary))
+            pending = set(tasks)
+            error: BaseException | None = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if (error := task.exception()) is None:
+                        self._won(task, primary, started)
+                        return task.result()
+            raise error
+        finally:
+            # 늦은 쪽(또는 호출자 취소시 전부) 요청 취소
+            for task in tasks:
+                task.cancel()
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        # sync 스트림은 중간에 다른 스트림으로 갈아탈 수 없으므로 첫 chunk 전 failover만 지원
+        stream = self.primary._stream(messages, stop, None, **kwargs)
+        try:
+            first = next(stream, None)
+        except FAILOVER_ERRORS as e:
+            self._failover(e)
+            stream = self.secondary._stream(messages, stop, None, **kwargs)
+            first = next(stream, None)
+        if first is None:
+            return
+        # on_llm_new_token은 BaseChatModel.stream이 chunk마다 호출하므로 그대로 전달
+        yield from chain([first], stream)
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        def open_stream(model: BaseChatModel):
+            stream = model._astream(messages, stop, None, **kwargs)
+            return stream, asyncio.ensure_future(anext(stream, None))
+
+        started = time.monotonic()
+        primary = open_stream(self.primary)
+        streams = [primary]
+        winner = None
+        try:
+            done, _ = await asyncio.wait(
+                {primary[1]}, timeout=self.hedge_delay(self._ttft)
+            )
+            if done:
+                try:
+                    primary[1].result()
+                except FAILOVER_ERRORS as e:
+                    self._failover(e)
+                    streams = [open_stream(self.secondary)]
+                    await asyncio.wait({streams[0][1]})
+                else:
+                    self._ttft.observe(time.monotonic() - started)
+            else:
+                self._stats["hedged"] += 1
+                streams.append(open_stream(self.secondary))
+
+            # 첫 chunk를 먼저 받은(성공한) 스트림을 선택
+            error: BaseException | None = None
+            pending = {first for _, first in streams}
+            while winner is None and pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for stream, first in streams:
+                    if first in done and (error := first.exception()) is None:
+                        winner = (stream, first)
+                        break
+            if winner is None:
+                raise error
+
+            if len(streams) > 1:
+                self._ttft.observe(time.monotonic() - started)
+                if winner[0] is not primary[0]:
+                    self._stats["secondary_win"] += 1
+
+            stream, first = winner
+            chunk = first.result()
+            while chunk is not None:
+                yield chunk
+                chunk = await anext(stream, None)
+        finally:
+            # 진행 중인 anext를 정리한 뒤 스트림을 닫아 scheduler slot 반환
+            for stream, first in streams:
+                first.cancel()
+                await asyncio.gather(first, return_exceptions=True)
+                await stream.aclose()
@@ -0,0 +1,306 @@
+import asyncio
+import heapq
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from itertools import count
+from threading import Event, Lock
+from typing import Any, AsyncIterator, Callable, Iterator
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from core.config import settings
+from core.exception.customs import OverloadedException
+from utils.logging import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """값이 작을수록 먼저 처리"""
+
+    INTERACTIVE = 0  # 사용자 질의 (chat/stream)
+    AGENT = 1
+    BATCH = 2
+
+
+# 현재 요청의 LLM 우선순위 (to_thread/executor로도 전파됨)
+llm_priority: ContextVar[Priority] = ContextVar(
+    "llm_priority", default=Priority.INTERACTIVE
+)
+
+
+@contextmanager
+def priority_scope(priority: Priority) -> Iterator[None]:
+    token = llm_priority.set(priority)
+    try:
+        yield
+    finally:
+        llm_priority.reset(token)
+
+
+def _priority(priority: Priority | None) -> Priority:
+    return llm_priority.get() if priority is None else priority
+
+
+class _Waiter:
+    __slots__ = ("enqueued", "granted", "cancelled", "notify")
+
+    def __init__(self, notify: Callable[[], Any]):
+        self.enqueued = time.monotonic()
+        self.granted = False
+        self.cancelled = False
+        self.notify = notify
+
+
+def _resolve(fut: asyncio.Future) -> None:
+    if not fut.done():
+        fut.set_result(None)
+
+
+class LLMScheduler:
+    """
+    LLM 백엔드 1개에 대한 동시실행 제한 + 우선순위 대기열.
+    - 실행 중인 요청이 max_concurrency에 도달하면 priority 순으로 대기
+    - 대기열이 max_queue에 도달하면 즉시 OverloadedException
+    - queue_timeout_sec 동안 slot을 얻지 못해도 OverloadedException
+    sync(thread)와 async(event loop) 호출을 같은 slot 기준으로 관리한다.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int,
+        max_queue: int,
+        queue_timeout_sec: float,
+    ):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout_sec = queue_timeout_sec
+        self._lock = Lock()
+        self._active = 0
+        self._queued = 0
+        self._queue: list[tuple[int, int, _Waiter]] = []
+        self._seq = count()
+        # 최근 queue 대기시간(sec) 표본
+        self._waits: deque[float] = deque(maxlen=1024)
+        self.acquired = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    def _enqueue(self, waiter: _Waiter, priority: Priority) -> bool:
+        """slot을 바로 얻으면 False, 대기열에 들어가면 True (lock 안에서 호출)"""
+        if self._active < self.max_concurrency and self._queued == 0:
+            self._active += 1
+            self.acquired += 1
+            self._waits.append(0.0)
+            return False
+        if self._queued >= self.max_queue:
+            self.rejected += 1
+            raise OverloadedException(
+                f"LLM backend '{self.name}' is saturated "
+                f"(active={self._active}, queued={self._queued})"
+            )
+        heapq.heappush(self._queue, (priority, next(self._seq), waiter))
+        self._queued += 1
+        return True
+
+    def _abandon(self, waiter: _Waiter) -> bool:
+        """
+        대기 취소. 취소 직전에 이미 slot을 넘겨받았다면 True를 반환하고,
+        이 경우 slot은 호출자 소유로 남는다.
+        """
+        with self._lock:
+            if waiter.granted:
+                return True
+            waiter.cancelled = True
+            self._queued -= 1
+            self.timeouts += 1
+            return False
+
+    def acquire(self, priority: Priority | None = None) -> None:
+        event = Event()
+        waiter = _Waiter(event.set)
+        with self._lock:
+            if not self._enqueue(waiter, _priority(priority)):
+                return
+        if not event.wait(self.queue_timeout_sec) and not self._abandon(waiter):
+            raise OverloadedException(
+                f"LLM backend '{self.name}' queue timeout "
+                f"({self.queue_timeout_sec}s)"
+            )
+
+    async def aacquire(self, priority: Priority | None = None) -> None:
+        loop = asyncio.get_running_loop()
+        fut: asyncio.Future = loop.create_future()
+        waiter = _Waiter(lambda: loop.call_soon_threadsafe(_resolve, fut))
+        with self._lock:
+            if not self._enqueue(waiter, _priority(priority)):
+                return
+        try:
+            await asyncio.wait_for(fut, self.queue_timeout_sec)
+        except asyncio.TimeoutError:
+            if not self._abandon(waiter):
+                raise OverloadedException(
+                    f"LLM backend '{self.name}' queue timeout "
+                    f"({self.queue_timeout_sec}s)"
+                )
+        except asyncio.CancelledError:
+            if self._abandon(waiter):
+                self.release()
+            raise
+
+    def release(self) -> None:
+        # 대기자가 있으면 slot을 그대로 넘기고, 없으면 반환
+        with self._lock:
+            waiter = None
+            while self._queue:
+                _, _, candidate = heapq.heappop(self._queue)
+                if not candidate.cancelled:
+                    waiter = candidate
+                    break
+            if waiter is None:
+                self._active -= 1
+                return
+            self._queued -= 1
+            self.acquired += 1
+            waiter.granted = True
+            self._waits.append(time.monotonic() - waiter.enqueued)
+        waiter.notify()
+
+    @contextmanager
+    def slot(self, priority: Priority | None = None) -> Iterator[None]:
+        self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> dict:
+        waits = sorted(self._waits)
+
+        def pct(p: float) -> float:
+            if not waits:
+                return 0.0
+            return round(waits[min(len(waits) - 1, int(len(waits) * p))] * 1000, 1)
+
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "active": self._active,
+            "queued": self._queued,
+            "acquired": self.acquired,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "queue_wait_ms": {"p50": pct(0.5), "p95": pct(0.95), "max": pct(1.0)},
+        }
+
+
+# 프로세스 전역 scheduler registry (llm 이름 -> scheduler)
+_schedulers: dict[str, LLMScheduler] = {}
+_schedulers_lock = Lock()
+
+
+def get_scheduler(llm_name: str) -> LLMScheduler:
+    if (scheduler := _schedulers.get(llm_name)) is not None:
+        return scheduler
+    with _schedulers_lock:
+        if llm_name not in _schedulers:
+            _schedulers[llm_name] = LLMScheduler(
+                name=llm_name,
+                max_concurrency=settings.llm_max_concurrency.get(
+                    llm_name, settings.llm_default_max_concurrency
+                ),
+                max_queue=settings.llm_max_queue,
+                queue_timeout_sec=settings.llm_queue_timeout_sec,
+            )
+        return _schedulers[llm_name]
+
+
+def scheduler_stats() -> dict[str, dict]:
+    return {name: s.stats() for name, s in list(_schedulers.items())}
+
+
+class ScheduledChatModel(BaseChatModel):
+    """
+    백엔드 chat model을 감싸 호출마다 scheduler slot을 잡고 실행한다.
+    스트리밍은 마지막 chunk까지 slot을 유지한다.
+    캐시/callback은 wrapper 기준으로 동작하고, 내부 모델은 _generate만 호출된다.
+    """
+
+    inner: BaseChatModel
+    scheduler: LLMScheduler
+
+    @property
+    def _llm_type(self) -> str:
+        return self.inner._llm_type
+
+    @property
+    def _identifying_params(self) -> dict[str, Any]:
+        # 캐시 key(llm_string)가 내부 모델 기준으로 만들어지도록 위임
+        return self.inner._identifying_params
+
+    @property
+    def model_name(self) -> str:
+        return getattr(self.inner, "model_name", self._llm_type)
+
+    def bind_tools(self, tools, **kwargs):
+        # tool 스키마 변환은 내부 모델에 맡기고, 실행은 wrapper를 통과시킴
+        binding = self.inner.bind_tools(tools, **kwargs)
+        return self.bind(**binding.kwargs)
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        with self.scheduler.slot():
+            return self.inner._generate(messages, stop, run_manager, **kwargs)
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        await self.scheduler.aacquire()
+        try:
+            return await self.inner._agenerate(messages, stop, run_manager, **kwargs)
+        finally:
+            self.scheduler.release()
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        with self.scheduler.slot():
+            yield from self.inner._stream(messages, stop, run_manager, **kwargs)
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        await self.scheduler.aacquire()
+        try:
+            async for chunk in self.inner._astream(
+                messages, stop, run_manager, **kwargs
+            ):
+                yield chunk
+        finally:
+            self.scheduler.release()
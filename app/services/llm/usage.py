@@ -0,0 +1,176 @@
+import time
+from collections import defaultdict
+from threading import Lock
+from typing import Any
+from uuid import UUID
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from services.dto.rag import LlmUsage
+from services.llm.router import LatencyTracker
+from utils.logging import logging
+
+logger = logging.getLogger(__name__)
+
+# chain에서 검색 단계를 구분하기 위한 run 이름
+RETRIEVAL_RUN = "rag_retrieval"
+
+
+def _token_usage(response: LLMResult) -> tuple[int, int]:
+    # 메시지 usage_metadata 우선, 없으면 llm_output.token_usage (openai 호환)
+    prompt = completion = 0
+    found = False
+    for generations in response.generations:
+        for generation in generations:
+            message = getattr(generation, "message", None)
+            if usage := getattr(message, "usage_metadata", None):
+                prompt += usage.get("input_tokens", 0)
+                completion += usage.get("output_tokens", 0)
+                found = True
+    if not found and response.llm_output:
+        usage = response.llm_output.get("token_usage") or {}
+        prompt = usage.get("prompt_tokens", 0)
+        completion = usage.get("completion_tokens", 0)
+    return prompt, completion
+
+
+class UsageTracker(BaseCallbackHandler):
+    """
+    요청 1건의 LLM 토큰 사용량과 지연시간을 callback으로 수집한다.
+    - 토큰: LLM 호출(질의 변형 생성 포함) 합계
+    - ttft: 스트리밍 응답의 첫 토큰까지 시간
+    - 검색시간: run_name이 RETRIEVAL_RUN인 chain 단계
+    """
+
+    # 집계만 하므로 executor 없이 호출 스레드에서 바로 실행
+    run_inline = True
+
+    def __init__(self, model: str):
+        self.model = model
+        self.started = time.monotonic()
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.llm_calls = 0
+        self.generation_sec = 0.0
+        self.retrieval_sec = 0.0
+        self.ttft_sec: float | None = None
+        self._runs: dict[UUID, float] = {}
+        self._lock = Lock()
+
+    def _start(self, run_id: UUID) -> None:
+        self._runs[run_id] = time.monotonic()
+
+    def _elapsed(self, run_id: UUID) -> float:
+        started = self._runs.pop(run_id, None)
+        return time.monotonic() - started if started is not None else 0.0
+
+    def on_chat_model_start(
+        self, serialized: dict[str, Any], messages: Any, *, run_id: UUID, **kwargs
+    ) -> None:
+        self._start(run_id)
+
+    def on_llm_start(
+        self, serialized: dict[str, Any], prompts: list[str], *, run_id: UUID, **kwargs
+    ) -> None:
+        self._start(run_id)
+
+    def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs) -> None:
+        if self.ttft_sec is None and run_id in self._runs:
+            self.ttft_sec = time.monotonic() - self._runs[run_id]
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs) -> None:
+        prompt, completion = _token_usage(response)
+        with self._lock:
+            self.generation_sec += self._elapsed(run_id)
+            self.prompt_tokens += prompt
+            self.completion_tokens += completion
+            self.llm_calls += 1
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs) -> None:
+        with self._lock:
+            self.generation_sec += self._elapsed(run_id)
+
+    def on_chain_start(
+        self, serialized: dict[str, Any], inputs: Any, *, run_id: UUID, **kwargs
+    ) -> None:
+        if kwargs.get("name") == RETRIEVAL_RUN:
+            self._start(run_id)
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs) -> None:
+        if run_id in self._runs:
+            with self._lock:
+                self.retrieval_sec += self._elapsed(run_id)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs) -> None:
+        self._runs.pop(run_id, None)
+
+    def finish(self, trace_id: str | None = None) -> LlmUsage:
+        """요청 종료시 호출: 결과 생성 + 로그 + 모델별 집계"""
+        usage = LlmUsage(
+            model=self.model,
+            prompt_tokens=self.prompt_tokens,
+            completion_tokens=self.completion_tokens,
+            total_tokens=self.prompt_tokens + self.completion_tokens,
+            llm_calls=self.llm_calls,
+            ttft_ms=(
+                round(self.ttft_sec * 1000, 1) if self.ttft_sec is not None else None
+            ),
+            generation_ms=round(self.generation_sec * 1000, 1),
+            retrieval_ms=round(self.retrieval_sec * 1000, 1),
+            total_ms=round((time.monotonic() - self.started) * 1000, 1),
+        )
+        logger.info("llm usage: trace_id=%s, %s", trace_id, usage.model_dump())
+        usage_stats.record(usage)
+        return usage
+
+
+_COUNTERS = ("requests", "llm_calls", "prompt_tokens", "completion_tokens")
+
+
+class UsageStats:
+    """모델별 누적 사용량 (capacity planning용)"""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._totals: dict[str, dict[str, float]] = defaultdict(
+            lambda: defaultdict(float)
+        )
+        self._ttft: dict[str, LatencyTracker] = defaultdict(LatencyTracker)
+        self._generation: dict[str, LatencyTracker] = defaultdict(LatencyTracker)
+
+    def record(self, usage: LlmUsage) -> None:
+        with self._lock:
+            totals = self._totals[usage.model]
+            totals["requests"] += 1
+            totals["llm_calls"] += usage.llm_calls
+            totals["prompt_tokens"] += usage.prompt_tokens
+            totals["completion_tokens"] += usage.completion_tokens
+            totals["generation_ms"] += usage.generation_ms
+            totals["retrieval_ms"] += usage.retrieval_ms
+            self._generation[usage.model].observe(usage.generation_ms)
+            if usage.ttft_ms is not None:
+                self._ttft[usage.model].observe(usage.ttft_ms)
+
+    def stats(self) -> dict[str, dict]:
+        with self._lock:
+            result = {}
+            for model, totals in self._totals.items():
+                requests = totals["requests"] or 1
+                ttft, generation = self._ttft[model], self._generation[model]
+                result[model] = {
+                    **{k: int(totals[k]) for k in _COUNTERS},
+                    "avg_generation_ms": round(totals["generation_ms"] / requests, 1),
+                    "avg_retrieval_ms": round(totals["retrieval_ms"] / requests, 1),
+                    "p95_generation_ms": round(generation.percentile(0.95), 1),
+                    "p50_ttft_ms": round(ttft.percentile(0.5), 1),
+                    "p95_ttft_ms": round(ttft.percentile(0.95), 1),
+                    "completion_tokens_per_sec": round(
+                        totals["completion_tokens"]
+                        / max(totals["generation_ms"] / 1000, 1e-9),
+                        1,
+                    ),
+                }
+            return result
+
+
+# 프로세스 전역 모델별 집계
+usage_stats = UsageStats()
@@ -1,19 +1,84 @@
 from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from services.dto.rag import QueryByRagResult, RagHit
+from services.dto.rag import QueryByRagRequest, QueryByRagResult, RagHit
 from core.db.vdb import QdrantClientProvider
 from services.llm.embedding import EmbeddingProvider
 from utils.logging import logging, log_block_ctx
 from core.config import settings
-from typing import cast
+from typing import Any, AsyncIterator, cast
+from langchain_core.language_models import BaseChatModel
 from services.llm.llm_provider import select_llm
+from services.llm.usage import RETRIEVAL_RUN, UsageTracker
+from core.middleware.trace_id import get_trace_id
+from services.retrieval.rerank import Reranker
+from services.retrieval.compressor import ExtractiveCompressor
+from services.retrieval.context_packer import (
+    ContextPacker,
+    PackedContext,
+    token_budget_for,
+)
+from infra.db.qdrant_filter import compile_filter
+from core.exception.customs import ValidationException
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.runnables import Runnable, RunnablePassthrough, RunnableLambda
+from threading import RLock
+import asyncio
 import os
+import time
 
 logger = logging.getLogger(__name__)
 
 os.environ["OPENAI_API_KEY"] = settings.openai_api_key
 
 
+def rag_prompt() -> ChatPromptTemplate:
+    return ChatPromptTemplate(
+        messages=[
+            (
+                "system",
+                """
+You are a professional AI assistant operating under a strict Retrieval-Augmented Generation (RAG) policy.
+
+You must answer only using the information explicitly contained in the provided context.
+Do not add explanations, examples, code blocks, or meta commentary.
+
+Rules:
+- Context에 명시적으로 존재하지 않는 내용은 절대 추론하거나 생성하지 마십시오.
+- 답변은 사실 중심의 단문으로 작성하십시오.
+- 정보가 없거나 불확실한 경우, 반드시 다음 문장만 출력하십시오:
+  - “제공된 문서에서 확인할 수 없습니다.”
+- 질문과 직접적으로 관련 없는 Context는 사용하지 마십시오.
+- 반드시 한국어로만 답변하십시오.
+- 답변 외의 텍스트(설명, 헤더, 마크다운, 코드, 인용 등)는 출력하지 마십시오.
+
+Output Constraints:
+- 순수 텍스트 문장만 출력
+- 코드 블록, 마크다운, 특수 태그(``` , < > 등) 사용 금지
+- 한 문단 이내로 간결하게 작성
+
+Context:
+{context}
+""",
+            ),
+            ("user", "{input}"),
+        ]
+    )
+
+
+# 프로세스당 1회 생성
+RAG_PROMPT = rag_prompt()
+
+
+def _inline(func) -> RunnableLambda:
+    """가벼운 sync 단계는 ainvoke/astream에서도 executor를 거치지 않고 바로 실행"""
+
+    async def afunc(x: Any) -> Any:
+        return func(x)
+
+    return RunnableLambda(func, afunc=afunc)
+
+
 class RagQueryService:
     def __init__(
         self,
@@ -25,10 +90,17 @@ class RagQueryService:
         self.embedder = embedder
         self.collection = collection
         self.llm = select_llm(settings.llm_model_name)
-
-    # llm_model설정
-    def llm_model(self, model_name: str):
-        self.llm = select_llm(model_name)
+        self.reranker = Reranker.from_settings() if settings.rerank_enabled else None
+        self.context_packer = ContextPacker.from_settings()
+        self.compressor = (
+            ExtractiveCompressor.from_settings()
+            if settings.context_compression_enabled
+            else None
+        )
+        # (llm, retriever) -> 구성된 chain
+        self._chains: dict[tuple[str, str], Runnable] = {}
+        self._answer_chains: dict[str, Runnable] = {}
+        self._chains_lock = RLock()
 
     def chat(
         self,
@@ -37,73 +109,277 @@ class RagQueryService:
         top_k: int = 3,
         llm_model: str = "studio",
         retriever_name: str = "qdrant",
+        trace_id: str | None = None,
     ) -> QueryByRagResult:
-        # 프롬프트 생성
-        from langchain_core.prompts import ChatPromptTemplate
-        from langchain_core.output_parsers import StrOutputParser
-        from langchain_core.runnables import RunnablePassthrough, RunnableLambda
-
-        # LLM 모델 선택
-        self.llm = select_llm(llm_model)
-
-        template = ChatPromptTemplate(
-            messages=[
-                (
-                    "system",
-                    """
-You are a professional AI assistant operating under a strict Retrieval-Augmented Generation (RAG) policy.
+        # 요청별 데이터는 입력으로만 전달
+        chain = self.rag_chain(llm_model, retriever_name)
+        tracker = UsageTracker(llm_model or settings.llm_model_name)
+        result = chain.invoke(
+            {"input": query, "filter": filter, "top_k": top_k},
+            config={"callbacks": [tracker]},
+        )
+        result.usage = tracker.finish(trace_id or get_trace_id())
+        return result
 
-You must answer only using the information explicitly contained in the provided context.
-Do not add explanations, examples, code blocks, or meta commentary.
+    async def achat(
+        self,
+        query: str,
+        filter: dict = {"metadata.producer": "Skia/PDF m128"},
+        top_k: int = 3,
+        llm_model: str = "studio",
+        retriever_name: str = "qdrant",
+        trace_id: str | None = None,
+    ) -> QueryByRagResult:
+        # 검색부터 LLM 호출까지 이벤트 루프에서 처리 (thread 전환 없음)
+        chain = self.rag_chain(llm_model, retriever_name)
+        tracker = UsageTracker(llm_model or settings.llm_model_name)
+        result = await chain.ainvoke(
+            {"input": query, "filter": filter, "top_k": top_k},
+            config={"callbacks": [tracker]},
+        )
+        result.usage = tracker.finish(trace_id or get_trace_id())
+        return result
 
-Rules:
-- Context에 명시적으로 존재하지 않는 내용은 절대 추론하거나 생성하지 마십시오.
-- 답변은 사실 중심의 단문으로 작성하십시오.
-- 정보가 없거나 불확실한 경우, 반드시 다음 문장만 출력하십시오:
-  - “제공된 문서에서 확인할 수 없습니다.”
-- 질문과 직접적으로 관련 없는 Context는 사용하지 마십시오.
-- 반드시 한국어로만 답변하십시오.
-- 답변 외의 텍스트(설명, 헤더, 마크다운, 코드, 인용 등)는 출력하지 마십시오.
+    def rag_chain(self, llm_model: str, retriever_name: str) -> Runnable:
+        """(llm, retriever)별로 한번만 구성한 chain을 재사용"""
+        key = (llm_model or settings.llm_model_name, retriever_name)
+        if (chain := self._chains.get(key)) is not None:
+            return chain
+        from infra.retriever import RetrieverFactory
 
-Output Constraints:
-- 순수 텍스트 문장만 출력
-- 코드 블록, 마크다운, 특수 태그(``` , < > 등) 사용 금지
-- 한 문단 이내로 간결하게 작성
+        # 요청값을 캐시 key로 쓰므로 알려진 이름만 허용 (unknown llm은 select_llm에서 거절)
+        if retriever_name not in RetrieverFactory.names():
+            raise ValidationException(f"Unknown retriever: {retriever_name}")
+        with self._chains_lock:
+            if key not in self._chains:
+                self._chains[key] = self._build_chain(*key)
+            return self._chains[key]
 
-Context:
-{context}
-""",
-                ),
-                ("user", "{input}"),
-            ]
+    def answer_chain(self, llm_model: str) -> Runnable:
+        """{context, input} -> 답변 문자열 (llm별 1회 구성)"""
+        key = llm_model or settings.llm_model_name
+        if (chain := self._answer_chains.get(key)) is not None:
+            return chain
+        with self._chains_lock:
+            if key not in self._answer_chains:
+                self._answer_chains[key] = (
+                    RAG_PROMPT
+                    | _inline(lambda x: logger.info(f"prompt: {x}") or x)
+                    | select_llm(key)
+                    | StrOutputParser()
+                )
+            return self._answer_chains[key]
+
+    def _build_chain(self, llm_model: str, retriever_name: str) -> Runnable:
+        # LLM 모델 선택 (공유 서비스 상태는 변경하지 않음)
+        llm = select_llm(llm_model)
+
+        def _retrieve(x: dict) -> list[RagHit]:
+            return self.retrieve_for_prompt(
+                retriever_name, x["input"], x["filter"], x["top_k"], llm=llm
+            ).hits
+
+        async def _aretrieve(x: dict) -> list[RagHit]:
+            result = await self.aretrieve_for_prompt(
+                retriever_name, x["input"], x["filter"], x["top_k"], llm=llm
+            )
+            return result.hits
+
+        def _context(x: dict) -> str:
+            packed = self.pack_context(x["hits"], llm_model, query=x["input"])
+            return packed.text or "No context"
+
+        return (
+            RunnablePassthrough.assign(
+                hits=RunnableLambda(func=_retrieve, afunc=_aretrieve).with_config(
+                    run_name=RETRIEVAL_RUN
+                )
+            )
+            | RunnablePassthrough.assign(context=_inline(_context))
+            | RunnablePassthrough.assign(answer=self.answer_chain(llm_model))
+            | _inline(lambda x: QueryByRagResult(**cast(dict, x)))
         )
-        retrieval_result = self.retrieve(retriever_name, query, filter, top_k)
-        _context = [r.page_content for r in retrieval_result.hits]
-        chain = (
-            {
-                "context": lambda _: (
-                    "\n\n".join(_context) if _context else "No context"
-                ),
-                "input": RunnablePassthrough(),
-                "hits": lambda _: retrieval_result.hits,
-            }
-            | RunnablePassthrough.assign(
-                answer=template
-                | RunnableLambda(lambda x: logger.info(f"prompt: {x}") or x)
-                | self.llm
-                | StrOutputParser()
+
+    async def astream_chat(
+        self,
+        query: str,
+        filter: dict,
+        top_k: int = 3,
+        llm_model: str = "studio",
+        retriever_name: str = "qdrant",
+        trace_id: str | None = None,
+    ) -> AsyncIterator[tuple[str, Any]]:
+        """
+        검색결과를 먼저 ("hits", list[RagHit])로 내보낸 뒤,
+        LLM이 생성하는 토큰을 ("token", str)로 순차 반환하고,
+        마지막에 ("usage", LlmUsage)를 반환한다.
+        """
+        llm = select_llm(llm_model)
+        tracker = UsageTracker(llm_model or settings.llm_model_name)
+        started = time.monotonic()
+        retrieval_result = await self.aretrieve_for_prompt(
+            retriever_name, query, filter, top_k, llm=llm
+        )
+        tracker.retrieval_sec = time.monotonic() - started
+        yield "hits", retrieval_result.hits
+
+        packed = self.pack_context(retrieval_result.hits, llm_model, query=query)
+        async for token in self.answer_chain(llm_model).astream(
+            {"context": packed.text or "No context", "input": query},
+            config={"callbacks": [tracker]},
+        ):
+            yield "token", token
+        yield "usage", tracker.finish(trace_id or get_trace_id())
+
+    def pack_context(
+        self, hits: list[RagHit], llm_model: str, query: str | None = None
+    ) -> PackedContext:
+        # 응답의 hits는 원문 유지, 프롬프트용 사본만 압축
+        if self.compressor is not None and query:
+            hits = self.compressor.compress(query, hits)
+        packed = self.context_packer.pack(hits, token_budget_for(llm_model))
+        logger.info(
+            "context packed: %d hits, ~%d tokens", len(packed.hits), packed.tokens
+        )
+        return packed
+
+    # 넓게 조회한 후 rerank로 프롬프트에 넣을 hit만 남김
+    def retrieve_for_prompt(
+        self,
+        name: str,
+        query: str,
+        filter: dict,
+        top_k: int,
+        llm: BaseChatModel | None = None,
+    ) -> QueryByRagResult:
+        if self.reranker is None:
+            return self.retrieve(name, query, filter, top_k, llm=llm)
+
+        candidates = max(top_k, settings.rerank_candidates)
+        result = self.retrieve(name, query, filter, candidates, llm=llm)
+        with log_block_ctx(logger, f"rerank {len(result.hits)} hits"):
+            result.hits = self.reranker.rerank(
+                query, result.hits, settings.rerank_top_n or top_k
+            )
+        return result
+
+    async def aretrieve_for_prompt(
+        self,
+        name: str,
+        query: str,
+        filter: dict,
+        top_k: int,
+        llm: BaseChatModel | None = None,
+    ) -> QueryByRagResult:
+        if self.reranker is None:
+            return await self.aretrieve(name, query, filter, top_k, llm=llm)
+
+        candidates = max(top_k, settings.rerank_candidates)
+        result = await self.aretrieve(name, query, filter, candidates, llm=llm)
+        result.hits = await self._arerank(query, result.hits, top_k)
+        return result
+
+    async def _arerank(self, query: str, hits: list[RagHit], top_k: int):
+        if self.reranker is None:
+            return hits
+        # rerank는 CPU 작업이므로 이벤트 루프를 막지 않도록 thread에서 수행
+        with log_block_ctx(logger, f"rerank {len(hits)} hits"):
+            return await asyncio.to_thread(
+                self.reranker.rerank, query, hits, settings.rerank_top_n or top_k
+            )
+
+    async def achat_batch(
+        self,
+        requests: list[QueryByRagRequest],
+        trace_ids: list[str | None],
+    ) -> list[QueryByRagResult | BaseException]:
+        """
+        여러 질의를 한번에 처리 (kafka batch 소비).
+        qdrant 검색 요청은 임베딩 1회 + qdrant batch query 1회로 묶고,
+        답변 생성은 요청별로 동시에 수행한다 (LLM scheduler가 동시실행 제한).
+        결과는 요청 순서대로 반환하며, 실패한 요청은 예외 객체로 반환한다.
+        """
+        batched = [i for i, req in enumerate(requests) if req.retriever == "qdrant"]
+        hits: dict[int, list[RagHit]] = {}
+        started = time.monotonic()
+        if batched:
+            results = await self.aretrieve_many(
+                [
+                    (
+                        requests[i].query,
+                        requests[i].filter,
+                        max(requests[i].top_k, settings.rerank_candidates)
+                        if self.reranker
+                        else requests[i].top_k,
+                    )
+                    for i in batched
+                ]
+            )
+            hits = {i: result.hits for i, result in zip(batched, results)}
+        retrieval_sec = time.monotonic() - started
+
+        async def _answer(i: int, req: QueryByRagRequest) -> QueryByRagResult:
+            if i not in hits:
+                return await self.achat(
+                    req.query,
+                    req.filter,
+                    req.top_k,
+                    req.llm,
+                    req.retriever,
+                    trace_id=trace_ids[i],
+                )
+            tracker = UsageTracker(req.llm or settings.llm_model_name)
+            tracker.retrieval_sec = retrieval_sec
+            req_hits = await self._arerank(req.query, hits[i], req.top_k)
+            packed = self.pack_context(req_hits, req.llm, query=req.query)
+            answer = await self.answer_chain(req.llm).ainvoke(
+                {"context": packed.text or "No context", "input": req.query},
+                config={"callbacks": [tracker]},
             )
-            # | RunnablePassthrough.assign(
-            #     _=lambda x: logger.info("context: %s", x["context"]) or x
-            # )
-            # | RunnableLambda(
-            #     lambda x: QueryByRagResult(
-            #         answer=cast(dict, x)["answer"], hits=cast(dict, x)["hits"]
-            #     )
-            # )
-            | RunnableLambda(lambda x: QueryByRagResult(**cast(dict, x)))
+            return QueryByRagResult(
+                answer=answer, hits=req_hits, usage=tracker.finish(trace_ids[i])
+            )
+
+        return await asyncio.gather(
+            *(_answer(i, req) for i, req in enumerate(requests)),
+            return_exceptions=True,
+        )
+
+    async def aretrieve_many(
+        self,
+        requests: list[tuple[str, dict, int]],
+        fields: list[str] | None = None,
+        with_text: bool = True,
+    ) -> list[QueryByRagResult]:
+        """(query, filter, top_k) 목록을 임베딩 1회 + qdrant batch query 1회로 조회"""
+        from qdrant_client.models import QueryRequest
+
+        if not requests:
+            return []
+
+        search_params = self.qdrant.profile.search_params()
+        with_payload = _payload_selector(fields, with_text)
+        vectors = await self.embedder.aembed([query for query, _, _ in requests])
+        responses = await self.qdrant.async_client.query_batch_points(
+            collection_name=self.collection,
+            requests=[
+                QueryRequest(
+                    query=vector,
+                    filter=compile_filter(filter),
+                    params=search_params,
+                    limit=top_k,
+                    with_payload=with_payload,
+                )
+                for vector, (_, filter, top_k) in zip(vectors, requests)
+            ],
         )
-        return chain.invoke(input={"query": query, "filter": filter, "top-k": top_k})
+        return [
+            QueryByRagResult(
+                answer="",
+                hits=[_hit_from_point(r.payload, r.score) for r in response.points],
+            )
+            for response in responses
+        ]
 
     # vectordb에서 유사 정보조회
     def retrieve(
@@ -112,31 +388,56 @@ Context:
         query: str,
         filter: dict = {"metadata.producer": "Skia/PDF m128"},
         top_k: int = 5,
+        fields: list[str] | None = None,
+        with_text: bool = True,
+        llm: BaseChatModel | None = None,
     ) -> QueryByRagResult:
 
-        from infra.retriever import RetrieverFactory
+        # qdrant 단일검색은 payload projection이 가능한 직접조회 경로 사용
+        if name == "qdrant":
+            return self.retrieve2(query, filter, top_k, fields, with_text)
 
-        # from services.store.qdrant_store import get_qdrant_vectorstore
-        from qdrant_client.http.models import (
-            VectorParams,
-            MatchValue,
-            FieldCondition,
-            Filter,
+        retriever = self._retriever(name, filter, top_k, llm)
+        docs: list[Document] = retriever.invoke(query)
+
+        return QueryByRagResult(
+            answer="",
+            hits=[_hit_from_document(doc, fields, with_text) for doc in docs],
         )
 
-        # store = get_qdrant_vectorstore()
-        _filter = Filter(
-            must=(
-                [
-                    FieldCondition(key=key, match=MatchValue(value=value))
-                    for key, value in filter.items()
-                ]
-                if filter
-                else None
-            )
+    async def aretrieve(
+        self,
+        name: str,
+        query: str,
+        filter: dict = {"metadata.producer": "Skia/PDF m128"},
+        top_k: int = 5,
+        fields: list[str] | None = None,
+        with_text: bool = True,
+        llm: BaseChatModel | None = None,
+    ) -> QueryByRagResult:
+        if name == "qdrant":
+            return await self.aretrieve2(query, filter, top_k, fields, with_text)
+
+        retriever = self._retriever(name, filter, top_k, llm)
+        docs: list[Document] = await retriever.ainvoke(query)
+
+        return QueryByRagResult(
+            answer="",
+            hits=[_hit_from_document(doc, fields, with_text) for doc in docs],
         )
+
+    def _retriever(
+        self, name: str, filter: dict, top_k: int, llm: BaseChatModel | None
+    ):
+        from infra.retriever import RetrieverFactory
+
+        _filter = compile_filter(filter)
         kwargs = {
-            "llm": self.llm,
+            "llm": llm or self.llm,
+            "qdrant": self.qdrant,
+            "embedder": self.embedder,
+            "collection": self.collection,
+            "filter_spec": filter,
             "child_splitter": RecursiveCharacterTextSplitter(
                 chunk_size=settings.chunk_size, chunk_overlap=0
             ),
@@ -145,78 +446,102 @@ Context:
             ),
         }
         # multiQuery
-        retriever = RetrieverFactory(name, _filter, top_k).create(**kwargs)
-        # docs_with_scores: list[tuple[Document, float]] = (
-        #     store.similarity_search_with_score(query=query, k=top_k, filter=_filter)
-        # )
-        docs: list[Document] = retriever.invoke(query)
-
-        # hits = [
-        #     RagHit(
-        #         page_content=doc.page_content,
-        #         score=score,
-        #         source=doc.metadata["source"],
-        #         metadata={k: v for k, v in doc.metadata.items() if k != "source"},
-        #     )
-        #     for doc, score in docs_with_scores
-        # ]
-        hits = [
-            RagHit(
-                page_content=doc.page_content,
-                score=0.0,
-                source=doc.metadata["source"],
-                metadata={k: v for k, v in doc.metadata.items() if k != "source"},
-            )
-            for doc in docs
-        ]
-
-        return QueryByRagResult(
-            answer="",
-            hits=hits,
-        )
+        return RetrieverFactory(name, _filter, top_k).create(**kwargs)
 
     def retrieve2(
         self,
         query: str,
         filter: dict,
         top_k: int = 5,
+        fields: list[str] | None = None,
+        with_text: bool = True,
     ) -> QueryByRagResult:
-        from qdrant_client.models import Filter, FieldCondition, MatchValue
         from qdrant_client.conversions.common_types import QueryResponse
 
         query_vector = self.embedder.embed([query])[0]
 
-        _filter = (
-            Filter(
-                must=[
-                    FieldCondition(key=key, match=MatchValue(value=value))
-                    for key, value in filter.items()
-                ]
-            )
-            if filter
-            else None
-        )
-
         result: QueryResponse = self.qdrant.client.query_points(
             collection_name=self.collection,
             query=query_vector,
-            query_filter=_filter,
+            query_filter=compile_filter(filter),
+            search_params=self.qdrant.profile.search_params(),
             limit=top_k,
-            # with_payload=True,
+            with_payload=_payload_selector(fields, with_text),
         )
 
-        hits = [
-            RagHit(
-                page_content=r.payload["page_content"],
-                score=r.score,
-                source=r.payload.get("source", ""),
-                metadata={k: v for k, v in r.payload.items() if k != "source"},
-            )
-            for r in result.points
-            if r.payload
-        ]
+        return QueryByRagResult(
+            answer="",
+            hits=[_hit_from_point(r.payload, r.score) for r in result.points],
+        )
+
+    async def aretrieve2(
+        self,
+        query: str,
+        filter: dict,
+        top_k: int = 5,
+        fields: list[str] | None = None,
+        with_text: bool = True,
+    ) -> QueryByRagResult:
+        query_vector = (await self.embedder.aembed([query]))[0]
+
+        result = await self.qdrant.async_client.query_points(
+            collection_name=self.collection,
+            query=query_vector,
+            query_filter=compile_filter(filter),
+            search_params=self.qdrant.profile.search_params(),
+            limit=top_k,
+            with_payload=_payload_selector(fields, with_text),
+        )
 
         return QueryByRagResult(
             answer="",
-            hits=hits,
+            hits=[_hit_from_point(r.payload, r.score) for r in result.points],
         )
+
+
+def _payload_selector(fields: list[str] | None, with_text: bool):
+    """
+    Qdrant가 필요한 payload key만 반환하도록 selector 구성.
+    fields는 payload 경로(ex. metadata.page), source는 항상 포함.
+    """
+    from qdrant_client.models import PayloadSelectorExclude, PayloadSelectorInclude
+
+    if fields is None:
+        return True if with_text else PayloadSelectorExclude(exclude=["page_content"])
+
+    include = ["metadata.source", *fields]
+    if with_text:
+        include.append("page_content")
+    return PayloadSelectorInclude(include=list(dict.fromkeys(include)))
+
+
+def _hit_from_point(payload: dict | None, score: float) -> RagHit:
+    # qdrant 응답 payload는 호출마다 새로 만들어지므로 복사 없이 그대로 사용
+    payload = payload or {}
+    metadata = payload.get("metadata") or {}
+    source = metadata.pop("source", "")
+    return RagHit.model_construct(
+        page_content=payload.get("page_content", ""),
+        score=score,
+        source=source,
+        metadata=metadata,
+    )
+
+
+def _hit_from_document(
+    doc: Document, fields: list[str] | None, with_text: bool
+) -> RagHit:
+    # docstore 캐시 문서일 수 있으므로 metadata는 변경하지 않음
+    meta = doc.metadata
+    if fields is None:
+        metadata = {k: v for k, v in meta.items() if k not in ("source", "_score")}
+    else:
+        keys = (f.removeprefix("metadata.") for f in fields)
+        metadata = {k: meta[k] for k in keys if k in meta}
+    return RagHit.model_construct(
+        page_content=doc.page_content if with_text else "",
+        score=meta.get("_score", 0.0),
+        source=meta.get("source", ""),
+        metadata=metadata,
+    )
+
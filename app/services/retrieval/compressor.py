@@ -0,0 +1,88 @@
+import math
+import re
+from collections import Counter
+from core.config import settings
+from services.dto.rag import RagHit
+from utils.tokenizer import tokenize
+
+# 문장 경계: 종결부호 뒤 공백 또는 줄바꿈
+_SENTENCE_RE = re.compile(r"(?<=[.!?。])\s+|\n+")
+
+
+def split_sentences(text: str) -> list[str]:
+    return [s.strip() for s in _SENTENCE_RE.split(text) if s.strip()]
+
+
+class ExtractiveCompressor:
+    """
+    chunk에서 질의와 관련된 문장만 남겨 프롬프트를 줄인다.
+    - 문장 점수: 질의 토큰 중 문장에 포함된 토큰의 idf 합 (idf는 이번 검색결과 문장 기준)
+    - 최고 점수의 ratio 이상인 문장만 원래 순서대로 유지, chunk당 최소 1문장
+    - 여러 chunk에 중복된 문장(overlap 구간)은 한번만 유지
+    min_chars보다 짧은 chunk는 압축하지 않는다.
+    압축된 chunk는 원문과 위치가 맞지 않으므로 start_index를 제거한다.
+    """
+
+    def __init__(self, ratio: float = 0.3, min_chars: int = 200):
+        self.ratio = ratio
+        self.min_chars = min_chars
+
+    @classmethod
+    def from_settings(cls) -> "ExtractiveCompressor":
+        return cls(
+            ratio=settings.context_compression_ratio,
+            min_chars=settings.context_compression_min_chars,
+        )
+
+    def compress(self, query: str, hits: list[RagHit]) -> list[RagHit]:
+        q_terms = set(tokenize(query))
+        if not q_terms or not hits:
+            return hits
+
+        # hit별 (문장, 토큰집합) 목록
+        split = [
+            [(s, set(tokenize(s))) for s in split_sentences(hit.page_content)]
+            for hit in hits
+        ]
+        n_sentences = sum(len(sentences) for sentences in split) or 1
+        df = Counter(
+            t for sentences in split for _, ts in sentences for t in ts & q_terms
+        )
+        idf = {t: math.log(1 + n_sentences / df[t]) for t in df}
+
+        scored = [
+            [(s, sum(idf.get(t, 0.0) for t in ts & q_terms)) for s, ts in sentences]
+            for sentences in split
+        ]
+        best = max(
+            (score for sentences in scored for _, score in sentences), default=0.0
+        )
+        if best <= 0:
+            return hits
+        threshold = best * self.ratio
+
+        seen: set[str] = set()
+        compressed: list[RagHit] = []
+        for hit, sentences in zip(hits, scored):
+            if len(hit.page_content) < self.min_chars or not sentences:
+                compressed.append(hit)
+                continue
+            top = max(sentences, key=lambda x: x[1])[0]
+            kept = [
+                s
+                for s, score in sentences
+                if (score >= threshold or s == top) and s not in seen
+            ]
+            seen.update(kept)
+            if not kept:
+                continue
+            text = " ".join(kept)
+            if text == hit.page_content:
+                compressed.append(hit)
+                continue
+            # 문장을 덜어낸 chunk는 원문 구간과 달라지므로 packer 병합 대상에서 제외
+            metadata = {k: v for k, v in hit.metadata.items() if k != "start_index"}
+            compressed.append(
+                hit.model_copy(update={"page_content": text, "metadata": metadata})
+            )
+        return compressed
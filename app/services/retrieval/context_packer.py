@@ -0,0 +1,177 @@
+from dataclasses import dataclass, field
+from core.config import settings
+from services.dto.rag import RagHit
+from utils.tokenizer import tokenize
+
+# 연속된 chunk 사이 overlap 검사 최대 길이
+_MAX_OVERLAP_CHARS = 200
+# 인접 chunk로 보는 start_index 간격 (splitter가 잘라낸 공백 허용)
+_ADJACENT_GAP_CHARS = 2
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    tokenizer 없이 쓰는 보수적 토큰 추정치.
+    영문/숫자는 약 4자당 1토큰, 한글 등 비ASCII는 1자당 1토큰으로 계산.
+    """
+    ascii_chars = sum(1 for c in text if c.isascii())
+    return ascii_chars // 4 + (len(text) - ascii_chars) + 1
+
+
+def token_budget_for(llm_model: str) -> int:
+    return settings.context_token_budget.get(
+        llm_model, settings.context_default_token_budget
+    )
+
+
+@dataclass
+class _Block:
+    key: tuple
+    score: float
+    texts: list[str] = field(default_factory=list)
+    hits: list[RagHit] = field(default_factory=list)
+
+    @property
+    def text(self) -> str:
+        merged = self.texts[0]
+        for nxt in self.texts[1:]:
+            merged = _join_without_overlap(merged, nxt)
+        return merged
+
+
+@dataclass(frozen=True)
+class PackedContext:
+    text: str
+    hits: list[RagHit]
+    tokens: int
+
+
+def _join_without_overlap(left: str, right: str) -> str:
+    # left의 끝과 right의 시작이 겹치면 겹친 부분을 한번만 남김
+    limit = min(len(left), len(right), _MAX_OVERLAP_CHARS)
+    for size in range(limit, 0, -1):
+        if left.endswith(right[:size]):
+            return left + right[size:]
+    return left + "\n" + right
+
+
+def _block_key(hit: RagHit) -> tuple:
+    # 같은 parent chunk 또는 같은 페이지의 chunk가 병합 후보
+    meta = hit.metadata
+    if "start_index" not in meta:
+        return (hit.source, "hit", id(hit))
+    if "parent_id" in meta:
+        return (hit.source, "parent", meta["parent_id"])
+    if "page" in meta:
+        return (hit.source, "page", meta["page"])
+    return (hit.source, "hit", id(hit))
+
+
+def _contiguous_runs(hits: list[RagHit]) -> list[list[RagHit]]:
+    # start_index 순으로 겹치거나 바로 이어지는 chunk끼리만 묶음
+    ordered = sorted(hits, key=lambda h: h.metadata["start_index"])
+    runs: list[list[RagHit]] = [[ordered[0]]]
+    end = ordered[0].metadata["start_index"] + len(ordered[0].page_content)
+    for hit in ordered[1:]:
+        start = hit.metadata["start_index"]
+        if start <= end + _ADJACENT_GAP_CHARS:
+            runs[-1].append(hit)
+        else:
+            runs.append([hit])
+        end = max(end, start + len(hit.page_content))
+    return runs
+
+
+def _truncate_to_tokens(text: str, budget: int) -> str:
+    """추정 토큰이 budget 이하가 되는 가장 긴 앞부분 (가능하면 공백에서 자름)"""
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if estimate_tokens(text[:mid]) <= budget:
+            lo = mid
+        else:
+            hi = mid - 1
+    cut = text[:lo]
+    if lo < len(text) and (space := cut.rfind(" ")) > lo // 2:
+        cut = cut[:space]
+    return cut.rstrip()
+
+
+def _jaccard(a: set[str], b: set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class ContextPacker:
+    """
+    검색결과를 프롬프트 context로 조립한다.
+    1. 점수순 정렬 후 거의 동일한 chunk 제거
+    2. 같은 출처/페이지에서 start_index가 겹치거나 이어지는 chunk를 하나의 구간으로 병합
+    3. 점수순으로 token budget 안에서 채우고, 넘치는 첫 구간은 잘라서 채움
+    """
+
+    def __init__(self, dedupe_threshold: float = 0.9, separator: str = "\n\n"):
+        self.dedupe_threshold = dedupe_threshold
+        self.separator = separator
+
+    @classmethod
+    def from_settings(cls) -> "ContextPacker":
+        return cls(dedupe_threshold=settings.context_dedupe_threshold)
+
+    def pack(self, hits: list[RagHit], token_budget: int) -> PackedContext:
+        ranked = sorted(hits, key=lambda h: h.score, reverse=True)
+
+        # 1. near-duplicate 제거
+        kept: list[RagHit] = []
+        kept_tokens: list[set[str]] = []
+        for hit in ranked:
+            tokens = set(tokenize(hit.page_content))
+            if any(
+                _jaccard(tokens, other) >= self.dedupe_threshold
+                for other in kept_tokens
+            ):
+                continue
+            kept.append(hit)
+            kept_tokens.append(tokens)
+
+        # 2. 인접 구간 병합 (블록 점수는 최고 점수)
+        groups: dict[tuple, list[RagHit]] = {}
+        for hit in kept:
+            groups.setdefault(_block_key(hit), []).append(hit)
+        blocks: list[_Block] = []
+        for key, group in groups.items():
+            runs = _contiguous_runs(group) if len(group) > 1 else [group]
+            for i, run in enumerate(runs):
+                blocks.append(
+                    _Block(
+                        key=(*key, i),
+                        score=max(h.score for h in run),
+                        texts=[h.page_content for h in run],
+                        hits=run,
+                    )
+                )
+
+        # 3. budget 내에서 점수순으로 채움
+        parts: list[str] = []
+        used: list[RagHit] = []
+        total = 0
+        sep_tokens = estimate_tokens(self.separator)
+        for block in sorted(blocks, key=lambda b: b.score, reverse=True):
+            text = block.text
+            sep = sep_tokens if parts else 0
+            cost = estimate_tokens(text) + sep
+            if total + cost > token_budget:
+                # 처음으로 넘치는 블록은 남은 budget만큼 잘라서 채우고 종료
+                # (긴 chunk 1개만 검색된 경우에도 context가 비지 않도록)
+                text = _truncate_to_tokens(text, token_budget - total - sep)
+                if text:
+                    parts.append(text)
+                    used.extend(block.hits)
+                    total += estimate_tokens(text) + sep
+                break
+            parts.append(text)
+            used.extend(block.hits)
+            total += cost
+
+        return PackedContext(text=self.separator.join(parts), hits=used, tokens=total)
@@ -0,0 +1,111 @@
+import time
+from threading import Lock
+from typing import Protocol, Sequence
+from core.config import settings
+from services.dto.rag import RagHit
+from utils.logging import logging
+from utils.tokenizer import tokenize
+
+logger = logging.getLogger(__name__)
+
+
+class PairScorer(Protocol):
+
+    def load(self) -> None: ...
+
+    def score(self, query: str, passages: Sequence[str]) -> list[float]: ...
+
+
+class LexicalOverlapScorer:
+    """질의 토큰 중 passage에 포함된 비율로 점수화"""
+
+    def load(self) -> None:
+        pass
+
+    def score(self, query: str, passages: Sequence[str]) -> list[float]:
+        q_tokens = set(tokenize(query))
+        if not q_tokens:
+            return [0.0] * len(passages)
+        return [len(q_tokens & set(tokenize(p))) / len(q_tokens) for p in passages]
+
+
+class CrossEncoderScorer:
+    """fastembed ONNX cross-encoder (CPU), 기동시(또는 최초 호출시) 모델 로드"""
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self._model = None
+        self._lock = Lock()
+
+    def load(self) -> None:
+        if self._model is not None:
+            return
+        with self._lock:
+            if self._model is None:
+                from fastembed.rerank.cross_encoder import TextCrossEncoder
+
+                self._model = TextCrossEncoder(model_name=self.model_name)
+
+    def score(self, query: str, passages: Sequence[str]) -> list[float]:
+        self.load()
+        return list(
+            self._model.rerank(query, list(passages), batch_size=len(passages))
+        )
+
+
+class Reranker:
+    """
+    (query, passage) 쌍을 batch 단위로 점수화해 상위 top_n만 남긴다.
+    누적 소요시간이 budget_ms를 넘으면 벡터검색 순서로 되돌린다.
+    """
+
+    def __init__(
+        self,
+        scorer: PairScorer,
+        batch_size: int = 16,
+        budget_ms: int = 150,
+    ):
+        self.scorer = scorer
+        self.batch_size = batch_size
+        self.budget_ms = budget_ms
+
+    @classmethod
+    def from_settings(cls) -> "Reranker":
+        scorer: PairScorer = (
+            CrossEncoderScorer(settings.rerank_model_name)
+            if settings.rerank_method == "cross-encoder"
+            else LexicalOverlapScorer()
+        )
+        return cls(
+            scorer=scorer,
+            batch_size=settings.rerank_batch_size,
+            budget_ms=settings.rerank_budget_ms,
+        )
+
+    def warmup(self) -> None:
+        """모델 로드 (기동시 호출, 로드 시간이 budget에 포함되지 않도록)"""
+        self.scorer.load()
+
+    def rerank(self, query: str, hits: list[RagHit], top_n: int) -> list[RagHit]:
+        if len(hits) <= 1:
+            return hits[:top_n]
+
+        # 미리 로드되지 않았으면 시간 측정 전에 로드
+        self.scorer.load()
+        started = time.perf_counter()
+        scores: list[float] = []
+        for i in range(0, len(hits), self.batch_size):
+            batch = hits[i : i + self.batch_size]
+            scores.extend(self.scorer.score(query, [h.page_content for h in batch]))
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if elapsed_ms > self.budget_ms:
+                logger.warning(
+                    "rerank budget exceeded (%.1fms > %dms), fallback to vector order",
+                    elapsed_ms,
+                    self.budget_ms,
+                )
+                return hits[:top_n]
+
+        # 동점은 기존(벡터) 순서 유지
+        ranked = sorted(zip(scores, hits), key=lambda x: x[0], reverse=True)
+        return [h.model_copy(update={"score": s}) for s, h in ranked[:top_n]]
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# app 디렉토리를 import 기준으로 (main.py와 같은 방식: `from core.config import ...`)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,56 @@
+import pytest
+
+pytest.importorskip("langchain_core")
+pytest.importorskip("pydantic_settings")
+
+from langchain_core.documents import Document
+from infra.db.bm25 import BM25Index
+
+
+def doc(text: str, source: str) -> Document:
+    return Document(page_content=text, metadata={"source": source})
+
+
+def contents(index: BM25Index, query: str) -> list[str]:
+    return [d.page_content for d, _ in index.search(query, k=10)]
+
+
+def test_search_ranks_matching_documents(tmp_path):
+    index = BM25Index(tmp_path)
+    index.add_documents(
+        [
+            doc("배출증 출력 방법", "a.pdf"),
+            doc("회원 가입 안내", "b.pdf"),
+        ]
+    )
+    assert contents(index, "배출증 출력") == ["배출증 출력 방법"]
+
+
+def test_other_instance_sees_new_segments(tmp_path):
+    # 같은 디렉토리를 공유하는 다른 replica
+    reader = BM25Index(tmp_path, refresh_sec=0)
+    writer = BM25Index(tmp_path, refresh_sec=0)
+    writer.add_documents([doc("apple banana", "a.pdf")])
+    assert contents(reader, "apple") == ["apple banana"]
+    assert len(reader) == 1
+
+
+def test_reingest_replaces_documents_of_same_source(tmp_path):
+    index = BM25Index(tmp_path)
+    index.add_documents([doc("apple banana", "a.pdf"), doc("cherry", "b.pdf")])
+    index.add_documents([doc("apple pie", "a.pdf")])
+    assert len(index) == 2
+    assert sorted(contents(index, "apple cherry")) == ["apple pie", "cherry"]
+
+    # 재시작 후에도 같은 결과
+    reopened = BM25Index(tmp_path)
+    assert sorted(contents(reopened, "apple cherry")) == ["apple pie", "cherry"]
+
+
+def test_segments_are_compacted(tmp_path):
+    index = BM25Index(tmp_path, max_segments=2)
+    for i in range(5):
+        index.add_documents([doc(f"doc {i}", f"{i}.pdf")])
+    assert len(index) == 5
+    assert len(list(tmp_path.glob("seg-*"))) <= 2
+    assert contents(index, "3") == ["doc 3"]
@@ -0,0 +1,61 @@
+import pytest
+
+pytest.importorskip("msgpack")
+pytest.importorskip("pydantic_settings")
+
+from datetime import datetime
+from uuid import UUID
+from core.config import settings
+from infra.messaging.kafka import codec
+
+FRAME = {
+    "command": "QUERY-BY-RAG",
+    "headers": {"client-id": "c1"},
+    "body": {"query": "배출증 출력", "top_k": 3},
+}
+
+
+@pytest.fixture
+def message_format(monkeypatch):
+    def set_format(value: str):
+        monkeypatch.setattr(settings, "kafka_message_format", value)
+
+    return set_format
+
+
+def test_msgpack_roundtrip_keeps_body_structure(message_format):
+    message_format("msgpack")
+    data = codec.encode(FRAME)
+    assert data[:2] == bytes((codec.MAGIC, codec.VERSION))
+    assert codec.decode(data) == FRAME
+
+
+def test_json_format_encodes_body_as_string(message_format):
+    # 이전 consumer 호환: body는 JSON 문자열
+    message_format("json")
+    decoded = codec.decode(codec.encode(FRAME))
+    assert decoded["body"] == '{"query":"배출증 출력","top_k":3}'
+
+
+def test_decode_legacy_json():
+    assert codec.decode(b'{"command":"PIPELINE-START","body":"a"}') == {
+        "command": "PIPELINE-START",
+        "body": "a",
+    }
+
+
+def test_unsupported_envelope_version():
+    with pytest.raises(ValueError):
+        codec.decode(bytes((codec.MAGIC, codec.VERSION + 1)) + b"\x80")
+
+
+def test_msgpack_extra_types(message_format):
+    message_format("msgpack")
+    value = {
+        "at": datetime(2024, 1, 2, 3, 4, 5),
+        "id": UUID("12345678-1234-5678-1234-567812345678"),
+    }
+    assert codec.decode(codec.encode(value)) == {
+        "at": "2024-01-02T03:04:05",
+        "id": "12345678-1234-5678-1234-567812345678",
+    }
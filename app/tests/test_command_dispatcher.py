@@ -0,0 +1,144 @@
+import asyncio
+import sys
+from types import ModuleType
+import pytest
+
+pytest.importorskip("langchain_core")
+pytest.importorskip("fastapi")
+
+from infra.schema import StompFrameModel
+from services.dispatchers import command_dispatcher
+from services.dispatchers.command_dispatcher import CommandDispatcher
+from services.dto.rag import QueryByRagResult
+from services.llm.scheduler import Priority, llm_priority
+
+
+def message(command: str, body, offset: int = 0, key: str | None = None) -> dict:
+    return {
+        "topic": "rag",
+        "partition": 0,
+        "offset": offset,
+        "key": key,
+        "value": StompFrameModel.from_record(
+            {"command": command, "headers": {}, "body": body}
+        ),
+    }
+
+
+def test_batch_priority_is_set_per_command(monkeypatch):
+    seen: dict[str, Priority] = {}
+
+    async def pipeline_start_batch(messages):
+        seen["pipeline-start"] = llm_priority.get()
+        return []
+
+    async def query_by_rag_batch(messages):
+        seen["query-by-rag"] = llm_priority.get()
+        return []
+
+    dispatcher = CommandDispatcher()
+    monkeypatch.setattr(dispatcher, "pipeline_start_batch", pipeline_start_batch)
+    monkeypatch.setattr(dispatcher, "query_by_rag_batch", query_by_rag_batch)
+    failures = asyncio.run(
+        dispatcher.dispatch_batch(
+            [
+                message("PIPELINE-START", "a"),
+                message("QUERY-BY-RAG", {"query": "q"}, offset=1),
+            ]
+        )
+    )
+    assert failures == []
+    # 사용자 질의는 batch로 소비해도 대화형 우선순위
+    assert seen == {
+        "pipeline-start": Priority.BATCH,
+        "query-by-rag": Priority.INTERACTIVE,
+    }
+
+
+class FakeRagService:
+    def __init__(self, fail_batch: bool = False):
+        self.fail_batch = fail_batch
+        self.batches: list[list[str]] = []
+
+    async def achat_batch(self, requests, trace_ids):
+        self.batches.append([req.query for req in requests])
+        if self.fail_batch:
+            raise ConnectionError("qdrant down")
+        return [
+            ValueError("llm failed")
+            if req.query == "bad"
+            else QueryByRagResult(answer=f"answer {req.query}", hits=[])
+            for req in requests
+        ]
+
+
+class FakeIngestService:
+    async def ingest_many(self, files):
+        # 파일별 결과: 성공 True, 건너뜀 False, 실패는 예외
+        return [
+            FileNotFoundError(name) if name.startswith("missing") else name != "skip"
+            for name in files
+        ]
+
+
+@pytest.fixture
+def published(monkeypatch) -> list[tuple]:
+    # api.deps는 import시 qdrant에 연결하므로 dispatcher가 쓰는 서비스만 대체
+    deps = ModuleType("api.deps")
+    deps._rag_query_service = FakeRagService()
+    deps.get_ingest_service = FakeIngestService
+    monkeypatch.setitem(sys.modules, "api.deps", deps)
+
+    published: list[tuple] = []
+
+    async def publish_result(value, trace_id=None, client_id=None):
+        published.append((trace_id, value["answer"]))
+
+    monkeypatch.setattr(command_dispatcher, "publish_result", publish_result)
+    return published
+
+
+def test_invalid_query_fails_only_its_message(published):
+    messages = [
+        message("QUERY-BY-RAG", {"query": "q1"}, offset=0, key="t0"),
+        message("QUERY-BY-RAG", "[1, 2]", offset=1, key="t1"),
+        message("QUERY-BY-RAG", "not json", offset=2, key="t2"),
+        message("QUERY-BY-RAG", {"top_k": 3}, offset=3, key="t3"),
+        message("QUERY-BY-RAG", {"query": "bad"}, offset=4, key="t4"),
+        message("QUERY-BY-RAG", {"query": "q2"}, offset=5, key="t5"),
+    ]
+
+    failures = asyncio.run(CommandDispatcher().dispatch_batch(messages))
+
+    assert sorted(m["offset"] for m, _ in failures) == [1, 2, 3, 4]
+    assert all(isinstance(e, ValueError) for _, e in failures)
+    assert sys.modules["api.deps"]._rag_query_service.batches == [["q1", "bad", "q2"]]
+    assert published == [("t0", "answer q1"), ("t5", "answer q2")]
+
+
+def test_failed_batch_search_fails_all_batched_queries(published):
+    sys.modules["api.deps"]._rag_query_service = FakeRagService(fail_batch=True)
+    messages = [
+        message("QUERY-BY-RAG", {"query": "q1"}, offset=0),
+        message("QUERY-BY-RAG", "[]", offset=1),
+        message("QUERY-BY-RAG", {"query": "q2"}, offset=2),
+    ]
+
+    failures = asyncio.run(CommandDispatcher().dispatch_batch(messages))
+
+    assert sorted(m["offset"] for m, _ in failures) == [0, 1, 2]
+    assert isinstance(dict((m["offset"], e) for m, e in failures)[0], ConnectionError)
+    assert published == []
+
+
+def test_pipeline_batch_fails_only_missing_files(published):
+    messages = [
+        message("PIPELINE-START", "a.pdf", offset=0, key="t0"),
+        message("PIPELINE-START", "missing.pdf", offset=1, key="t1"),
+        message("PIPELINE-START", "skip", offset=2, key="t2"),
+    ]
+
+    failures = asyncio.run(CommandDispatcher().dispatch_batch(messages))
+
+    assert [(m["offset"], type(e)) for m, e in failures] == [(1, FileNotFoundError)]
+    assert published == [("t0", "a.pdf: upload completed.")]
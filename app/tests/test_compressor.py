@@ -0,0 +1,44 @@
+import pytest
+
+pytest.importorskip("pydantic_settings")
+
+from services.dto.rag import RagHit
+from services.retrieval.compressor import ExtractiveCompressor
+from services.retrieval.context_packer import ContextPacker
+
+
+def hit(text: str, **metadata) -> RagHit:
+    return RagHit(page_content=text, score=1.0, source="a.pdf", metadata=metadata)
+
+
+def test_compressed_chunks_drop_start_index_and_are_not_merged():
+    first = "Invoices are issued monthly. The office is closed on Sunday."
+    second = "Parking is free. Refunds follow the invoice date."
+    hits = [
+        hit(first, page=1, start_index=0),
+        hit(second, page=1, start_index=len(first) + 1),
+    ]
+
+    compressed = ExtractiveCompressor(ratio=1.0, min_chars=0).compress(
+        "invoice refunds", hits
+    )
+
+    assert [h.page_content for h in compressed] == [
+        "Invoices are issued monthly.",
+        "Refunds follow the invoice date.",
+    ]
+    assert all("start_index" not in h.metadata for h in compressed)
+    assert all(h.metadata["page"] == 1 for h in compressed)
+    # 원문 hit은 그대로 (응답용 hits는 압축하지 않음)
+    assert hits[0].metadata["start_index"] == 0
+
+    packed = ContextPacker().pack(compressed, token_budget=100)
+    assert len(packed.text.split("\n\n")) == 2
+
+
+def test_uncompressed_chunks_keep_start_index():
+    chunk = hit("Refunds follow the invoice date.", page=1, start_index=7)
+
+    compressed = ExtractiveCompressor(min_chars=0).compress("invoice", [chunk])
+
+    assert compressed == [chunk]
@@ -0,0 +1,67 @@
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("pydantic_settings")
+
+from services.dto.rag import RagHit
+from services.retrieval.context_packer import ContextPacker, estimate_tokens
+
+
+def hit(text: str, score: float, **metadata) -> RagHit:
+    return RagHit(page_content=text, score=score, source="a.pdf", metadata=metadata)
+
+
+def test_contiguous_chunks_are_merged_without_overlap():
+    first = "alpha beta gamma"
+    second = "gamma delta"
+    packed = ContextPacker().pack(
+        [
+            hit(first, 0.9, page=1, start_index=0),
+            hit(second, 0.8, page=1, start_index=first.index("gamma")),
+        ],
+        token_budget=100,
+    )
+    assert packed.text == "alpha beta gamma delta"
+    assert len(packed.hits) == 2
+
+
+def test_distant_chunks_on_same_page_stay_separate():
+    packed = ContextPacker().pack(
+        [
+            hit("alpha beta", 0.9, page=1, start_index=0),
+            hit("omega psi", 0.8, page=1, start_index=500),
+        ],
+        token_budget=100,
+    )
+    assert packed.text == "alpha beta\n\nomega psi"
+
+
+def test_near_duplicates_are_dropped():
+    packed = ContextPacker(dedupe_threshold=0.9).pack(
+        [hit("same text here", 0.9), hit("same text here", 0.5)],
+        token_budget=100,
+    )
+    assert [h.score for h in packed.hits] == [0.9]
+
+
+def test_first_overflowing_block_is_truncated():
+    # budget보다 긴 chunk 1개만 검색되어도 context가 비지 않음
+    long_text = "배출증 출력 " * 1000
+    packed = ContextPacker().pack([hit(long_text, 0.9)], token_budget=200)
+    assert packed.text
+    assert packed.tokens <= 200
+    assert long_text.startswith(packed.text)
+
+
+def test_packing_stops_after_truncated_block():
+    packed = ContextPacker().pack(
+        [
+            hit("word " * 40, 0.9),
+            hit("x" * 400, 0.8),
+            hit("tiny", 0.7),
+        ],
+        token_budget=60,
+    )
+    assert "tiny" not in packed.text
+    assert packed.tokens <= 60
+    assert estimate_tokens(packed.text) <= packed.tokens
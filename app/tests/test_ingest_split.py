@@ -0,0 +1,82 @@
+import asyncio
+import sys
+from contextlib import asynccontextmanager
+from types import ModuleType
+import pytest
+
+pytest.importorskip("langchain_community")
+pytest.importorskip("fastapi")
+
+import langchain_community.document_loaders as loaders
+from langchain_core.documents import Document
+from core.config import settings
+from repositories.pd_repository import ParentDocumentRepository
+from services.ingest_service import RagIngestService
+from services.rag_service import _hit_from_point
+from services.retrieval.context_packer import ContextPacker
+
+PAGE = " ".join(f"문장{i} 배출증 출력 절차를 설명합니다." for i in range(40))
+
+
+class FakePdfLoader:
+    def __init__(self, path):
+        self.path = str(path)
+
+    def load(self) -> list[Document]:
+        return [Document(page_content=PAGE, metadata={"source": self.path, "page": 0})]
+
+
+@pytest.fixture
+def split(monkeypatch, tmp_path):
+    """DB/PDF 파서만 대체하고 실제 _split 실행"""
+
+    @asynccontextmanager
+    async def db_session_ctx():
+        yield None
+
+    async def add_all(self, docs):
+        return [
+            Document(
+                page_content=d.page_content, metadata={**d.metadata, "parent_id": i}
+            )
+            for i, d in enumerate(docs)
+        ]
+
+    deps = ModuleType("api.deps")
+    deps.db_session_ctx = db_session_ctx
+    monkeypatch.setitem(sys.modules, "api.deps", deps)
+    monkeypatch.setattr(ParentDocumentRepository, "add_all", add_all)
+    monkeypatch.setattr(loaders, "PyPDFLoader", FakePdfLoader)
+    monkeypatch.setattr(settings, "pdf_dir", str(tmp_path))
+    (tmp_path / "manual.pdf").touch()
+
+    service = RagIngestService(qdrant=None, embedder=None, collection="test")
+    return lambda name: asyncio.run(service._split(name))
+
+
+def test_split_chunks_carry_start_index(split):
+    chunks = split("manual")
+    assert len(chunks) > 3
+    assert all("start_index" in c.metadata for c in chunks)
+
+
+def test_split_then_pack_merges_adjacent_chunks(split):
+    chunks = split("manual")
+    parent_id = chunks[0].metadata["parent_id"]
+    siblings = [c for c in chunks if c.metadata["parent_id"] == parent_id]
+    assert len(siblings) > 1
+
+    # qdrant payload와 같은 형태로 검색결과 구성 (점수는 역순으로 섞음)
+    hits = [
+        _hit_from_point(
+            {"page_content": c.page_content, "metadata": dict(c.metadata)},
+            score=1.0 - i / 100,
+        )
+        for i, c in enumerate(reversed(siblings))
+    ]
+    packed = ContextPacker().pack(hits, token_budget=10_000)
+
+    # 같은 parent의 이어지는 chunk는 하나의 구간으로 원문 순서대로 병합
+    assert "\n\n" not in packed.text
+    assert packed.text.split() == " ".join(c.page_content for c in siblings).split()
+    assert len(packed.hits) == len(siblings)
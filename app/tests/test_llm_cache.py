@@ -0,0 +1,80 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+
+pytest.importorskip("langchain_core")
+pytest.importorskip("sqlalchemy")
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.outputs import Generation
+from services.llm import cache as cache_module
+from services.llm.cache import TieredLLMCache, cache_key
+
+
+class FakeDb:
+    def __init__(self, fail: bool = False):
+        self.rows: dict[str, list] = {}
+        self.fail = fail
+
+    def get(self, key):
+        if self.fail:
+            raise ConnectionError("db down")
+        return self.rows.get(key)
+
+    async def aget(self, key):
+        return self.get(key)
+
+    def put(self, key, llm_string, value):
+        if self.fail:
+            raise ConnectionError("db down")
+        self.rows[key] = value
+
+    async def aput(self, key, llm_string, value):
+        self.put(key, llm_string, value)
+
+
+def test_repeated_prompt_is_served_from_cache():
+    cache = TieredLLMCache(maxsize=8, ttl_sec=60, db=None)
+    llm = FakeListChatModel(responses=["첫번째", "두번째"], cache=cache)
+
+    assert llm.invoke("질문").content == "첫번째"
+    assert llm.invoke("질문").content == "첫번째"
+    assert llm.invoke("다른 질문").content == "두번째"
+
+    async def run():
+        return (await llm.ainvoke("질문")).content
+
+    assert asyncio.run(run()) == "첫번째"
+
+
+def test_db_hit_fills_memory_tier():
+    db = FakeDb()
+    value = [Generation(text="답변")]
+    db.rows[cache_key("p", "llm")] = value
+    cache = TieredLLMCache(maxsize=8, ttl_sec=60, db=db)
+
+    assert cache.lookup("p", "llm") == value
+    db.rows.clear()
+    assert cache.lookup("p", "llm") == value
+    assert asyncio.run(cache.alookup("other", "llm")) is None
+
+
+def test_memory_entries_expire(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache_module, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    cache = TieredLLMCache(maxsize=8, ttl_sec=10, db=None)
+    cache.update("p", "llm", [Generation(text="답변")])
+
+    now[0] += 5
+    assert cache.lookup("p", "llm") is not None
+    now[0] += 10
+    assert cache.lookup("p", "llm") is None
+    assert len(cache.memory) == 0
+
+
+def test_db_failures_do_not_break_calls():
+    cache = TieredLLMCache(maxsize=8, ttl_sec=60, db=FakeDb(fail=True))
+
+    cache.update("p", "llm", [Generation(text="답변")])
+    assert cache.lookup("p", "llm") == [Generation(text="답변")]
+    assert cache.lookup("missing", "llm") is None
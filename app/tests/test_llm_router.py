@@ -0,0 +1,104 @@
+import asyncio
+from typing import Any
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from langchain_core.callbacks import (
+    AsyncCallbackManager,
+    BaseCallbackHandler,
+    CallbackManager,
+)
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from core.exception.customs import OverloadedException
+from services.llm.router import HedgedChatModel
+
+
+class OverloadedChatModel(GenericFakeChatModel):
+    """대기열 포화로 항상 실패하는 primary"""
+
+    def _generate(self, *args: Any, **kwargs: Any):
+        raise OverloadedException("queue full")
+
+    def _stream(self, *args: Any, **kwargs: Any):
+        raise OverloadedException("queue full")
+        yield
+
+    async def _astream(self, *args: Any, **kwargs: Any):
+        raise OverloadedException("queue full")
+        yield
+
+
+class TokenCounter(BaseCallbackHandler):
+    def __init__(self):
+        self.tokens: list[str] = []
+
+    def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        self.tokens.append(token)
+
+
+def fake(text: str) -> GenericFakeChatModel:
+    return GenericFakeChatModel(messages=iter([AIMessage(content=text)] * 4))
+
+
+def hedged(primary, secondary) -> HedgedChatModel:
+    return HedgedChatModel(primary=primary, secondary=secondary)
+
+
+def test_failover_to_secondary_on_overload():
+    model = hedged(OverloadedChatModel(messages=iter([])), fake("from secondary"))
+
+    assert model.invoke("q").content == "from secondary"
+    assert model.stats()["failover"] == 1
+
+
+def test_stream_failover_before_first_chunk():
+    model = hedged(OverloadedChatModel(messages=iter([])), fake("a b c"))
+
+    assert "".join(c.content for c in model.stream("q")) == "a b c"
+
+    async def run():
+        return "".join([c.content async for c in model.astream("q")])
+
+    assert asyncio.run(run()) == "a b c"
+    assert model.stats()["failover"] == 2
+
+
+def test_stream_emits_each_token_callback_once():
+    model = hedged(fake("a b c"), fake("unused"))
+    counter = TokenCounter()
+
+    list(model.stream("q", config={"callbacks": [counter]}))
+    sync_tokens = [t for t in counter.tokens if t]
+    counter.tokens.clear()
+
+    async def run():
+        async for _ in model.astream("q", config={"callbacks": [counter]}):
+            pass
+
+    asyncio.run(run())
+    assert sync_tokens == ["a", " ", "b", " ", "c"]
+    assert [t for t in counter.tokens if t] == sync_tokens
+
+
+def test_stream_leaves_token_callbacks_to_caller():
+    # run_manager를 받은 경우에도 토큰 알림은 BaseChatModel.stream/astream 몫
+    model = hedged(fake("a b c"), fake("unused"))
+    messages = [HumanMessage(content="q")]
+    counter = TokenCounter()
+    (run_manager,) = CallbackManager(handlers=[counter]).on_chat_model_start(
+        {}, [messages]
+    )
+
+    chunks = list(model._stream(messages, run_manager=run_manager))
+
+    async def run():
+        (arun_manager,) = await AsyncCallbackManager(
+            handlers=[counter]
+        ).on_chat_model_start({}, [messages])
+        return [c async for c in model._astream(messages, run_manager=arun_manager)]
+
+    achunks = asyncio.run(run())
+    assert len(chunks) == len(achunks) == 5
+    assert counter.tokens == []
@@ -0,0 +1,142 @@
+import asyncio
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from core.exception.customs import OverloadedException
+from services.llm.scheduler import LLMScheduler, Priority, priority_scope
+
+
+def scheduler(**kwargs) -> LLMScheduler:
+    return LLMScheduler(
+        name="test",
+        **{"max_concurrency": 1, "max_queue": 8, "queue_timeout_sec": 1.0, **kwargs},
+    )
+
+
+def test_waiters_are_granted_by_priority():
+    async def run():
+        s = scheduler()
+        await s.aacquire()
+        order: list[str] = []
+
+        async def wait(name: str, priority: Priority):
+            await s.aacquire(priority)
+            order.append(name)
+            s.release()
+
+        tasks = [
+            asyncio.create_task(wait("batch", Priority.BATCH)),
+            asyncio.create_task(wait("agent", Priority.AGENT)),
+            asyncio.create_task(wait("interactive", Priority.INTERACTIVE)),
+        ]
+        await asyncio.sleep(0)
+        assert s.stats()["queued"] == 3
+
+        s.release()
+        await asyncio.gather(*tasks)
+        assert order == ["interactive", "agent", "batch"]
+        assert s.stats()["active"] == 0
+
+    asyncio.run(run())
+
+
+def test_same_priority_is_fifo():
+    async def run():
+        s = scheduler()
+        await s.aacquire()
+        order: list[int] = []
+
+        async def wait(i: int):
+            await s.aacquire(Priority.BATCH)
+            order.append(i)
+            s.release()
+
+        tasks = [asyncio.create_task(wait(i)) for i in range(5)]
+        await asyncio.sleep(0)
+        s.release()
+        await asyncio.gather(*tasks)
+        assert order == list(range(5))
+
+    asyncio.run(run())
+
+
+def test_priority_scope_sets_default_priority():
+    async def run():
+        s = scheduler()
+        await s.aacquire()
+        order: list[str] = []
+
+        async def wait(name: str):
+            await s.aacquire()
+            order.append(name)
+            s.release()
+
+        with priority_scope(Priority.BATCH):
+            batch = asyncio.create_task(wait("batch"))
+        interactive = asyncio.create_task(wait("interactive"))
+        await asyncio.sleep(0)
+        s.release()
+        await asyncio.gather(batch, interactive)
+        assert order == ["interactive", "batch"]
+
+    asyncio.run(run())
+
+
+def test_full_queue_is_rejected():
+    async def run():
+        s = scheduler(max_queue=1)
+        await s.aacquire()
+        waiter = asyncio.create_task(s.aacquire())
+        await asyncio.sleep(0)
+        with pytest.raises(OverloadedException):
+            await s.aacquire()
+        assert s.stats()["rejected"] == 1
+
+        s.release()
+        await waiter
+        s.release()
+
+    asyncio.run(run())
+
+
+def test_queue_timeout_frees_waiter():
+    async def run():
+        s = scheduler(queue_timeout_sec=0.01)
+        await s.aacquire()
+        with pytest.raises(OverloadedException):
+            await s.aacquire()
+        stats = s.stats()
+        assert stats["timeouts"] == 1
+        assert stats["queued"] == 0
+
+        # 시간 초과된 대기자는 건너뛰고 slot 반환
+        s.release()
+        assert s.stats()["active"] == 0
+
+    asyncio.run(run())
+
+
+def test_cancelled_waiter_does_not_leak_slot():
+    async def run():
+        s = scheduler()
+        await s.aacquire()
+        waiter = asyncio.create_task(s.aacquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        s.release()
+        stats = s.stats()
+        assert (stats["active"], stats["queued"]) == (0, 0)
+
+    asyncio.run(run())
+
+
+def test_sync_slot_shares_capacity():
+    s = scheduler(queue_timeout_sec=0.01)
+    with s.slot():
+        with pytest.raises(OverloadedException):
+            s.acquire()
+    assert s.stats()["active"] == 0
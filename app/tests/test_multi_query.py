@@ -0,0 +1,84 @@
+from types import SimpleNamespace
+import pytest
+
+pytest.importorskip("langchain_core")
+pytest.importorskip("qdrant_client")
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from infra import retriever as retriever_module
+from infra.retriever import ParallelMultiQueryRetriever
+from utils.lru_cache import LRUCache
+
+
+@pytest.fixture(autouse=True)
+def variant_cache(monkeypatch):
+    monkeypatch.setattr(retriever_module, "_query_variant_cache", LRUCache(8))
+
+
+class FakeEmbedder(Embeddings):
+    def __init__(self):
+        self.calls: list[list[str]] = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return [[float(i)] for i in range(len(texts))]
+
+    def embed_query(self, text):
+        return [0.0]
+
+
+def point(id_: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=id_, payload={"page_content": f"doc {id_}", "metadata": {"page": id_}}
+    )
+
+
+class FakeClient:
+    def __init__(self, results: list[list[int]]):
+        self.results = results
+        self.batches: list[list] = []
+
+    def query_batch_points(self, collection_name, requests):
+        self.batches.append(requests)
+        return [
+            SimpleNamespace(points=[point(i) for i in ids])
+            for ids in self.results[: len(requests)]
+        ]
+
+
+def retriever(llm, client, embedder) -> ParallelMultiQueryRetriever:
+    return ParallelMultiQueryRetriever.model_construct(
+        client=client,
+        async_client=None,
+        embedder=embedder,
+        llm=llm,
+        collection_name="test",
+        query_filter=None,
+        search_params=None,
+        top_k=3,
+        include_original=True,
+    )
+
+
+def test_variants_are_deduped_and_searched_in_one_batch():
+    llm = FakeListChatModel(responses=["환불 기준\n\n환불 규정\n환불 기준\n"])
+    client = FakeClient([[1, 2], [2, 3], [4]])
+    embedder = FakeEmbedder()
+
+    docs = retriever(llm, client, embedder).invoke("환불 규정")
+
+    # 원 질의와 같은 변형, 중복 변형은 한번만 조회
+    assert embedder.calls == [["환불 규정", "환불 기준"]]
+    assert len(client.batches) == 1 and len(client.batches[0]) == 2
+    # 두 질의에 모두 나온 point가 RRF로 가장 앞, point id 기준 중복 제거
+    assert [d.metadata["_id"] for d in docs] == [2, 1, 3]
+
+
+def test_variants_are_cached_per_normalized_query():
+    llm = FakeListChatModel(responses=["a", "b"])
+    r = retriever(llm, FakeClient([[1], [2]]), FakeEmbedder())
+
+    assert r.generate_queries("Refund  Policy") == ["a"]
+    assert r.generate_queries("refund policy") == ["a"]
+    assert llm.i == 1
@@ -0,0 +1,68 @@
+import pytest
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("langchain_core")
+pytest.importorskip("pydantic_settings")
+
+from sqlalchemy import create_engine, event, text
+from infra.db.postgre import PostgresDocStore
+from utils.lru_cache import LRUCache
+
+
+@pytest.fixture
+def engine():
+    # JSONB 대신 sqlite json 컬럼으로 같은 테이블 구성
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "CREATE TABLE parent_document ("
+                "id INTEGER PRIMARY KEY, content TEXT NOT NULL, mdata JSON NOT NULL)"
+            )
+        )
+        conn.execute(
+            text(
+                "INSERT INTO parent_document VALUES "
+                "(1, 'one', '{\"page\": 1}'), (2, 'two', '{}')"
+            )
+        )
+    engine.queries = []
+    event.listen(
+        engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: engine.queries.append(statement),
+    )
+    return engine
+
+
+def test_mget_keeps_order_and_caches(engine):
+    store = PostgresDocStore(engine, cache=LRUCache(maxsize=8))
+
+    docs = store.mget(["2", "x", "1", "9", "2"])
+    assert [d and d.page_content for d in docs] == ["two", None, "one", None, "two"]
+    assert docs[2].metadata == {"page": 1, "parent_id": 1}
+    assert len(engine.queries) == 1
+
+    # 두번째 조회는 캐시에서 (없는 id만 다시 조회)
+    assert [d.page_content for d in store.mget(["1", "2"])] == ["one", "two"]
+    assert len(engine.queries) == 1
+
+
+def test_mdelete_invalidates_cache(engine):
+    store = PostgresDocStore(engine, cache=LRUCache(maxsize=8))
+    store.mget(["1"])
+
+    store.mdelete(["1"])
+
+    assert store.mget(["1"]) == [None]
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache: LRUCache[str, int] = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get_many(["a", "b", "c"]) == {"a": 1, "c": 3}
+    assert cache.stats()["size"] == 2
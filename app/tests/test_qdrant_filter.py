@@ -0,0 +1,83 @@
+import pytest
+
+pytest.importorskip("qdrant_client")
+
+from qdrant_client.http.models import (
+    DatetimeRange,
+    FieldCondition,
+    Filter,
+    MatchAny,
+    MatchValue,
+    Range,
+)
+from core.exception.customs import ValidationException
+from infra.db.qdrant_filter import compile_filter, compile_predicate
+
+
+def test_empty_spec_is_no_filter():
+    assert compile_filter(None) is None
+    assert compile_filter({}) is None
+
+
+def test_scalar_and_list_values():
+    f = compile_filter({"metadata.source": "a.pdf", "metadata.page": [1, 2]})
+    assert f == Filter(
+        must=[
+            FieldCondition(key="metadata.source", match=MatchValue(value="a.pdf")),
+            FieldCondition(key="metadata.page", match=MatchAny(any=[1, 2])),
+        ]
+    )
+
+
+def test_operators():
+    f = compile_filter(
+        {
+            "metadata.page": {"$gte": 1, "$lt": 10},
+            "metadata.source": {"$ne": "b.pdf"},
+            "metadata.lang": {"$nin": ["en"], "$in": ["ko", "ja"]},
+        }
+    )
+    assert f.must == [
+        FieldCondition(key="metadata.page", range=Range(gte=1, lt=10)),
+        FieldCondition(key="metadata.lang", match=MatchAny(any=["ko", "ja"])),
+    ]
+    assert f.must_not == [
+        FieldCondition(key="metadata.source", match=MatchValue(value="b.pdf")),
+        FieldCondition(key="metadata.lang", match=MatchAny(any=["en"])),
+    ]
+
+
+def test_string_range_is_datetime():
+    f = compile_filter({"metadata.created": {"$gte": "2024-01-01T00:00:00Z"}})
+    assert isinstance(f.must[0].range, DatetimeRange)
+
+
+def test_same_spec_reuses_compiled_filter():
+    # key 순서가 달라도 같은 조건이면 같은 객체
+    a = compile_filter({"x": 1, "y": {"$gt": 2}})
+    b = compile_filter({"y": {"$gt": 2}, "x": 1})
+    assert a is b
+
+
+def test_invalid_spec():
+    with pytest.raises(ValidationException):
+        compile_filter({"x": {"$regex": "a.*"}})
+    with pytest.raises(ValidationException):
+        compile_filter({"x": object()})
+
+
+def test_predicate_matches_filter_semantics():
+    match = compile_predicate(
+        {
+            "metadata.source": {"$in": ["a.pdf", "b.pdf"]},
+            "page": {"$gte": 2},
+            "lang": {"$ne": "en"},
+        }
+    )
+    assert match({"source": "a.pdf", "page": 3})
+    assert not match({"source": "a.pdf", "page": 1})
+    assert not match({"source": "c.pdf", "page": 3})
+    assert not match({"source": "a.pdf", "page": 3, "lang": "en"})
+    # 비교 불가능한 타입은 불일치
+    assert not match({"source": "a.pdf", "page": "3"})
+    assert compile_predicate(None) is None
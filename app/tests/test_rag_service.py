@@ -0,0 +1,105 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+
+pytest.importorskip("langchain_core")
+pytest.importorskip("qdrant_client")
+
+from qdrant_client.models import PayloadSelectorInclude
+from core.db.vdb import CollectionProfile
+from services.rag_service import RagQueryService
+
+
+class FakeEmbedder:
+    def __init__(self):
+        self.calls: list[list[str]] = []
+
+    async def aembed(self, documents):
+        documents = list(documents)
+        self.calls.append(documents)
+        return [[float(i)] for i in range(len(documents))]
+
+
+class FakeAsyncClient:
+    def __init__(self):
+        self.batches: list[list] = []
+
+    async def query_batch_points(self, collection_name, requests):
+        self.batches.append(requests)
+        return [
+            SimpleNamespace(
+                points=[
+                    SimpleNamespace(
+                        payload={
+                            "page_content": f"doc {i}",
+                            "metadata": {"source": "a.pdf", "page": i},
+                        },
+                        score=1.0 - i / 10,
+                    )
+                ]
+            )
+            for i, _ in enumerate(requests)
+        ]
+
+
+def service() -> RagQueryService:
+    qdrant = SimpleNamespace(
+        profile=CollectionProfile(), async_client=FakeAsyncClient(), client=None
+    )
+    return RagQueryService(qdrant=qdrant, embedder=FakeEmbedder(), collection="test")
+
+
+def test_aretrieve_many_uses_one_embedding_and_one_batch_query():
+    svc = service()
+    results = asyncio.run(
+        svc.aretrieve_many(
+            [("q1", {"metadata.page": 1}, 3), ("q2", None, 5)],
+            fields=["metadata.page"],
+            with_text=False,
+        )
+    )
+
+    assert svc.embedder.calls == [["q1", "q2"]]
+    (requests,) = svc.qdrant.async_client.batches
+    assert [r.limit for r in requests] == [3, 5]
+    assert requests[0].filter is not None and requests[1].filter is None
+    assert requests[0].with_payload == PayloadSelectorInclude(
+        include=["metadata.source", "metadata.page"]
+    )
+    assert [[h.page_content for h in r.hits] for r in results] == [["doc 0"], ["doc 1"]]
+    assert results[0].hits[0].source == "a.pdf"
+
+
+def test_aretrieve_many_empty():
+    assert asyncio.run(service().aretrieve_many([])) == []
+
+
+def test_achat_chain_steps_skip_the_executor(monkeypatch):
+    import langchain_core.runnables.base as runnable_base
+    from langchain_core.language_models.fake_chat_models import FakeListChatModel
+    import services.rag_service as rag_service
+    from services.dto.rag import QueryByRagResult, RagHit
+
+    hops: list = []
+
+    async def run_in_executor(config, func, *args, **kwargs):
+        hops.append(func)
+        return func(*args, **kwargs)
+
+    async def aretrieve_for_prompt(name, query, filter, top_k, llm=None):
+        hit = RagHit(page_content="doc", score=1.0, source="a.pdf", metadata={})
+        return QueryByRagResult(answer="", hits=[hit])
+
+    monkeypatch.setattr(runnable_base, "run_in_executor", run_in_executor)
+    monkeypatch.setattr(
+        rag_service, "select_llm", lambda name: FakeListChatModel(responses=["답변"])
+    )
+    svc = service()
+    monkeypatch.setattr(svc, "aretrieve_for_prompt", aretrieve_for_prompt)
+
+    chain = svc._build_chain("studio", "qdrant")
+    result = asyncio.run(chain.ainvoke({"input": "q", "filter": {}, "top_k": 1}))
+
+    assert result.answer == "답변"
+    assert [hit.page_content for hit in result.hits] == ["doc"]
+    assert hops == []
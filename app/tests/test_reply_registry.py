@@ -0,0 +1,76 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+
+pytest.importorskip("aiokafka")
+pytest.importorskip("fastapi")
+
+from infra.messaging import result_channel
+from infra.messaging.result_channel import ReplyRegistry
+
+
+def test_waiter_receives_result_resolved_later():
+    async def run():
+        registry = ReplyRegistry()
+        waiter = asyncio.create_task(registry.wait("t1", timeout=1.0))
+        await asyncio.sleep(0)
+        assert registry.stats()["waiting"] == 1
+
+        registry.resolve("t1", {"answer": "a"})
+        assert await waiter == {"answer": "a"}
+        assert registry.stats() == {"waiting": 0, "cached": 1}
+
+    asyncio.run(run())
+
+
+def test_result_arriving_before_wait_is_kept_for_long_poll():
+    async def run():
+        registry = ReplyRegistry()
+        registry.resolve("t1", {"answer": "a"})
+        assert await registry.wait("t1", timeout=0) == {"answer": "a"}
+        assert await registry.wait("t1", timeout=1.0) == {"answer": "a"}
+
+    asyncio.run(run())
+
+
+def test_wait_timeout_returns_none_and_drops_waiter():
+    async def run():
+        registry = ReplyRegistry()
+        assert await registry.wait("t1", timeout=0.01) is None
+        assert registry.stats() == {"waiting": 0, "cached": 0}
+
+    asyncio.run(run())
+
+
+def test_results_expire_and_are_bounded(monkeypatch):
+    now = [0.0]
+    clock = SimpleNamespace(monotonic=lambda: now[0])
+    monkeypatch.setattr(result_channel, "time", clock)
+    registry = ReplyRegistry(max_results=2, ttl_sec=10)
+    for trace_id in ("t1", "t2", "t3"):
+        registry.resolve(trace_id, {"answer": trace_id})
+
+    # 가장 오래된 결과부터 제거
+    assert registry.get("t1") is None
+    assert registry.get("t3") == {"answer": "t3"}
+    now[0] = 11
+    assert registry.get("t3") is None
+
+
+def test_deliver_local_resolves_only_final_frames(monkeypatch):
+    registry = ReplyRegistry()
+    sent: list[dict] = []
+
+    async def broadcast(message, predicate):
+        sent.append(message)
+
+    monkeypatch.setattr(result_channel, "reply_registry", registry)
+    monkeypatch.setattr(result_channel.ws_manager, "broadcast", broadcast)
+
+    async def run():
+        for value in ({"type": "token", "token": "a"}, {"type": "done", "answer": "a"}):
+            await result_channel.deliver_local(dict(trace_id="t1", value=value))
+
+    asyncio.run(run())
+    assert registry.get("t1") == {"type": "done", "answer": "a"}
+    assert len(sent) == 2
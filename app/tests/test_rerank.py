@@ -0,0 +1,80 @@
+from types import SimpleNamespace
+import pytest
+
+pytest.importorskip("pydantic_settings")
+
+from services.dto.rag import RagHit
+from services.retrieval import rerank
+from services.retrieval.rerank import LexicalOverlapScorer, Reranker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class SlowScorer:
+    """load/score마다 가짜 시계를 지정한 시간(초)만큼 진행"""
+
+    def __init__(self, clock: FakeClock, load_sec: float = 0.0, score_sec: float = 0.0):
+        self.clock = clock
+        self.load_sec = load_sec
+        self.score_sec = score_sec
+        self.batches: list[int] = []
+
+    def load(self) -> None:
+        self.clock.now += self.load_sec
+        self.load_sec = 0.0
+
+    def score(self, query, passages):
+        self.clock.now += self.score_sec
+        self.batches.append(len(passages))
+        # 뒤쪽 hit일수록 높은 점수 (벡터 순서와 반대)
+        return [float(p.split()[-1]) for p in passages]
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(rerank, "time", SimpleNamespace(perf_counter=clock))
+    return clock
+
+
+def hits(n: int) -> list[RagHit]:
+    return [
+        RagHit(page_content=f"doc {i}", score=1.0, source="a.pdf", metadata={})
+        for i in range(n)
+    ]
+
+
+def test_rerank_orders_by_score_in_batches(clock):
+    scorer = SlowScorer(clock)
+    ranked = Reranker(scorer, batch_size=2, budget_ms=150).rerank("q", hits(5), 3)
+
+    assert [h.page_content for h in ranked] == ["doc 4", "doc 3", "doc 2"]
+    assert [h.score for h in ranked] == [4.0, 3.0, 2.0]
+    assert scorer.batches == [2, 2, 1]
+
+
+def test_rerank_falls_back_to_vector_order_over_budget(clock):
+    scorer = SlowScorer(clock, score_sec=0.1)
+    ranked = Reranker(scorer, batch_size=2, budget_ms=150).rerank("q", hits(6), 3)
+
+    assert [h.page_content for h in ranked] == ["doc 0", "doc 1", "doc 2"]
+    # budget을 넘은 뒤의 batch는 점수화하지 않음
+    assert scorer.batches == [2, 2]
+
+
+def test_model_load_is_not_counted_against_budget(clock):
+    scorer = SlowScorer(clock, load_sec=5.0, score_sec=0.01)
+    ranked = Reranker(scorer, batch_size=2, budget_ms=150).rerank("q", hits(4), 2)
+
+    assert [h.page_content for h in ranked] == ["doc 3", "doc 2"]
+
+
+def test_lexical_overlap_scorer():
+    scores = LexicalOverlapScorer().score("환불 규정", ["환불 규정 안내", "배송 안내"])
+    assert scores[0] > scores[1]
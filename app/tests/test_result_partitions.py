@@ -0,0 +1,98 @@
+import asyncio
+import pytest
+
+pytest.importorskip("aiokafka")
+pytest.importorskip("pydantic_settings")
+
+from aiokafka import TopicPartition
+from infra.messaging.kafka.aio_kafka import KafkaBridge
+
+TOPIC = "rag_results"
+
+
+class FakeResultConsumer:
+    """topic metadata와 assign/seek 호출만 흉내"""
+
+    def __init__(self):
+        self.partitions: set[int] = set()
+        self.assigned: list[TopicPartition] = []
+        self.positions: dict[TopicPartition, int] = {}
+        self.seeks: list[tuple[str, TopicPartition]] = []
+
+    async def topics(self):
+        return {TOPIC} if self.partitions else set()
+
+    def partitions_for_topic(self, topic):
+        return set(self.partitions) or None
+
+    async def position(self, tp):
+        return self.positions[tp]
+
+    def assign(self, partitions):
+        self.assigned = sorted(partitions)
+
+    def seek(self, tp, offset):
+        self.positions[tp] = offset
+
+    async def seek_to_end(self, *tps):
+        self.seeks.extend(("end", tp) for tp in tps)
+
+    async def seek_to_beginning(self, *tps):
+        self.seeks.extend(("beginning", tp) for tp in tps)
+
+
+def bridge(consumer: FakeResultConsumer) -> KafkaBridge:
+    b = KafkaBridge()
+    b.config(
+        servers="localhost:9092",
+        group="test",
+        tin="rag",
+        tout="rag",
+        result_topic=TOPIC,
+        result_callback=lambda message: None,
+    )
+    b._result_consumer = consumer
+    return b
+
+
+def test_topic_created_after_startup_is_assigned_from_beginning():
+    async def run():
+        consumer = FakeResultConsumer()
+        b = bridge(consumer)
+
+        # 기동 시점에는 topic 없음
+        await b._assign_result_partitions(from_end=True)
+        assert b._result_partitions == set()
+
+        # 첫 발행으로 자동 생성된 뒤 재조회
+        consumer.partitions = {0, 1}
+        await b._assign_result_partitions()
+        tps = [TopicPartition(TOPIC, 0), TopicPartition(TOPIC, 1)]
+        assert consumer.assigned == tps
+        assert sorted(consumer.seeks) == [("beginning", tp) for tp in tps]
+
+    asyncio.run(run())
+
+
+def test_added_partition_keeps_existing_positions():
+    async def run():
+        consumer = FakeResultConsumer()
+        consumer.partitions = {0}
+        b = bridge(consumer)
+        await b._assign_result_partitions(from_end=True)
+        tp0, tp1 = TopicPartition(TOPIC, 0), TopicPartition(TOPIC, 1)
+        assert consumer.seeks == [("end", tp0)]
+
+        consumer.positions[tp0] = 42
+        consumer.partitions = {0, 1}
+        await b._assign_result_partitions()
+        assert consumer.assigned == [tp0, tp1]
+        assert consumer.positions[tp0] == 42
+        assert consumer.seeks[-1] == ("beginning", tp1)
+
+        # 변경이 없으면 재할당하지 않음
+        consumer.assigned = []
+        await b._assign_result_partitions()
+        assert consumer.assigned == []
+
+    asyncio.run(run())
@@ -0,0 +1,31 @@
+import pytest
+
+pytest.importorskip("aiokafka")
+pytest.importorskip("pydantic_settings")
+
+from core.config import settings
+from infra.messaging.kafka.retry import RetryPolicy
+
+
+def test_delay_grows_exponentially_with_jitter():
+    policy = RetryPolicy(backoff_ms=1000, max_backoff_ms=60000)
+    for attempt, base in ((1, 1000), (2, 2000), (3, 4000)):
+        for _ in range(20):
+            assert base * 0.5 <= policy.delay_ms(attempt) <= base
+
+
+def test_delay_is_capped():
+    policy = RetryPolicy(backoff_ms=1000, max_backoff_ms=5000)
+    assert policy.delay_ms(10) <= 5000
+
+
+def test_command_policy_overrides_defaults(monkeypatch):
+    monkeypatch.setattr(settings, "kafka_retry_max_attempts", 5)
+    monkeypatch.setattr(
+        settings, "kafka_retry_policies", {"query-by-rag": {"backoff_ms": 200}}
+    )
+    policy = RetryPolicy.for_command("QUERY-BY-RAG")
+    assert policy.max_attempts == 5
+    assert policy.backoff_ms == 200
+    default = RetryPolicy.for_command("other")
+    assert default.backoff_ms == settings.kafka_retry_backoff_ms
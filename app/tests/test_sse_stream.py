@@ -0,0 +1,82 @@
+import importlib
+import sys
+from types import ModuleType
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from core.exception.customs import PartialResultException, ValidationException
+from core.exception.handlers import get_exception_handlers
+from services.dto.rag import LlmUsage, RagHit
+
+
+class FakeRagService:
+    def __init__(self, fail_at: str | None = None):
+        self.fail_at = fail_at
+
+    async def astream_chat(self, retriever_name: str, **kwargs):
+        if self.fail_at == "retrieve":
+            raise ValidationException(f"Unknown retriever: {retriever_name}")
+        yield "hits", [RagHit(page_content="p", score=1.0, source="a.pdf", metadata={})]
+        yield "token", "배출증"
+        if self.fail_at == "generate":
+            raise PartialResultException("llm connection reset")
+        yield "token", " 출력"
+        yield "usage", LlmUsage(model="test")
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # api.deps는 import시 qdrant에 연결하므로 endpoint 의존성만 대체
+    deps = ModuleType("api.deps")
+    deps.get_rag_service = lambda: None
+    deps.find_trace_id = lambda: "T1"
+    monkeypatch.setitem(sys.modules, "api.deps", deps)
+    monkeypatch.delitem(sys.modules, "api.v1.endpoints.rag_api", raising=False)
+    rag_api = importlib.import_module("api.v1.endpoints.rag_api")
+    # 대체한 의존성으로 import된 모듈은 테스트 후 제거
+    monkeypatch.setitem(sys.modules, "api.v1.endpoints.rag_api", rag_api)
+
+    app = FastAPI()
+    app.exception_handlers = get_exception_handlers()
+    app.include_router(rag_api.router)
+
+    def make(svc: FakeRagService) -> TestClient:
+        app.dependency_overrides[deps.get_rag_service] = lambda: svc
+        return TestClient(app, raise_server_exceptions=False)
+
+    return make
+
+
+def events(body: str) -> list[str]:
+    return [
+        line.removeprefix("event: ")
+        for line in body.splitlines()
+        if line.startswith("event: ")
+    ]
+
+
+def test_success_ends_with_done(client):
+    res = client(FakeRagService()).post("/query_by_rag/stream", json={"query": "q"})
+    assert res.status_code == 200
+    assert events(res.text) == ["hits", "token", "token", "done"]
+
+
+def test_failure_after_first_byte_sends_error_not_done(client):
+    res = client(FakeRagService(fail_at="generate")).post(
+        "/query_by_rag/stream", json={"query": "q"}
+    )
+    assert res.status_code == 200
+    assert events(res.text) == ["hits", "token", "error"]
+    assert '"error_type":"PartialResultException"' in res.text
+
+
+def test_failure_before_stream_is_http_error(client):
+    res = client(FakeRagService(fail_at="retrieve")).post(
+        "/query_by_rag/stream", json={"query": "q", "retriever": "nope"}
+    )
+    assert res.status_code == 400
+    assert res.json()["error_type"] == "ValidationException"
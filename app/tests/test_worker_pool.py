@@ -0,0 +1,245 @@
+import asyncio
+import pytest
+
+pytest.importorskip("aiokafka")
+
+from aiokafka import ConsumerRecord, TopicPartition
+from infra.messaging.kafka.worker_pool import (
+    OffsetTracker,
+    PartitionWorkerPool,
+    UndeliveredError,
+)
+
+TP = TopicPartition("rag", 0)
+
+
+class FakeConsumer:
+    """pause/resume/commit 호출만 기록"""
+
+    def __init__(self):
+        self._paused: set[TopicPartition] = set()
+        self.commits: list[dict[TopicPartition, int]] = []
+        self.seeks: list[tuple[TopicPartition, int]] = []
+
+    def pause(self, *tps):
+        self._paused.update(tps)
+
+    def resume(self, *tps):
+        self._paused.difference_update(tps)
+
+    def paused(self):
+        return set(self._paused)
+
+    def seek(self, tp, offset):
+        self.seeks.append((tp, offset))
+
+    def highwater(self, tp):
+        return None
+
+    async def commit(self, offsets):
+        self.commits.append(dict(offsets))
+
+
+def record(offset: int, key: bytes | None = None, partition: int = 0):
+    return ConsumerRecord(
+        topic="rag",
+        partition=partition,
+        offset=offset,
+        timestamp=0,
+        timestamp_type=0,
+        key=key,
+        value=None,
+        checksum=None,
+        serialized_key_size=0,
+        serialized_value_size=0,
+        headers=(),
+    )
+
+
+def test_tracker_commits_only_contiguous_prefix():
+    tracker = OffsetTracker()
+    for offset in (10, 11, 12):
+        tracker.start(offset)
+
+    tracker.complete(12)
+    assert tracker.committable is None
+    tracker.complete(10)
+    assert tracker.committable == 11
+    tracker.complete(11)
+    assert tracker.committable == 13
+    assert len(tracker) == 0
+
+
+def test_out_of_order_completion_commits_after_gap_closes():
+    async def run():
+        consumer = FakeConsumer()
+        gates = {0: asyncio.Event(), 1: asyncio.Event()}
+
+        async def handler(records):
+            await gates[records[0].offset].wait()
+
+        pool = PartitionWorkerPool(consumer, handler, max_per_partition=4)
+        await pool.submit([record(0)])
+        await pool.submit([record(1)])
+
+        gates[1].set()
+        await asyncio.sleep(0)
+        await pool.commit()
+        assert consumer.commits == []
+
+        gates[0].set()
+        await pool.drain()
+        await pool.commit()
+        assert consumer.commits == [{TP: 2}]
+
+        # 변경이 없으면 다시 commit하지 않음
+        await pool.commit()
+        assert len(consumer.commits) == 1
+
+    asyncio.run(run())
+
+
+def test_handler_error_still_commits():
+    async def run():
+        consumer = FakeConsumer()
+
+        async def handler(records):
+            raise RuntimeError("boom")
+
+        pool = PartitionWorkerPool(consumer, handler)
+        await pool.submit([record(0)])
+        await pool.drain()
+        await pool.commit()
+        assert consumer.commits == [{TP: 1}]
+        assert pool.failed == 1
+
+    asyncio.run(run())
+
+
+def test_undelivered_offset_blocks_commit_and_stalls_partition():
+    async def run():
+        consumer = FakeConsumer()
+
+        async def handler(records):
+            if records[0].offset == 1:
+                raise UndeliveredError("dlq down", {("rag", 0, 1)})
+
+        pool = PartitionWorkerPool(consumer, handler, stall_backoff_sec=60)
+        for offset in range(3):
+            await pool.submit([record(offset)])
+        await pool.drain()
+        await pool.commit()
+
+        # offset 1 앞에서 commit이 멈추고, backoff 동안 partition 정지
+        assert consumer.commits == [{TP: 1}]
+        assert TP in consumer.paused()
+        assert pool.stalled == {TP: 1}
+        assert pool.stats()["partitions"]["rag-0"]["stalled_offset"] == 1
+
+        # 정지 중 (pause 전에 받은) record는 재수신되므로 버림
+        await pool.submit([record(3)])
+        assert pool.inflight == 0
+
+        pool.forget({TP})
+        assert pool.pending_commits() == {}
+        assert pool.stalled == {}
+
+    asyncio.run(run())
+
+
+def test_partition_paused_at_capacity_and_resumed():
+    async def run():
+        consumer = FakeConsumer()
+        gate = asyncio.Event()
+
+        async def handler(records):
+            await gate.wait()
+
+        pool = PartitionWorkerPool(consumer, handler, max_per_partition=2)
+        await pool.submit([record(0)])
+        assert TP not in consumer.paused()
+        await pool.submit([record(1)])
+        assert TP in consumer.paused()
+
+        gate.set()
+        await pool.drain()
+        assert TP not in consumer.paused()
+
+    asyncio.run(run())
+
+
+def test_same_key_runs_in_arrival_order():
+    async def run():
+        consumer = FakeConsumer()
+        order: list[int] = []
+
+        async def handler(records):
+            # 먼저 들어온 작업이 더 오래 걸려도 순서 유지
+            await asyncio.sleep(0.02 if records[0].offset == 0 else 0)
+            order.append(records[0].offset)
+
+        pool = PartitionWorkerPool(consumer, handler)
+        await pool.submit([record(0, key=b"a")])
+        await pool.submit([record(1, key=b"a")])
+        await pool.submit([record(2, key=b"b")])
+        await pool.drain()
+        assert order.index(0) < order.index(1)
+        assert order[0] == 2
+
+    asyncio.run(run())
+
+
+def test_stalled_partition_resumes_from_undelivered_offset():
+    async def run():
+        consumer = FakeConsumer()
+        attempts: dict[int, int] = {}
+
+        async def handler(records):
+            offset = records[0].offset
+            attempts[offset] = attempts.get(offset, 0) + 1
+            # 첫 시도만 retry/DLQ 기록 실패
+            if offset == 1 and attempts[offset] == 1:
+                raise UndeliveredError("dlq down", {("rag", 0, 1)})
+
+        pool = PartitionWorkerPool(consumer, handler, stall_backoff_sec=0.01)
+        for offset in range(3):
+            await pool.submit([record(offset)])
+        await pool.drain()
+        await asyncio.sleep(0.05)
+
+        # backoff 후 정지 offset으로 되돌아가 재개
+        assert consumer.seeks == [(TP, 1)]
+        assert TP not in consumer.paused()
+        assert pool.stalled == {}
+
+        # 재수신된 record 처리 후 commit 진행
+        await pool.submit([record(1)])
+        await pool.submit([record(2)])
+        await pool.drain()
+        await pool.commit()
+        assert consumer.commits[-1] == {TP: 3}
+        assert attempts == {0: 1, 1: 2, 2: 2}
+
+    asyncio.run(run())
+
+
+def test_repeated_stalls_back_off_exponentially():
+    async def run():
+        consumer = FakeConsumer()
+
+        async def handler(records):
+            raise UndeliveredError("dlq down", {("rag", 0, records[0].offset)})
+
+        pool = PartitionWorkerPool(
+            consumer, handler, stall_backoff_sec=0.01, stall_max_backoff_sec=0.02
+        )
+        for _ in range(3):
+            await pool.submit([record(0)])
+            await pool.drain()
+            assert pool.stalled == {TP: 0}
+            await asyncio.sleep(0.05)
+            assert pool.stalled == {}
+        assert pool._stall_counts[TP] == 3
+        assert consumer.seeks == [(TP, 0)] * 3
+
+    asyncio.run(run())
@@ -0,0 +1,20 @@
+import re
+
+# 영문/숫자 단어와 한글 음절 묶음을 추출
+_TOKEN_RE = re.compile(r"[0-9a-z]+|[가-힣]+")
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    형태소 분석기 없이 쓰는 한국어 친화 토크나이저.
+    영문/숫자는 단어 단위, 한글은 음절 bigram으로 분해해
+    조사/어미가 붙은 어절끼리도 부분 일치하도록 한다.
+    """
+    tokens: list[str] = []
+    for m in _TOKEN_RE.finditer(text.lower()):
+        tok = m.group()
+        if "가" <= tok[0] <= "힣" and len(tok) > 1:
+            tokens.extend(tok[i : i + 2] for i in range(len(tok) - 1))
+        else:
+            tokens.append(tok)
+    return tokens